@@ -1,5 +1,7 @@
 import streamlit as st
 
+from tema import aplicar_tema, logo_barra_lateral
+
 # ============================================================
 # CONFIGURAÇÃO DA PÁGINA
 # ============================================================
@@ -13,174 +15,14 @@ st.set_page_config(
 # ============================================================
 # CSS — IDENTIDADE VISUAL INSTITUCIONAL
 # ============================================================
-st.markdown("""
-<style>
-:root {
-    --azul-principal: #004A8D;
-    --azul-secundario: #0073CF;
-    --verde-ipojuca: #009D4A;
-    --amarelo-ipojuca: #FFC20E;
-    --cinza-claro: #F2F2F2;
-    --branco: #FFFFFF;
-}
-
-/* Fundo geral */
-[data-testid="stAppViewContainer"] {
-    background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-}
-
-/* Texto principal área central */
-[data-testid="stAppViewContainer"] p,
-[data-testid="stAppViewContainer"] li,
-[data-testid="stAppViewContainer"] span,
-[data-testid="stAppViewContainer"] label,
-[data-testid="stAppViewContainer"] .stMarkdown {
-    color: #004A8D !important;
-}
-
-/* Títulos amarelos */
-[data-testid="stAppViewContainer"] h1,
-[data-testid="stAppViewContainer"] h2,
-[data-testid="stAppViewContainer"] h3,
-[data-testid="stAppViewContainer"] h4 {
-    color: var(--amarelo-ipojuca) !important;
-    font-weight: 800 !important;
-}
-
-/* Parágrafos justificados */
-[data-testid="stAppViewContainer"] p,
-[data-testid="stAppViewContainer"] li {
-    text-align: justify !important;
-}
-
-/* ====== SIDEBAR ====== */
-[data-testid="stSidebar"] {
-    background: var(--azul-principal) !important;
-}
-
-/* Navegação multipage em branco */
-[data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-[data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-[data-testid="stSidebar"] [data-testid="stSidebarNav"] span {
-    color: #FFFFFF !important;
-}
-[data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-[data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {
-    background-color: rgba(255,255,255,0.12) !important;
-    color: #FFFFFF !important;
-    border-radius: 6px !important;
-}
-
-/* Títulos na sidebar */
-[data-testid="stSidebar"] h1,
-[data-testid="stSidebar"] h2,
-[data-testid="stSidebar"] h3,
-[data-testid="stSidebar"] h4 {
-    color: var(--amarelo-ipojuca) !important;
-    font-weight: 800 !important;
-}
-
-/* Texto sidebar */
-[data-testid="stSidebar"] p,
-[data-testid="stSidebar"] span,
-[data-testid="stSidebar"] label {
-    color: #FFFFFF !important;
-}
-
-/* Links na sidebar */
-[data-testid="stSidebar"] a {
-    color: #FFFFFF !important;
-    font-weight: 600;
-}
-
-/* Card da logo */
-.sidebar-logo {
-    background: #FFFFFF;
-    padding: 10px;
-    border-radius: 10px;
-    text-align: center;
-}
-
-/* Métricas (cards informativos) */
-.stMetric {
-    background-color: var(--amarelo-ipojuca) !important;
-    padding: 18px;
-    border-radius: 10px;
-    border-left: 6px solid var(--azul-secundario);
-    box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-}
-
-/* Cards de módulos */
-.modulo-card {
-    background: #FFFFFF;
-    border-radius: 10px;
-    padding: 18px 20px;
-    box-shadow: 0px 2px 8px rgba(0,0,0,0.08);
-    border-left: 5px solid var(--azul-secundario);
-    min-height: 170px;
-}
-.modulo-card h3 {
-    margin-top: 0;
-    margin-bottom: 6px;
-    color: var(--azul-principal) !important;
-}
-.modulo-card p, .modulo-card li {
-    color: #004A8D !important;
-}
-
-/* Cards de links institucionais (sem ícones coloridos) */
-.link-card {
-    background: #FFFFFF;
-    border-radius: 10px;
-    padding: 14px 16px;
-    box-shadow: 0px 1px 5px rgba(0,0,0,0.08);
-    border-left: 4px solid var(--verde-ipojuca);
-}
-.link-card h3 {
-    margin-top: 0;
-    margin-bottom: 6px;
-    color: var(--azul-principal) !important;
-}
-.link-card p, .link-card a {
-    color: #004A8D !important;
-}
-
-/* Botões */
-button, .stButton button {
-    color: #FFFFFF !important;
-    background-color: var(--azul-secundario) !important;
-    border-radius: 6px !important;
-}
-
-/* Selo oficial no hero */
-.hero-badge {
-    display:inline-block;
-    background: rgba(0,0,0,0.25);
-    padding: 4px 12px;
-    border-radius: 999px;
-    font-size: 0.85rem;
-    letter-spacing: 0.03em;
-}
-
-/* Rodapé */
-.footer-text {
-    font-size: 0.85rem;
-    color: #004A8D !important;
-}
-</style>
-""", unsafe_allow_html=True)
+aplicar_tema("home")
 
 # ============================================================
 # SIDEBAR — LOGO + TEXTO CURTO
 # ============================================================
-with st.sidebar:
-    st.markdown("""
-        <div class="sidebar-logo">
-            <img src="https://cievsipojuca.wordpress.com/wp-content/uploads/2022/01/cievs-ipojuca-sem-fundo.png?w=640"
-                 width="150">
-        </div>
-    """, unsafe_allow_html=True)
+logo_barra_lateral()
 
+with st.sidebar:
     st.markdown("## 📍 Navegação")
     st.info("Selecione, no menu acima, o módulo que deseja visualizar.")
 
@@ -0,0 +1,11 @@
+"""
+Benchmarks dos painéis com dados sintéticos no formato das planilhas.
+
+    python -m benchmarks.executar --linhas 10000 100000 --saida resultados.json
+    python -m benchmarks.executar --comparar antes.json depois.json
+    python -m benchmarks.importacao                # custo de import (-X importtime)
+
+Nada é baixado da internet: as planilhas são geradas em ``benchmarks/.dados``
+e os módulos as leem via PAINEL_URL_<MÓDULO> (arquivo local ou o servidor
+de ``benchmarks.servidor``).
+"""
@@ -0,0 +1,205 @@
+"""
+Etapas medidas em cada módulo, na mesma ordem do ``main()`` da página:
+ingestão, normalização, filtragem, agregação, gráficos e exportação/tabela.
+As páginas rodam em modo "bare" do Streamlit: widgets devolvem o valor
+padrão e nada é desenhado, então mede-se só o trabalho do servidor.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import utils  # noqa: E402
+
+PAGINAS = {
+    "dengue": "pages/1_Dengue.py",
+    "trabalhador": "pages/2_Saúde_do_Trabalhador.py",
+    "visa": "pages/3_Vigilância_Sanitária.py",
+    "pce": "pages/4_Programa de Controle_da_Esquistossomose.py",
+    "oropouche": "pages/5_Oropouche.py",
+}
+
+
+def carregar_pagina(modulo: str):
+    """Importa a página sem executar o ``main()``."""
+    spec = importlib.util.spec_from_file_location(f"pagina_{modulo}", os.path.join(RAIZ, PAGINAS[modulo]))
+    pagina = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pagina)
+    return pagina
+
+
+def dengue(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, encoding="utf-8", usecols=pg.COLUNAS_PUBLICAS)
+    df = medir("normalizacao", lambda: pg.preparar_lote(bruto.copy(deep=False)))
+    filtrado = medir("filtragem", pg.aplicar_filtros, df)
+    medir("agregacao", pg.mostrar_indicadores, filtrado)
+    medir("graficos", pg.mostrar_graficos, filtrado)
+    medir("exportacao", pg.gerar_csv, filtrado)
+
+
+def trabalhador(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, dtype=str, usecols=pg.COLUNAS_PUBLICAS)
+
+    def normalizar():
+        df = pg.preparar_lote(bruto.copy(deep=False))
+        cols = {
+            "data": pg.detectar_coluna(df, ["DATA", "OCORR"]),
+            "semana": pg.detectar_coluna(df, ["SEMANA", "EPID", "SE", "SEMANA_EPIDEMIOLOGICA", "SEM EPID"]),
+            "sexo": pg.detectar_coluna(df, ["SEXO"]),
+            "idade": pg.detectar_coluna(df, ["IDADE"]),
+            "raca": pg.detectar_coluna(df, ["RACA", "RAÇA", "COR"]),
+            "escolaridade": pg.detectar_coluna(df, ["ESCOLAR"]),
+            "bairro": pg.detectar_coluna(df, ["BAIRRO"]),
+            "ocupacao": pg.detectar_coluna(df, ["OCUP"]),
+            "situacao": pg.detectar_coluna(df, ["SITUACAO", "MERCADO"]),
+            "evol": pg.detectar_coluna(df, ["EVOL", "CASO", "DESFECHO"]),
+        }
+        df[cols["data"]] = pd.to_datetime(df[cols["data"]], errors="coerce")
+        return df, cols
+
+    df, c = medir("normalizacao", normalizar)
+    filtrado = medir(
+        "filtragem", pg.aplicar_filtros, df, c["data"], c["semana"], c["sexo"], c["idade"],
+        c["raca"], c["escolaridade"], c["bairro"], c["ocupacao"], c["situacao"], c["evol"],
+    )
+    medir("agregacao", pg.mostrar_indicadores, filtrado, c["ocupacao"], c["evol"])
+    medir("graficos", pg.mostrar_graficos, filtrado, c["sexo"], c["raca"], c["idade"],
+          c["escolaridade"], c["bairro"], c["evol"])
+    medir("tabela", utils.tabela_paginada, filtrado, "benchmark_tabela")
+
+
+def visa(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, usecols=pg.COLUNAS_PUBLICAS)
+    df = medir("normalizacao", lambda: pg.preparar_lote(bruto.copy(deep=False)))
+    filtrado = medir("filtragem", pg.aplicar_filtros, df)
+    tabela, _ = medir("agregacao", lambda: (
+        pg.calcular_indicadores(filtrado.copy(deep=False))[0],
+        pg.tabela_percentis(pg.calcular_tempos(filtrado)),
+    ))
+    medir("graficos", pg.mostrar_backlog, df, filtrado)
+    medir("exportacao", pg.gerar_excel_bytes, {"dados_filtrados": filtrado, "tabela": tabela})
+
+
+def pce(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, dtype=str, usecols=pg.COLUNAS_PUBLICAS)
+
+    def normalizar():
+        df = bruto.copy(deep=False)
+        df.columns = [c.strip() for c in df.columns]
+        return (
+            df,
+            pg.detectar_coluna(df, ["LOCALIDADE", "BAIRRO", "AREA", "TERRITORIO"]),
+            pg.detectar_coluna(df, ["DATA", "DATA_REGISTRO", "DT", "DATA_OCORRENCIA"]),
+        )
+
+    df, col_localidade, col_data = medir("normalizacao", normalizar)
+    filtrado = medir("filtragem", pg.aplicar_filtros, df, col_localidade, col_data)
+    medir("agregacao", pg.mostrar_indicadores, filtrado, col_localidade)
+    medir("graficos", pg.mostrar_graficos, filtrado, col_localidade, col_data)
+    medir("tabela", pg.mostrar_tabela, filtrado)
+
+
+def oropouche(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, dtype=str, usecols=pg.COLUNAS_PUBLICAS)
+
+    def normalizar():
+        df = pg.preparar_lote(bruto.copy(deep=False))
+        cols = {
+            "localidade": pg.detectar(df, pg.CANDIDATOS_LOCALIDADE),
+            "classificacao": pg.detectar(df, ["CLASSIFICACAO", "CLASSIFICAÇÃO", "STATUS", "TIPO", "CLASS"]),
+            "sexo": pg.detectar(df, pg.CANDIDATOS_SEXO),
+            "raca": pg.detectar(df, ["RACA_COR", "RAÇA_COR", "RACA", "COR", "RACA/COR"]),
+            "gestante": pg.detectar(df, ["GESTANTE", "GRAVIDEZ", "GESTACAO"]),
+        }
+        return df, cols
+
+    df, c = medir("normalizacao", normalizar)
+    filtrado = medir(
+        "filtragem", pg.aplicar_filtros, df, c["data"], c["semana"], c["sexo"], c["idade"],
+        c["raca"], c["escolaridade"], c["bairro"], c["ocupacao"], c["situacao"], c["evol"],
+    )
+    medir("agregacao", pg.mostrar_indicadores, filtrado, c["ocupacao"], c["evol"])
+    medir("graficos", pg.mostrar_graficos, filtrado, c["sexo"], c["raca"], c["idade"],
+          c["escolaridade"], c["bairro"], c["evol"])
+    medir("tabela", utils.tabela_paginada, filtrado, "benchmark_tabela")
+
+
+def visa(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, usecols=pg.COLUNAS_PUBLICAS)
+    df = medir("normalizacao", lambda: pg.preparar_lote(bruto.copy(deep=False)))
+    filtrado = medir("filtragem", pg.aplicar_filtros, df)
+    tabela, _ = medir("agregacao", lambda: (
+        pg.calcular_indicadores(filtrado.copy(deep=False))[0],
+        pg.tabela_percentis(pg.calcular_tempos(filtrado)),
+    ))
+    medir("graficos", pg.mostrar_backlog, df, filtrado)
+    medir("exportacao", pg.gerar_excel_bytes, {"dados_filtrados": filtrado, "tabela": tabela})
+
+
+def pce(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, dtype=str, usecols=pg.COLUNAS_PUBLICAS)
+
+    def normalizar():
+        df = bruto.copy(deep=False)
+        df.columns = [c.strip() for c in df.columns]
+        return (
+            df,
+            pg.detectar_coluna(df, ["LOCALIDADE", "BAIRRO", "AREA", "TERRITORIO"]),
+            pg.detectar_coluna(df, ["DATA", "DATA_REGISTRO", "DT", "DATA_OCORRENCIA"]),
+        )
+
+    df, col_localidade, col_data = medir("normalizacao", normalizar)
+    filtrado = medir("filtragem", pg.aplicar_filtros, df, col_localidade, col_data)
+    medir("agregacao", pg.mostrar_indicadores, filtrado, col_localidade)
+    medir("graficos", pg.mostrar_graficos, filtrado, col_localidade, col_data)
+    medir("tabela", pg.mostrar_tabela, filtrado)
+
+
+def oropouche(pg, fonte: str, medir):
+    bruto = medir("ingestao", utils.ler_csv, fonte, dtype=str, usecols=pg.COLUNAS_PUBLICAS)
+
+    def normalizar():
+        df = bruto.rename(columns={c: pg.normalize(c) for c in bruto.columns})
+        cols = {
+            "localidade": pg.detectar(df, pg.CANDIDATOS_LOCALIDADE),
+            "classificacao": pg.detectar(df, ["CLASSIFICACAO", "CLASSIFICAÇÃO", "STATUS", "TIPO", "CLASS"]),
+            "sexo": pg.detectar(df, ["SEXO", "GENERO", "GÊNERO"]),
+            "raca": pg.detectar(df, ["RACA_COR", "RAÇA_COR", "RACA", "COR", "RACA/COR"]),
+            "gestante": pg.detectar(df, ["GESTANTE", "GRAVIDEZ", "GESTACAO"]),
+            "data": pg.detectar(df, pg.CANDIDATOS_DATA),
+            "semana": pg.detectar(df, [
+                "SEMANA_EPIDEMIOLOGICA", "SEMANA EPIDEMIOLOGICA",
+                "SEMANA_EPIDEMIOLÓGICA", "SEMANA EPIDEMIOLÓGICA",
+                "SEMANA", "SEMANA_EP", "SE",
+            ]),
+        }
+        if cols["sexo"]:
+            df[cols["sexo"]] = (
+                df[cols["sexo"]].astype(str).str.strip().str.upper()
+                .replace({"F": "Feminino", "M": "Masculino"})
+            )
+        return pg.tratar_data(df, cols["data"], cols["semana"]), cols
+
+    df, c = medir("normalizacao", normalizar)
+    filtrado = medir("filtragem", pg.aplicar_filtros, df, c["localidade"], c["classificacao"], c["sexo"], c["raca"])
+    medir("agregacao", lambda: (
+        pg.mostrar_indicadores(filtrado, c["gestante"]),
+        pg.contar_por_mes(filtrado, c["classificacao"]),
+    ))
+    medir("graficos", pg.mostrar_graficos, filtrado, c["localidade"], c["classificacao"], c["sexo"], c["raca"])
+    medir("tabela", pg.mostrar_tabela, filtrado)
+
+
+CENARIOS = {
+    "dengue": dengue,
+    "trabalhador": trabalhador,
+    "visa": visa,
+    "pce": pce,
+    "oropouche": oropouche,
+}
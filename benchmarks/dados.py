@@ -0,0 +1,219 @@
+"""
+Geradores de planilhas sintéticas (Dengue, Trabalhador, VISA, PCE e
+Oropouche) com os nomes de coluna reais — inclusive as variantes com e sem
+acento que os detectores de coluna precisam reconhecer — e as colunas
+sensíveis que a projeção de leitura deve descartar.
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dados")
+
+MODULOS = ["dengue", "trabalhador", "visa", "pce", "oropouche"]
+
+BAIRROS = [
+    "Centro", "Camela", "Porto de Galinhas", "Nossa Senhora do Ó",
+    "Rurópolis", "Serrambi", "Maracaípe", "Cajá", "Socco", "Pindoba",
+    "Merepe", "Salinas", "Bairro Novo", "Canoas", "Águas Compridas",
+]
+
+# Nome de coluna -> variantes (a escolhida depende de ``variante``)
+COLUNAS = {
+    "dengue": {
+        "semana": ["Semana Epidemiológica", "SEMANA_EPIDEMIOLOGICA"],
+        "notificacao": ["Data de Notificação", "DATA_NOTIFICACAO"],
+        "sintomas": ["Data Primeiros Sintomas", "DATA_PRIMEIRO_SINTOMAS"],
+        "faixa": ["FA", "FA"],
+        "bairro": ["Bairro Residência", "BAIRRO_RESIDENCIA"],
+        "sexo": ["Sexo", "SEXO"],
+        "evolucao": ["Evolução do Caso", "EVOLUCAO_DO_CASO"],
+        "classificacao": ["Classificação", "CLASSIFICACAO"],
+        "raca": ["Raça/Cor", "RACA_COR"],
+        "escolaridade": ["Escolaridade", "ESCOLARIDADE"],
+        "distrito": ["Distrito", "DISTRITO"],
+    },
+    "trabalhador": {
+        "data": ["Data da Ocorrência", "DATA_OCORRENCIA"],
+        "semana": ["Semana Epidemiológica", "SEM EPID"],
+        "sexo": ["Sexo", "SEXO"],
+        "idade": ["Idade", "IDADE"],
+        "raca": ["Raça/Cor", "RACA COR"],
+        "escolaridade": ["Escolaridade", "ESCOLARIDADE"],
+        "bairro": ["Bairro de Ocorrência", "BAIRRO"],
+        "ocupacao": ["Ocupação", "OCUPACAO"],
+        "situacao": ["Situação no Mercado de Trabalho", "SITUACAO MERCADO"],
+        "evolucao": ["Evolução do Caso", "EVOLUCAO"],
+    },
+    "visa": {
+        "entrada": ["ENTRADA", "ENTRADA"],
+        "inspecao": ["1ª INSPEÇÃO", "1ª INSPEÇÃO"],
+        "conclusao": ["DATA CONCLUSÃO", "DATA CONCLUSÃO"],
+        "situacao": ["SITUAÇÃO", "SITUAÇÃO"],
+        "classificacao": ["CLASSIFICAÇÃO", "CLASSIFICAÇÃO"],
+        "coordenacao": ["COORDENAÇÃO", "COORDENACAO"],
+        "territorio": ["TERRITÓRIO", "TERRITORIO"],
+    },
+    "pce": {
+        "localidade": ["LOCALIDADE", "BAIRRO"],
+        "data": ["DATA", "DATA_REGISTRO"],
+        "pop": ["POP_TRAB", "POP. TRAB."],
+        "exames": ["EXAMES", "TOTAL_EXAMES"],
+        "positivos": ["POSITIVOS", "CASOS_POSITIVOS"],
+        "tratados": ["TRATADOS", "N_TRATADOS"],
+        "a_tratar": ["A_TRATAR", "A TRATAR"],
+    },
+    "oropouche": {
+        "localidade": ["LOCALIDADE", "BAIRRO"],
+        "notificacao": ["DATA DA NOTIFICAÇÃO", "DATA_NOTIFICACAO"],
+        "semana": ["SEMANA EPIDEMIOLÓGICA", "SEMANA_EPIDEMIOLOGICA"],
+        "classificacao": ["CLASSIFICAÇÃO", "CLASSIFICACAO"],
+        "sexo": ["SEXO", "GÊNERO"],
+        "raca": ["RAÇA/COR", "RACA_COR"],
+        "gestante": ["GESTANTE", "GESTACAO"],
+    },
+}
+
+# Colunas que a projeção de leitura deve descartar
+SENSIVEIS = {
+    "dengue": ["Nome do Paciente", "Nome da Mãe", "Data de Nascimento", "Telefone"],
+    "trabalhador": ["Nome", "Endereço", "Telefone", "CPF"],
+    "visa": ["CPF", "TELEFONE"],
+    "pce": ["NOME", "TELEFONE"],
+    "oropouche": ["NOME DO PACIENTE", "DATA DE NASCIMENTO", "TELEFONE"],
+}
+
+SINTOMAS = [
+    "Febre", "Mialgia", "Cefaleia", "Exantema", "Vômito", "Náusea",
+    "Dor Costas", "Artralgia", "Petéquias", "Diabetes", "Hipertensão",
+]
+
+
+def _datas(rng, n: int, dias: int, fim: date | None = None, formato: str = "%Y-%m-%d"):
+    fim = pd.Timestamp(fim or date.today())
+    datas = fim - pd.to_timedelta(rng.integers(0, dias, n), unit="D")
+    return pd.Series(datas.strftime(formato))
+
+
+def _com_vazios(rng, serie: pd.Series, frac: float) -> pd.Series:
+    return serie.mask(rng.random(len(serie)) < frac)
+
+
+def _dengue(rng, n: int, c: dict) -> pd.DataFrame:
+    notif = _datas(rng, n, 365)
+    df = pd.DataFrame({
+        c["semana"]: rng.integers(1, 53, n),
+        c["notificacao"]: notif,
+        c["sintomas"]: _datas(rng, n, 370),
+        c["faixa"]: rng.choice(["0 a 4", "5 a 9", "10 a 14", "15 a 19", "20 a 29", "30 a 39",
+                                "40 a 49", "50 a 59", "60 a 69", "70 a 79", "80 ou mais", "IGNORADO"], n),
+        c["bairro"]: rng.choice(BAIRROS, n),
+        c["sexo"]: rng.choice(["Masculino", "Feminino", "Ignorado"], n, p=[0.48, 0.5, 0.02]),
+        c["evolucao"]: _com_vazios(rng, pd.Series(rng.choice(
+            ["Cura", "Óbito pelo agravo", "Óbito por outras causas", "Ignorado"], n, p=[0.9, 0.02, 0.02, 0.06])), 0.3),
+        c["classificacao"]: rng.choice(
+            ["Dengue", "Descartado", "Dengue com sinais de alarme", "Dengue grave", "Inconclusivo"], n),
+        c["raca"]: rng.choice(["Parda", "Branca", "Preta", "Amarela", "Indígena", "Ignorado"], n),
+        c["escolaridade"]: rng.choice(["Fundamental incompleto", "Fundamental completo",
+                                       "Médio completo", "Superior completo", "Ignorado"], n),
+        c["distrito"]: rng.choice(["I", "II", "III"], n),
+    })
+    for s in SINTOMAS:
+        df[s] = rng.choice(["Sim", "Não"], n, p=[0.3, 0.7])
+    return df
+
+
+def _trabalhador(rng, n: int, c: dict) -> pd.DataFrame:
+    return pd.DataFrame({
+        c["data"]: _datas(rng, n, 730),
+        c["semana"]: [f"SE {s}" for s in rng.integers(1, 53, n)],
+        c["sexo"]: rng.choice(["Masculino", "Feminino"], n, p=[0.7, 0.3]),
+        c["idade"]: rng.integers(16, 75, n).astype(str),
+        c["raca"]: rng.choice(["Parda", "Branca", "Preta", "Ignorado"], n),
+        c["escolaridade"]: rng.choice(["Fundamental", "Médio", "Superior", "Ignorado"], n),
+        c["bairro"]: rng.choice(BAIRROS, n),
+        c["ocupacao"]: rng.choice(["Pedreiro", "Servente de obras", "Cozinheiro", "Garçom",
+                                   "Motorista", "Camareira", "Eletricista", "Vigilante"], n),
+        c["situacao"]: rng.choice(["Empregado registrado", "Autônomo", "Temporário", "Ignorado"], n),
+        c["evolucao"]: rng.choice(["Cura", "Incapacidade temporária", "Óbito por acidente de trabalho grave",
+                                   "Ignorado"], n, p=[0.6, 0.35, 0.01, 0.04]),
+    })
+
+
+def _visa(rng, n: int, c: dict) -> pd.DataFrame:
+    hoje = pd.Timestamp(date.today())
+    entrada = hoje - pd.to_timedelta(rng.integers(0, 730, n), unit="D")
+    inspecao = entrada + pd.to_timedelta(rng.integers(1, 90, n), unit="D")
+    conclusao = inspecao + pd.to_timedelta(rng.integers(1, 200, n), unit="D")
+    inspecao = pd.Series(inspecao).where((inspecao <= hoje) & (rng.random(n) > 0.1))
+    conclusao = pd.Series(conclusao).where((conclusao <= hoje) & inspecao.notna() & (rng.random(n) > 0.2))
+    br = "%d/%m/%Y"
+    return pd.DataFrame({
+        c["entrada"]: pd.Series(entrada.strftime(br)),
+        c["inspecao"]: inspecao.dt.strftime(br),
+        c["conclusao"]: conclusao.dt.strftime(br),
+        c["situacao"]: np.where(conclusao.notna(), "concluído", "em andamento"),
+        c["classificacao"]: rng.choice(["alto risco", "médio risco", "baixo risco"], n),
+        c["coordenacao"]: rng.choice(["Alimentos", "Serviços de Saúde", "Produtos", "Ambiental"], n),
+        c["territorio"]: rng.choice(["I", "II", "III", "IV"], n),
+    })
+
+
+def _pce(rng, n: int, c: dict) -> pd.DataFrame:
+    exames = rng.integers(10, 500, n)
+    positivos = (exames * rng.uniform(0, 0.15, n)).astype(int)
+    tratados = (positivos * rng.uniform(0.5, 1, n)).astype(int)
+    return pd.DataFrame({
+        c["localidade"]: rng.choice(BAIRROS, n),
+        c["data"]: _datas(rng, n, 1095, formato="%d/%m/%Y"),
+        c["pop"]: rng.integers(100, 5000, n),
+        c["exames"]: exames,
+        c["positivos"]: positivos,
+        c["tratados"]: tratados,
+        c["a_tratar"]: positivos - tratados,
+    })
+
+
+def _oropouche(rng, n: int, c: dict) -> pd.DataFrame:
+    return pd.DataFrame({
+        c["localidade"]: rng.choice(BAIRROS, n),
+        c["notificacao"]: _com_vazios(rng, _datas(rng, n, 540, formato="%d/%m/%Y"), 0.02),
+        c["semana"]: rng.integers(1, 53, n).astype(str),
+        c["classificacao"]: rng.choice(["Confirmado", "Descartado", "Em investigação"], n),
+        c["sexo"]: rng.choice(["F", "M"], n),
+        c["raca"]: rng.choice(["Parda", "Branca", "Preta", "Ignorado"], n),
+        c["gestante"]: rng.choice(["Não", "Sim", "Não se aplica"], n, p=[0.5, 0.05, 0.45]),
+    })
+
+
+_GERADORES = {
+    "dengue": _dengue,
+    "trabalhador": _trabalhador,
+    "visa": _visa,
+    "pce": _pce,
+    "oropouche": _oropouche,
+}
+
+
+def gerar(modulo: str, n: int, seed: int = 0, variante: int = 0) -> pd.DataFrame:
+    """Planilha sintética de ``n`` linhas; ``variante`` alterna os nomes de coluna."""
+    rng = np.random.default_rng(seed)
+    nomes = {k: v[variante % len(v)] for k, v in COLUNAS[modulo].items()}
+    df = _GERADORES[modulo](rng, n, nomes)
+    for col in SENSIVEIS[modulo]:
+        df[col] = "DADO SENSÍVEL"
+    return df
+
+
+def caminho_csv(modulo: str, n: int, seed: int = 0, variante: int = 0, pasta: str = PASTA_DADOS) -> str:
+    """CSV sintético em disco (gerado uma vez e reaproveitado)."""
+    caminho = os.path.join(pasta, f"{modulo}-{n}-s{seed}-v{variante}.csv")
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        tmp = f"{caminho}.{os.getpid()}.tmp"
+        gerar(modulo, n, seed, variante).to_csv(tmp, index=False)
+        os.replace(tmp, caminho)
+    return caminho
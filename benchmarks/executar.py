@@ -0,0 +1,140 @@
+"""
+Executa os cenários de ``benchmarks.cenarios`` e grava os tempos em JSON.
+
+    python -m benchmarks.executar                          # todos, 10k e 100k linhas
+    python -m benchmarks.executar --modulos dengue --linhas 1000000 --http
+    python -m benchmarks.executar --comparar antes.json depois.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+from benchmarks import cenarios
+from benchmarks.dados import MODULOS, caminho_csv
+from benchmarks.servidor import ServidorFixtures
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cenarios.RAIZ,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ambiente() -> dict:
+    import numpy
+    import pandas
+    try:
+        import pyarrow
+        versao_arrow = pyarrow.__version__
+    except ImportError:
+        versao_arrow = None
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "pyarrow": versao_arrow,
+        "cpus": os.cpu_count(),
+        "motor_csv": cenarios.utils.MOTOR_CSV,
+    }
+
+
+def medir_modulo(modulo: str, linhas: int, repeticoes: int, servidor=None, variante: int = 0) -> list[dict]:
+    caminho = caminho_csv(modulo, linhas, variante=variante)
+    fonte = servidor.url(caminho) if servidor else caminho
+    pagina = cenarios.carregar_pagina(modulo)
+    resultados = []
+
+    def medir(etapa, funcao, *args, **kwargs):
+        tempos, resultado = [], None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcao(*args, **kwargs)
+            except ImportError as e:   # ex.: openpyxl ausente na exportação
+                resultados.append({"modulo": modulo, "linhas": linhas, "etapa": etapa, "erro": str(e)})
+                return None
+            tempos.append(time.perf_counter() - inicio)
+        resultados.append({
+            "modulo": modulo,
+            "linhas": linhas,
+            "etapa": etapa,
+            "min_s": round(min(tempos), 6),
+            "mediana_s": round(statistics.median(tempos), 6),
+            "repeticoes": repeticoes,
+        })
+        return resultado
+
+    cenarios.CENARIOS[modulo](pagina, fonte, medir)
+    return resultados
+
+
+def comparar(antes: str, depois: str):
+    def indexar(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            return {
+                (r["modulo"], r["linhas"], r["etapa"]): r
+                for r in json.load(f)["resultados"] if "mediana_s" in r
+            }
+
+    a, d = indexar(antes), indexar(depois)
+    print(f"{'módulo':<12} {'linhas':>9} {'etapa':<13} {'antes (s)':>10} {'depois (s)':>10} {'razão':>7}")
+    for chave in sorted(a.keys() & d.keys()):
+        ta, td = a[chave]["mediana_s"], d[chave]["mediana_s"]
+        razao = td / ta if ta else float("nan")
+        print(f"{chave[0]:<12} {chave[1]:>9} {chave[2]:<13} {ta:>10.4f} {td:>10.4f} {razao:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos painéis")
+    parser.add_argument("--modulos", nargs="+", choices=MODULOS, default=MODULOS)
+    parser.add_argument("--linhas", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--variante", type=int, default=0, help="1 = nomes de coluna sem acento")
+    parser.add_argument("--http", action="store_true", help="baixar as planilhas de um servidor local")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<data>-<commit>.json)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    logging.disable(logging.WARNING)   # avisos do modo "bare" do Streamlit
+    ambiente = _ambiente()
+    resultados = []
+    with ServidorFixtures() as servidor:
+        for modulo in args.modulos:
+            for linhas in args.linhas:
+                for r in medir_modulo(
+                    modulo, linhas, args.repeticoes, servidor if args.http else None, args.variante
+                ):
+                    resultados.append(r)
+                    tempo = f"{r['mediana_s']:.4f}s" if "mediana_s" in r else f"erro: {r['erro']}"
+                    print(f"{modulo:<12} {linhas:>9} {r['etapa']:<13} {tempo}")
+
+    saida = args.saida or os.path.join(
+        PASTA_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{ambiente['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({**ambiente, "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
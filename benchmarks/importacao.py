@@ -0,0 +1,95 @@
+"""
+Custo de import de cada página (e da Home) num interpretador novo, via
+``python -X importtime``: o que um worker frio paga antes do primeiro render.
+
+As páginas são carregadas com ``runpy.run_path`` (o ``main()`` não roda);
+a Home roda inteira, já que só desenha conteúdo estático.
+
+    python -m benchmarks.importacao
+    python -m benchmarks.importacao --paginas home dengue --repeticoes 5 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import cenarios
+from benchmarks.executar import PASTA_RESULTADOS, _ambiente
+
+SCRIPTS = {"home": "Home.py", **cenarios.PAGINAS}
+
+
+def _importtime(script: str) -> tuple[float, list[tuple[str, int, int]]]:
+    """Tempo de parede (ms) e linhas (módulo, self_us, cumulativo_us) do importtime."""
+    codigo = (
+        f"import sys, runpy; sys.path.insert(0, {cenarios.RAIZ!r}); "
+        f"runpy.run_path({os.path.join(cenarios.RAIZ, script)!r})"
+    )
+    inicio = time.perf_counter()
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True, text=True, cwd=cenarios.RAIZ,
+        env={**os.environ, "PAINEL_CACHE_DIR": ""},
+    )
+    parede = (time.perf_counter() - inicio) * 1000
+    modulos = []
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        modulos.append((nome.rstrip()[1:], int(proprio), int(cumulativo)))
+    if saida.returncode:
+        raise RuntimeError(f"{script}: {saida.stderr.strip().splitlines()[-1]}")
+    return parede, modulos
+
+
+def medir_script(nome: str, repeticoes: int, top: int) -> dict:
+    paredes, totais = [], []
+    for _ in range(repeticoes):
+        parede, modulos = _importtime(SCRIPTS[nome])
+        # Só os imports de primeiro nível: o cumulativo já inclui os filhos
+        raiz = [(m, c) for m, _, c in modulos if not m.startswith(" ")]
+        paredes.append(parede)
+        totais.append(sum(c for _, c in raiz) / 1000)
+    pesados = sorted(raiz, key=lambda m: -m[1])[:top]
+    return {
+        "pagina": nome,
+        "parede_ms": round(statistics.median(paredes), 1),
+        "imports_ms": round(statistics.median(totais), 1),
+        "repeticoes": repeticoes,
+        "mais_pesados": [{"modulo": m, "ms": round(c / 1000, 1)} for m, c in pesados],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de import das páginas (-X importtime)")
+    parser.add_argument("--paginas", nargs="+", choices=list(SCRIPTS), default=list(SCRIPTS))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="módulos mais pesados listados por página")
+    parser.add_argument("--saida")
+    args = parser.parse_args()
+
+    resultados = []
+    for nome in args.paginas:
+        r = medir_script(nome, args.repeticoes, args.top)
+        resultados.append(r)
+        pesados = ", ".join(f"{m['modulo']} {m['ms']:.0f}" for m in r["mais_pesados"][:4])
+        print(f"{nome:<12} parede {r['parede_ms']:>7.1f} ms  imports {r['imports_ms']:>7.1f} ms  ({pesados})")
+
+    ambiente = _ambiente()
+    saida = args.saida or os.path.join(
+        PASTA_RESULTADOS, f"importacao-{datetime.now():%Y%m%d-%H%M%S}-{ambiente['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({**ambiente, "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
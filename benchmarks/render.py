@@ -0,0 +1,145 @@
+"""
+Tempo de execução completa de cada página (e da Home) pelo AppTest do
+Streamlit, com as planilhas apontadas para CSVs locais (sem rede):
+
+- fria: registro de datasets vazio (download + parse + render);
+- quente: nova sessão com o dataset já no registro;
+- filtro: rerun após mudar cada widget de filtro da barra lateral.
+
+Falha (código de saída 1) se algum tempo passar do orçamento em
+``benchmarks/orcamentos.json``.
+
+    python -m benchmarks.render --linhas 10000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import cenarios
+from benchmarks.dados import MODULOS, caminho_csv
+from benchmarks.executar import PASTA_RESULTADOS, _ambiente
+
+ORCAMENTOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "orcamentos.json")
+
+SCRIPTS = {"home": "Home.py", **cenarios.PAGINAS}
+
+
+def _limpar_registro():
+    utils = cenarios.utils
+    for modulo in MODULOS:
+        utils.REGISTRO.remover(modulo)
+    utils._estado.clear()
+
+
+def _rodar(script: str, timeout: float) -> tuple[AppTest, float]:
+    at = AppTest.from_file(os.path.join(cenarios.RAIZ, script), default_timeout=timeout)
+    inicio = time.perf_counter()
+    at.run()
+    return at, time.perf_counter() - inicio
+
+
+def _alterar(widget):
+    """Muda o valor do widget de filtro; devolve o valor original (ou None se não der)."""
+    original = widget.value
+    opcoes = list(getattr(widget, "options", []))
+    tipo = type(widget).__name__
+    if tipo == "Multiselect" and opcoes:
+        widget.set_value(original[1:] if len(original) > 1 else [opcoes[0]])
+    elif tipo in ("Selectbox", "Radio") and len(opcoes) > 1:
+        atual = widget.format_func(original) if original is not None else opcoes[0]
+        widget.set_value(opcoes[1] if atual == opcoes[0] else opcoes[0])
+    else:
+        return None
+    return original
+
+
+def medir_script(nome: str, timeout: float) -> list[dict]:
+    script = SCRIPTS[nome]
+    medidas = []
+
+    _limpar_registro()
+    at, fria = _rodar(script, timeout)
+    erros = [e.value for e in at.exception]
+    medidas.append({"pagina": nome, "fase": "fria", "ms": round(fria * 1000, 1), "erros": erros})
+
+    at, quente = _rodar(script, timeout)
+    medidas.append({"pagina": nome, "fase": "quente", "ms": round(quente * 1000, 1)})
+
+    for tipo in ("multiselect", "selectbox", "radio"):
+        for i in range(len(getattr(at.sidebar, tipo))):
+            widget = getattr(at.sidebar, tipo)[i]
+            original = _alterar(widget)
+            if original is None:
+                continue
+            rotulo = widget.label.strip() or f"{tipo}[{i}]"
+            inicio = time.perf_counter()
+            at.run()
+            ms = (time.perf_counter() - inicio) * 1000
+            medidas.append({
+                "pagina": nome, "fase": "filtro", "widget": f"{tipo}:{rotulo}",
+                "ms": round(ms, 1), "erros": [e.value for e in at.exception],
+            })
+            getattr(at.sidebar, tipo)[i].set_value(original)
+            at.run()
+    return medidas
+
+
+def verificar(medidas: list[dict], orcamentos: dict) -> list[str]:
+    estouros = []
+    for m in medidas:
+        limite = {**orcamentos["padrao"], **orcamentos.get("paginas", {}).get(m["pagina"], {})}[f"{m['fase']}_ms"]
+        if m["ms"] > limite:
+            estouros.append(f"{m['pagina']} {m['fase']} {m.get('widget', '')}: {m['ms']:.0f} ms > {limite} ms")
+        if m.get("erros"):
+            estouros.append(f"{m['pagina']} {m['fase']} {m.get('widget', '')}: exceção {m['erros'][0][:120]}")
+    return estouros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de renderização (AppTest)")
+    parser.add_argument("--paginas", nargs="+", choices=list(SCRIPTS), default=list(SCRIPTS))
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--orcamentos", default=ORCAMENTOS)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--saida")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    for modulo in MODULOS:
+        os.environ[f"PAINEL_URL_{modulo.upper()}"] = caminho_csv(modulo, args.linhas)
+    os.environ["PAINEL_CACHE_DIR"] = ""
+    cenarios.utils.DIR_CACHE = ""
+
+    with open(args.orcamentos, encoding="utf-8") as f:
+        orcamentos = json.load(f)
+
+    medidas = []
+    for nome in args.paginas:
+        for m in medir_script(nome, args.timeout):
+            medidas.append({**m, "linhas": args.linhas})
+            print(f"{nome:<12} {m['fase']:<7} {m.get('widget', ''):<40} {m['ms']:>9.1f} ms")
+
+    ambiente = _ambiente()
+    saida = args.saida or os.path.join(
+        PASTA_RESULTADOS, f"render-{datetime.now():%Y%m%d-%H%M%S}-{ambiente['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({**ambiente, "resultados": medidas}, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    estouros = verificar(medidas, orcamentos)
+    for e in estouros:
+        print(f"ORÇAMENTO EXCEDIDO: {e}")
+    sys.exit(1 if estouros else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Servidor HTTP local que faz o papel do export CSV do Google Sheets, para
+medir e testar o caminho de download sem rede. Permite simular lentidão
+(``atraso_s``) e indisponibilidade (``falhar``).
+
+    with ServidorFixtures() as srv:
+        os.environ["PAINEL_URL_DENGUE"] = srv.url(caminho_csv("dengue", 10_000))
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from benchmarks.dados import PASTA_DADOS
+
+
+class ServidorFixtures:
+    def __init__(self, raiz: str = PASTA_DADOS, atraso_s: float = 0.0, falhar: bool = False):
+        self.raiz = os.path.abspath(raiz)
+        self.atraso_s = atraso_s
+        self.falhar = falhar
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    def url(self, caminho: str) -> str:
+        host, porta = self._httpd.server_address[:2]
+        return f"http://{host}:{porta}/{quote(os.path.relpath(caminho, self.raiz))}"
+
+    def __enter__(self):
+        srv = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with srv._lock:
+                    srv.requisicoes += 1
+                time.sleep(srv.atraso_s)
+                caminho = os.path.abspath(os.path.join(srv.raiz, unquote(self.path.lstrip("/"))))
+                if not caminho.startswith(srv.raiz + os.sep):
+                    self.send_error(403)
+                    return
+                if srv.falhar or not os.path.isfile(caminho):
+                    self.send_error(503 if srv.falhar else 404)
+                    return
+                with open(caminho, "rb") as f:
+                    dados = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
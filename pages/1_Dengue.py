@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
 import unicodedata
 
+from tema import aplicar_tema
+from utils import (
+    Filtro, FiltroBanco, abrir_tabela, banco_ativo, colunas, contar_linhas, contar_por,
+    dataset_compartilhado, ingerir_tabela, ler_csv, linhas, medido, medir_exportacao,
+    pagina_medida, painel_filtros, plotar, projecao_publica, url_fonte,
+)
+
 # =======================================================
 # CONFIGURAÇÃO DA PÁGINA 
 # =======================================================
@@ -62,6 +68,9 @@ SINTOMAS_E_COMORBIDADES = [
     "HEPATOPATIAS", "RENAL", "HIPERTENSAO", "ACIDO_PEPT", "AUTO_IMUNE"
 ]
 
+# Nome, endereço, telefone, CPF e nascimento são descartados já na leitura
+COLUNAS_PUBLICAS = projecao_publica()
+
 
 def limpar_nome_coluna(col: str) -> str:
     c = unicodedata.normalize('NFKD', str(col)).encode('ascii', 'ignore').decode()
@@ -72,196 +81,6 @@ def remover_acentos(texto: str) -> str:
     return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("utf-8")
 
 
-# =======================================================
-# CSS — PALETA + SIDEBAR + GRÁFICOS
-# =======================================================
-
-def aplicar_css():
-    st.markdown(f"""
-    <style>
-    :root {{
-        --azul-principal: {CORES["azul"]};
-        --azul-secundario: {CORES["azul_claro"]};
-        --verde-ipojuca: {CORES["verde"]};
-        --amarelo-ipojuca: {CORES["amarelo"]};
-        --cinza-claro: #F2F2F2;
-        --branco: #FFFFFF;
-    }}
-
-    /* =============== ÁREA CENTRAL (fora da sidebar) =============== */
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li,
-    [data-testid="stAppViewContainer"] span,
-    [data-testid="stAppViewContainer"] label,
-    [data-testid="stAppViewContainer"] .stMarkdown {{
-        color: #0073CF !important;
-    }}
-
-    [data-testid="stAppViewContainer"] h1,
-    [data-testid="stAppViewContainer"] h2,
-    [data-testid="stAppViewContainer"] h3,
-    [data-testid="stAppViewContainer"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    [data-testid="stAppViewContainer"] {{
-        background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-    }}
-
-    /* ====================== SIDEBAR ====================== */
-    [data-testid="stSidebar"] {{
-        background: var(--azul-principal) !important;
-    }}
-
-    /* Título "Filtros" e headings */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* Labels nativos dos widgets, se usados */
-    [data-testid="stSidebar"] .stMultiSelect > label,
-    [data-testid="stSidebar"] .stSelectbox > label,
-    [data-testid="stSidebar"] .stDateInput > label,
-    [data-testid="stSidebar"] .stNumberInput > label,
-    [data-testid="stSidebar"] .stSlider > label,
-    [data-testid="stSidebar"] .stTextInput > label,
-    [data-testid="stSidebar"] label {{
-        color: var(--azul-secundario) !important;
-        font-weight: 600 !important;
-    }}
-
-    /* Links do menu multipage */
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] span {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {{
-        background-color: rgba(255, 255, 255, 0.12) !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    /* VALORES DENTRO DOS CAMPOS (texto azul principal) */
-    [data-testid="stSidebar"] input,
-    [data-testid="stSidebar"] textarea,
-    [data-testid="stSidebar"] select,
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stNumberInput,
-    [data-testid="stSidebar"] .stSlider,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stTextInput,
-    [data-testid="stSidebar"] .stMultiSelect * {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    [data-testid="stSidebar"] .stTextInput > div > div,
-    [data-testid="stSidebar"] .stNumberInput > div > div,
-    [data-testid="stSidebar"] .stDateInput > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stMultiSelect > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] input::placeholder,
-    [data-testid="stSidebar"] textarea::placeholder {{
-        color: #2f6bbd !important;
-    }}
-
-    /* Chips selecionados */
-    [data-testid="stSidebar"] span[data-baseweb="tag"],
-    [data-testid="stSidebar"] span[data-baseweb="tag"] * {{
-        background-color: {CORES["verde"]} !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect > div,
-    [data-testid="stSidebar"] .stSelectbox > div,
-    [data-testid="stSidebar"] .stTextInput > div,
-    [data-testid="stSidebar"] .stNumberInput > div,
-    [data-testid="stSidebar"] .stDateInput > div {{
-        border-color: var(--azul-secundario) !important;
-        border-radius: 6px !important;
-    }}
-
-    /* ===== Títulos dos filtros na sidebar (classe filtro-titulo) ===== */
-    [data-testid="stSidebar"] .filtro-titulo {{
-        margin-top: 8px !important;
-        margin-bottom: 0px !important;
-        color: var(--azul-secundario) !important;
-        font-weight: 600 !important;
-        font-size: 0.9rem !important;
-    }}
-
-    /* Encostar título na caixa */
-    [data-testid="stSidebar"] .stMarkdown p {{
-        margin-top: 0 !important;
-        margin-bottom: 0 !important;
-    }}
-
-    [data-testid="stSidebar"] .stMarkdown + div,
-    [data-testid="stSidebar"] .stMarkdown + .stMultiSelect,
-    [data-testid="stSidebar"] .stMarkdown + .stSelectbox,
-    [data-testid="stSidebar"] .stMarkdown + .stDateInput,
-    [data-testid="stSidebar"] .stMarkdown + .stNumberInput {{
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stNumberInput {{
-        margin-bottom: 4px !important;
-    }}
-
-    /* ================= GRÁFICOS ================= */
-    .js-plotly-plot .plotly .bg,
-    .js-plotly-plot .plotly .plotly-background,
-    .js-plotly-plot .plotly .paper,
-    .js-plotly-plot .plotly .plotbg {{
-        fill: #FFFFFF !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    .js-plotly-plot text {{
-        fill: {CORES["azul"]} !important;
-        color: {CORES["azul"]} !important;
-    }}
-
-    .element-container .js-plotly-plot {{
-        border: 1px solid #000000 !important;
-        border-radius: 4px !important;
-        padding: 4px !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    .stMetric {{
-        background-color: var(--amarelo-ipojuca) !important;
-        padding: 18px;
-        border-radius: 10px;
-        border-left: 6px solid var(--azul-secundario);
-        box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-    }}
-
-    button, .stButton button {{
-        color: #FFFFFF !important;
-        background-color: var(--cinza-claro) !important;
-        border-radius: 6px !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
-
 # =======================================================
 # TEMA DOS GRÁFICOS PLOTLY
 # =======================================================
@@ -315,19 +134,9 @@ def aplicar_tema_plotly(fig):
 # CARREGAMENTO DO DATASET
 # =======================================================
 
-@st.cache_data
-def carregar_dados() -> pd.DataFrame:
-    url = (
-        "https://docs.google.com/spreadsheets/d/"
-        "1bdHetdGEXLgXv7A2aGvOaItKxiAuyg0Ip0UER1BjjOg/export?format=csv"
-    )
-
-    try:
-        df = pd.read_csv(url, encoding="utf-8")
-    except Exception:
-        st.error("❌ Erro ao carregar os dados da planilha do Google Sheets.")
-        st.stop()
-
+@medido()
+def preparar_lote(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza nomes e tipos de um lote do CSV."""
     df.columns = [limpar_nome_coluna(c) for c in df.columns]
 
     rename_dict = {orig: dest for orig, dest in FINAL_RENAME_MAP.items() if orig in df.columns}
@@ -346,121 +155,111 @@ def carregar_dados() -> pd.DataFrame:
     return df
 
 
+ERRO_CARGA = "❌ Erro ao carregar os dados da planilha do Google Sheets."
+
+
+def ler_planilha() -> pd.DataFrame:
+    url = url_fonte("dengue", (
+        "https://docs.google.com/spreadsheets/d/"
+        "1bdHetdGEXLgXv7A2aGvOaItKxiAuyg0Ip0UER1BjjOg/export?format=csv"
+    ))
+
+    return ler_csv(url, preparar=preparar_lote, encoding="utf-8", usecols=COLUNAS_PUBLICAS)
+
+
+@dataset_compartilhado("dengue")
+def carregar_dados() -> pd.DataFrame:
+    return ler_planilha()
+
+
+@st.cache_resource(ttl=600)
+def _ingerir_banco() -> tuple[FiltroBanco | None, bool]:
+    """
+    Ingere a planilha no banco local; o DataFrame não fica em memória.
+    Devolve (tabela, atualizada): com a planilha fora do ar, a última
+    ingestão (ou None, se não houver).
+    """
+    try:
+        df = ler_planilha()
+    except Exception:
+        df = pd.DataFrame()   # planilha fora do ar: segue com a última ingestão
+    if df.empty:
+        return abrir_tabela("dengue"), False
+    return ingerir_tabela("dengue", df, indexar=COLUNAS_FILTRO), True
+
+
+def preparar_banco() -> FiltroBanco:
+    """Avisos e parada ficam fora do cache, para valerem em todo rerun."""
+    tabela, atualizada = _ingerir_banco()
+    if tabela is None:
+        _ingerir_banco.clear()   # nada a servir: tenta de novo no próximo rerun
+        st.error(ERRO_CARGA)
+        st.stop()
+    if not atualizada:
+        st.warning("⚠️ Fonte de dados indisponível no momento. Exibindo a última cópia salva.")
+    return tabela
+
+
 # =======================================================
 # FILTROS 
 # =======================================================
 
-def aplicar_filtros(df: pd.DataFrame) -> pd.DataFrame:
-    st.sidebar.header("🔎 Filtros")
-    df_filtrado = df.copy()
+FILTROS = [
+    Filtro("CLASSIFICACAO_FINAL", "Classificação Final"),
+    Filtro("SEMANA_EPIDEMIOLOGICA", "Semana Epidemiológica"),
+    Filtro("SEXO", "Sexo"),
+    Filtro("FAIXA_ETARIA", "Faixa Etária", opcoes=ORDEM_FAIXA_ETARIA),
+    Filtro("EVOLUCAO", "Evolução do Caso"),
+    Filtro("ESCOLARIDADE", "Escolaridade"),
+    Filtro("BAIRRO", "Bairro"),
+]
 
-    # ====== Classificação Final ======
-    if 'CLASSIFICACAO_FINAL' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Classificação Final</p>",
-            unsafe_allow_html=True
-        )
-        opcoes = sorted(df['CLASSIFICACAO_FINAL'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=opcoes)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['CLASSIFICACAO_FINAL'].isin(sel)]
-
-    # ====== Semana Epidemiológica ======
-    if 'SEMANA_EPIDEMIOLOGICA' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Semana Epidemiológica</p>",
-            unsafe_allow_html=True
-        )
-        semanas = sorted(df['SEMANA_EPIDEMIOLOGICA'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=semanas)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['SEMANA_EPIDEMIOLOGICA'].isin(sel)]
-
-    # ====== Sexo ======
-    if 'SEXO' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Sexo</p>",
-            unsafe_allow_html=True
-        )
-        sexos = sorted(df['SEXO'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=sexos)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['SEXO'].isin(sel)]
+COLUNAS_FILTRO = [f.coluna for f in FILTROS]
 
-    # ====== Faixa Etária ======
-    if 'FAIXA_ETARIA' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Faixa Etária</p>",
-            unsafe_allow_html=True
-        )
-        faixas = st.sidebar.multiselect(label="", options=ORDEM_FAIXA_ETARIA)
-        if faixas:
-            df_filtrado = df_filtrado[df_filtrado['FAIXA_ETARIA'].isin(faixas)]
-
-    # ====== Evolução do Caso ======
-    if 'EVOLUCAO' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Evolução do Caso</p>",
-            unsafe_allow_html=True
-        )
-        evolucoes = sorted(df['EVOLUCAO'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=evolucoes)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['EVOLUCAO'].isin(sel)]
-
-    # ====== Escolaridade ======
-    if 'ESCOLARIDADE' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Escolaridade</p>",
-            unsafe_allow_html=True
-        )
-        escs = sorted(df['ESCOLARIDADE'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=escs)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['ESCOLARIDADE'].isin(sel)]
-
-    # ====== Bairro ======
-    if 'BAIRRO' in df.columns:
-        st.sidebar.markdown(
-            "<p class='filtro-titulo'>Bairro</p>",
-            unsafe_allow_html=True
-        )
-        bairros = sorted(df['BAIRRO'].dropna().unique())
-        sel = st.sidebar.multiselect(label="", options=bairros)
-        if sel:
-            df_filtrado = df_filtrado[df_filtrado['BAIRRO'].isin(sel)]
 
-    if df_filtrado.empty:
+@medido()
+def aplicar_filtros(fonte):
+    """
+    Recebe o DataFrame completo (ou a tabela do banco local) e devolve o
+    recorte filtrado no mesmo formato.
+    """
+    fonte_filtrada = painel_filtros(fonte, FILTROS, "dengue")
+
+    if contar_linhas(fonte_filtrada) == 0:
         st.warning("Nenhum dado encontrado para os filtros selecionados.")
         st.stop()
 
-    return df_filtrado
+    return fonte_filtrada
 
 
 # =======================================================
 # INDICADORES
 # =======================================================
 
-def mostrar_indicadores(df_filtrado: pd.DataFrame):
+@medido()
+def mostrar_indicadores(fonte):
     st.header("📊 Indicadores Gerais")
     col1, col2, col3, col4 = st.columns(4)
+    cols = colunas(fonte)
 
-    total = len(df_filtrado)
+    total = contar_linhas(fonte)
     col1.metric("Notificações no período", total)
 
     confirmados = descartados = obitos = 0
 
-    if 'CLASSIFICACAO_FINAL' in df_filtrado.columns:
-        classif = df_filtrado['CLASSIFICACAO_FINAL'].astype(str).str.upper().str.strip()
-        confirmados = classif.isin(["DENGUE", "DENGUE COM SINAIS DE ALARME"]).sum()
-        descartados = (classif == "DESCARTADO").sum()
+    if 'CLASSIFICACAO_FINAL' in cols:
+        classif = contar_por(fonte, ['CLASSIFICACAO_FINAL'])
+        rotulo = classif['CLASSIFICACAO_FINAL'].astype(str).str.upper().str.strip()
+        confirmados = int(classif.loc[rotulo.isin(["DENGUE", "DENGUE COM SINAIS DE ALARME"]), 'QTD'].sum())
+        descartados = int(classif.loc[rotulo == "DESCARTADO", 'QTD'].sum())
 
         col2.metric("Confirmados", confirmados)
         col3.metric("Descartados", descartados)
 
-    if 'EVOLUCAO' in df_filtrado.columns:
-        evol = df_filtrado['EVOLUCAO'].astype(str).str.upper().apply(remover_acentos)
-        obitos = evol.str.contains("OBITO").sum()
+    if 'EVOLUCAO' in cols:
+        evol = contar_por(fonte, ['EVOLUCAO'])
+        rotulo = evol['EVOLUCAO'].astype(str).str.upper().apply(remover_acentos)
+        obitos = int(evol.loc[rotulo.str.contains("OBITO"), 'QTD'].sum())
         let = (obitos / confirmados) * 100 if confirmados else 0
         col4.metric("Letalidade (%)", f"{let:.2f}% ({obitos} óbitos)")
 
@@ -469,17 +268,19 @@ def mostrar_indicadores(df_filtrado: pd.DataFrame):
 # GRÁFICOS
 # =======================================================
 
-def mostrar_graficos(df_filtrado: pd.DataFrame):
+@medido()
+def mostrar_graficos(fonte):
+    import plotly.express as px
+
     st.subheader("📈 Análise Temporal e Territorial")
     colA, colB = st.columns(2)
+    cols = colunas(fonte)
 
     # Casos por semana epidemiológica
-    if 'SEMANA_EPIDEMIOLOGICA' in df_filtrado.columns:
+    if 'SEMANA_EPIDEMIOLOGICA' in cols:
         semanal = (
-            df_filtrado
-            .groupby("SEMANA_EPIDEMIOLOGICA")
-            .size()
-            .reset_index(name="Casos")
+            contar_por(fonte, ["SEMANA_EPIDEMIOLOGICA"])
+            .rename(columns={"QTD": "Casos"})
             .sort_values("SEMANA_EPIDEMIOLOGICA")
         )
         fig = px.line(
@@ -491,11 +292,11 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
             color_discrete_sequence=[CORES["azul"]]
         )
         fig = aplicar_tema_plotly(fig)
-        colA.plotly_chart(fig, use_container_width=True)
+        plotar(fig, colA)
 
     # Casos por distrito
-    if 'DISTRITO' in df_filtrado.columns:
-        d = df_filtrado['DISTRITO'].value_counts().reset_index()
+    if 'DISTRITO' in cols:
+        d = contar_por(fonte, ['DISTRITO'])
         d.columns = ['Distrito', 'Casos']
         fig = px.bar(
             d,
@@ -505,12 +306,12 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
             color_discrete_sequence=[CORES["verde"]]
         )
         fig = aplicar_tema_plotly(fig)
-        colB.plotly_chart(fig, use_container_width=True)
+        plotar(fig, colB)
 
     # Casos por bairro
     st.subheader("🏘️ Casos por Bairro")
-    if 'BAIRRO' in df_filtrado.columns:
-        b = df_filtrado['BAIRRO'].value_counts().reset_index()
+    if 'BAIRRO' in cols:
+        b = contar_por(fonte, ['BAIRRO'])
         b.columns = ['Bairro', 'Casos']
         fig = px.bar(
             b.head(15),
@@ -520,12 +321,16 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
             color_discrete_sequence=[CORES["azul_claro"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Perfil Social
     st.subheader("🎓 Perfil Social")
-    if 'RACA_COR' in df_filtrado.columns and 'ESCOLARIDADE' in df_filtrado.columns:
-        cruz = df_filtrado.groupby(['RACA_COR', 'ESCOLARIDADE']).size().reset_index(name='Casos')
+    if 'RACA_COR' in cols and 'ESCOLARIDADE' in cols:
+        cruz = (
+            contar_por(fonte, ['RACA_COR', 'ESCOLARIDADE'])
+            .rename(columns={"QTD": "Casos"})
+            .sort_values(['RACA_COR', 'ESCOLARIDADE'])
+        )
         fig = px.bar(
             cruz,
             x="RACA_COR",
@@ -536,15 +341,17 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
             color_discrete_sequence=px.colors.qualitative.Safe
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Sintomas e comorbidades
     st.subheader("🩺 Sintomas e Comorbidades")
     dados = []
     for s in SINTOMAS_E_COMORBIDADES:
         colname = limpar_nome_coluna(s)
-        if colname in df_filtrado.columns:
-            ct = (df_filtrado[colname].astype(str).str.upper().str.strip() == "SIM").sum()
+        if colname in cols:
+            cont = contar_por(fonte, [colname])
+            sim = cont[colname].astype(str).str.upper().str.strip() == "SIM"
+            ct = int(cont.loc[sim, 'QTD'].sum())
             if ct > 0:
                 dados.append({"Item": s.replace("_", " ").capitalize(), "Casos": ct})
 
@@ -559,15 +366,21 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
             color_discrete_sequence=[CORES["amarelo"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Perfil Demográfico
     st.subheader("👥 Perfil Demográfico")
-    if 'FAIXA_ETARIA' in df_filtrado.columns and 'SEXO' in df_filtrado.columns:
-        ordem_plot = [f for f in ORDEM_FAIXA_ETARIA if f in df_filtrado['FAIXA_ETARIA'].unique()]
-        fig = px.histogram(
-            df_filtrado,
+    if 'FAIXA_ETARIA' in cols and 'SEXO' in cols:
+        demo = (
+            contar_por(fonte, ['FAIXA_ETARIA', 'SEXO'])
+            .rename(columns={"QTD": "Casos"})
+            .sort_values(['SEXO', 'FAIXA_ETARIA'])
+        )
+        ordem_plot = [f for f in ORDEM_FAIXA_ETARIA if f in set(demo['FAIXA_ETARIA'])]
+        fig = px.bar(
+            demo,
             x="FAIXA_ETARIA",
+            y="Casos",
             color="SEXO",
             barmode="group",
             title="Casos por Faixa Etária e Sexo",
@@ -575,17 +388,23 @@ def mostrar_graficos(df_filtrado: pd.DataFrame):
         )
         fig.update_xaxes(categoryorder="array", categoryarray=ordem_plot)
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
 
 # =======================================================
 # DOWNLOAD
 # =======================================================
 
-def botao_download(df_filtrado: pd.DataFrame):
+@medir_exportacao("dengue")
+def gerar_csv(fonte) -> bytes:
+    return linhas(fonte).to_csv(index=False).encode("utf-8-sig")
+
+
+def botao_download(fonte):
+    # CSV gerado só quando o usuário clica
     st.download_button(
         "📥 Baixar dados filtrados (CSV)",
-        df_filtrado.to_csv(index=False).encode("utf-8-sig"),
+        lambda: gerar_csv(fonte),
         file_name="dados_filtrados_dengue.csv",
         mime="text/csv"
     )
@@ -595,23 +414,28 @@ def botao_download(df_filtrado: pd.DataFrame):
 # MAIN
 # =======================================================
 
+@pagina_medida("dengue")
 def main():
-    aplicar_css()
+    aplicar_tema("dengue")
 
     st.title("🦟 Dashboard Vigilância das Arboviroses (Dengue)")
     st.caption("Fonte: Gerência de Promoção, Prevenção e Vigilância Epidemiológica 📊🗺️")
 
-    df = carregar_dados()
+    try:
+        fonte = preparar_banco() if banco_ativo() else carregar_dados()
+    except Exception:
+        st.error(ERRO_CARGA)
+        st.stop()
 
-    if df.empty:
+    if contar_linhas(fonte) == 0:
         st.warning("Nenhum dado encontrado.")
         st.stop()
 
-    df_filtrado = aplicar_filtros(df)
+    fonte_filtrada = aplicar_filtros(fonte)
 
-    mostrar_indicadores(df_filtrado)
-    mostrar_graficos(df_filtrado)
-    botao_download(df_filtrado)
+    mostrar_indicadores(fonte_filtrada)
+    mostrar_graficos(fonte_filtrada)
+    botao_download(fonte_filtrada)
 
     st.markdown("---")
     st.caption("Painel de Dengue • Versão 1.0")
@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.io as pio
-import numpy as np
 import unicodedata
 from datetime import datetime
 
+from tema import aplicar_tema
+from utils import (
+    Filtro, dataset_compartilhado, extrair_numero, ler_csv, medido, pagina_medida,
+    painel_filtros, plotar, projecao_publica, tabela_paginada, url_fonte,
+)
+
 # ==========================================================
 # CONFIGURAÇÃO DA PÁGINA
 # ==========================================================
@@ -35,6 +38,9 @@ PALETA = [
     CORES["amarelo"]
 ]
 
+# Nome, endereço, telefone, CPF e nascimento são descartados já na leitura
+COLUNAS_PUBLICAS = projecao_publica()
+
 # ==========================================================
 # FUNÇÕES AUXILIARES DE TEXTO/COLUNAS
 # ==========================================================
@@ -87,316 +93,6 @@ def contar_obitos(df, coluna):
     return resultados.any(axis=1).sum()
 
 
-# ==========================================================
-# CSS — ALINHADO AO DASHBOARD DE DENGUE
-# ==========================================================
-
-def aplicar_css():
-    st.markdown(f"""
-    <style>
-    :root {{
-        --azul-principal: {CORES["azul"]};
-        --azul-secundario: {CORES["azul_sec"]};
-        --verde-ipojuca: {CORES["verde"]};
-        --amarelo-ipojuca: {CORES["amarelo"]};
-        --cinza-claro: {CORES["cinza_claro"]};
-        --branco: {CORES["branco"]};
-    }}
-
-    /* Texto principal da área central */
-    [data-testid="stAppViewContainer"] body,
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li,
-    [data-testid="stAppViewContainer"] span,
-    [data-testid="stAppViewContainer"] label,
-    [data-testid="stAppViewContainer"] .stMarkdown {{
-        color: #0073CF !important;
-    }}
-
-    /* Títulos amarelos na área principal */
-    [data-testid="stAppViewContainer"] h1,
-    [data-testid="stAppViewContainer"] h2,
-    [data-testid="stAppViewContainer"] h3,
-    [data-testid="stAppViewContainer"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* Parágrafos justificados */
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li {{
-        text-align: justify !important;
-    }}
-
-    /* Fundo geral */
-    [data-testid="stAppViewContainer"] {{
-        background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-    }}
-
-    /* Sidebar */
-    [data-testid="stSidebar"] {{
-        background: var(--azul-principal) !important;
-    }}
-    [data-testid="stSidebar"] a {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 600;
-    }}
-
-    /* Título "Filtros" na sidebar */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* RÓTULOS DOS FILTROS (Período, Sexo, etc.) – AZUL CLARO
-       Aumentamos a especificidade e usamos !important para ganhar de qualquer regra global */
-    [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stNumberInput label,
-    [data-testid="stSidebar"] .stSelectbox label,
-    [data-testid="stSidebar"] .stMultiSelect label,
-    [data-testid="stSidebar"] .stDateInput label,
-    [data-testid="stSidebar"] .stSlider label,
-    [data-testid="stSidebar"] .stTextInput label {{
-        color: {CORES["azul_sec"]} !important;
-        font-weight: 600 !important;
-    }}
-
-    /* TEXTO E CAMPOS DOS FILTROS – tema claro (padrão azul escuro) */
-    [data-testid="stSidebar"] input,
-    [data-testid="stSidebar"] textarea,
-    [data-testid="stSidebar"] select,
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stNumberInput,
-    [data-testid="stSidebar"] .stSlider,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stTextInput,
-    [data-testid="stSidebar"] .stMultiSelect * {{
-        color: {CORES["azul_sec"]} !important;
-    }}
-
-    /* Campo de período (DateInput) com texto azul claro no modo claro */
-    [data-testid="stSidebar"] .stDateInput input {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Campos de texto, número, select e multiselect: fundo branco */
-    [data-testid="stSidebar"] .stTextInput > div > div,
-    [data-testid="stSidebar"] .stNumberInput > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stMultiSelect > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    /* DateInput (Período) – fundo branco */
-    [data-testid="stSidebar"] .stDateInput > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] input::placeholder,
-    [data-testid="stSidebar"] textarea::placeholder {{
-        color: #2f6bbd !important;
-    }}
-
-    /* OPÇÕES SELECIONADAS (chips) */
-    [data-testid="stSidebar"] .stMultiSelect div[aria-selected="true"],
-    [data-testid="stSidebar"] .stSelectbox div[aria-selected="true"] {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"],
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"] * {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect > div,
-    [data-testid="stSidebar"] .stSelectbox > div,
-    [data-testid="stSidebar"] .stTextInput > div,
-    [data-testid="stSidebar"] .stNumberInput > div,
-    [data-testid="stSidebar"] .stDateInput > div {{
-        border-color: var(--azul-secundario) !important;
-        border-radius: 6px !important;
-    }}
-
-    /* POPUP DO CALENDÁRIO (DateInput) – base: texto claro e fundo escuro */
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"],
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] {{
-        background-color: #222831 !important;
-    }}
-
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] *,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] * {{
-        color: #008cde !important;
-    }}
-
-    /* Dias e cabeçalhos de dia da semana */
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] td,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] th {{
-        color: #004a8d !important;
-    }}
-
-    /* Cabeçalho do calendário: mês, ano e setas em azul */
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] select,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] [role="button"] {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Fundo dos selects de mês/ano */
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] select {{
-        background-color: #393E46 !important;
-    }}
-
-    /* Dia selecionado em destaque */
-    [data-testid="stSidebar"] .stDateInput [aria-selected="true"] {{
-        background-color: {CORES["azul"]} !important;
-        color: #0073cf !important;
-    }}
-
-    /* GRÁFICOS – garantir fundo branco */
-    .js-plotly-plot .plotly .bg,
-    .js-plotly-plot .plotly .plotly-background,
-    .js-plotly-plot .plotly .paper,
-    .js-plotly-plot .plotly .plotbg {{
-        fill: #FFFFFF !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    /* Textos dentro dos gráficos: azul escuro */
-    .js-plotly-plot text {{
-        fill: {CORES["azul"]} !important;
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Borda preta externa em todos os gráficos Plotly */
-    .element-container .js-plotly-plot {{
-        border: 1px solid #000000 !important;
-        border-radius: 4px !important;
-        padding: 4px !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    /* MENU PÁGINAS NA SIDEBAR */
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] span {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {{
-        background-color: rgba(255, 255, 255, 0.12) !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    /* ===========================
-       MODO ESCURO
-       =========================== */
-    @media (prefers-color-scheme: dark) {{
-
-        [data-testid="stSidebar"] input,
-        [data-testid="stSidebar"] textarea,
-        [data-testid="stSidebar"] select,
-        [data-testid="stSidebar"] .stMultiSelect,
-        [data-testid="stSidebar"] .stSelectbox,
-        [data-testid="stSidebar"] .stNumberInput,
-        [data-testid="stSidebar"] .stSlider,
-        [data-testid="stSidebar"] .stDateInput,
-        [data-testid="stSidebar"] .stTextInput,
-        [data-testid="stSidebar"] .stMultiSelect * {{
-            color: #FFFFFF !important;
-        }}
-
-        /* Rótulos dos filtros em azul claro também no modo escuro */
-        [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-        [data-testid="stSidebar"] label,
-        [data-testid="stSidebar"] .stNumberInput label,
-        [data-testid="stSidebar"] .stSelectbox label,
-        [data-testid="stSidebar"] .stMultiSelect label,
-        [data-testid="stSidebar"] .stDateInput label,
-        [data-testid="stSidebar"] .stSlider label,
-        [data-testid="stSidebar"] .stTextInput label {{
-            color: {CORES["azul_sec"]} !important;
-            font-weight: 600 !important;
-        }}
-
-        /* Texto do campo Período */
-        [data-testid="stSidebar"] .stDateInput input {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] input::placeholder,
-        [data-testid="stSidebar"] textarea::placeholder {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"],
-        [data-testid="stSidebar"] ul[role="listbox"] {{
-            background-color: {CORES["azul_sec"]} !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"] *,
-        [data-testid="stSidebar"] ul[role="listbox"] * {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="option"],
-        [data-testid="stSidebar"] li[role="option"] {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="option"][aria-selected="true"],
-        [data-testid="stSidebar"] li[role="option"][aria-selected="true"] {{
-            background-color: rgba(0,0,0,0.2) !important;
-            color: #FFFFFF !important;
-        }}
-
-        /* Reforçar contraste do popup do calendário no modo escuro */
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"],
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] {{
-            background-color: #222831 !important;
-        }}
-
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] *,
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] * {{
-            color: #FFFFFF !important;
-        }}
-
-        /* Cabeçalho do calendário (mês, ano, setas) em azul claro no modo escuro também */
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] select,
-        [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] [role="button"] {{
-            color: {CORES["azul_sec"]} !important;
-        }}
-    }}
-
-    /* Métricas */
-    .stMetric {{
-        background-color: var(--amarelo-ipojuca) !important;
-        padding: 18px;
-        border-radius: 10px;
-        border-left: 6px solid var(--azul-secundario);
-        box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-    }}
-
-    /* Botões */
-    button, .stButton button {{
-        color: #FFFFFF !important;
-        background-color: var(--cinza-claro) !important;
-        border-radius: 6px !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
-
 # ==========================================================
 # TEMA DOS GRÁFICOS PLOTLY – FUNDO BRANCO, TEXTO/LINHAS AZUL ESCURO
 # ==========================================================
@@ -459,16 +155,24 @@ def aplicar_tema_plotly(fig):
 # CARREGAR DADOS
 # ==========================================================
 
-@st.cache_data
-def carregar_dados():
-    url = "https://docs.google.com/spreadsheets/d/1Guru662qCn9bX8iZhckcbRu2nG8my4Eu5l5JK5yTNik/export?format=csv"
-    df = pd.read_csv(url, dtype=str)
-
+@medido()
+def preparar_lote(df):
     # Normaliza colunas (mantendo sua lógica original)
     df.columns = [normalize(c) for c in df.columns]
     df.columns = [c.replace("__", "_") for c in df.columns]
     df.columns = [c.replace("_", " ") for c in df.columns]
+    return df
 
+
+@dataset_compartilhado("trabalhador")
+def carregar_dados():
+    url = url_fonte("trabalhador", "https://docs.google.com/spreadsheets/d/1Guru662qCn9bX8iZhckcbRu2nG8my4Eu5l5JK5yTNik/export?format=csv")
+    df = ler_csv(url, preparar=preparar_lote, dtype=str, usecols=COLUNAS_PUBLICAS)
+    # Convertida uma vez por carga: recriar a coluna a cada rerun invalidaria
+    # os índices dos filtros (memorizados pelos buffers da coluna)
+    col_data = detectar_coluna(df, ["DATA", "OCORR"])
+    if col_data:
+        df[col_data] = pd.to_datetime(df[col_data], errors="coerce")
     return df
 
 
@@ -476,57 +180,24 @@ def carregar_dados():
 # FILTROS
 # ==========================================================
 
+@medido()
 def aplicar_filtros(df, col_data, col_semana, col_sexo, col_idade,
                     col_raca, col_escolaridade, col_bairro,
                     col_ocupacao, col_situacao, col_evol):
 
-    st.sidebar.header("🔎 Filtros")
-    df_filtrado = df.copy()
-
-    # Período
-    min_d, max_d = df_filtrado[col_data].min(), df_filtrado[col_data].max()
-
-    data_ini, data_fim = st.sidebar.date_input(
-        "Período",
-        value=[min_d, max_d],
-        min_value=min_d,
-        max_value=max_d
-    )
-
-    df_filtrado = df_filtrado[
-        (df_filtrado[col_data] >= pd.to_datetime(data_ini)) &
-        (df_filtrado[col_data] <= pd.to_datetime(data_fim))
+    filtros = [
+        Filtro(col_data, "Período", tipo="periodo"),
+        Filtro(col_semana, "Semana Epidemiológica", transformar=extrair_numero),
+        Filtro(col_sexo, "Sexo"),
+        Filtro(col_idade, "Idade"),
+        Filtro(col_raca, "Raça/Cor"),
+        Filtro(col_escolaridade, "Escolaridade"),
+        Filtro(col_ocupacao, "Ocupação"),
+        Filtro(col_situacao, "Situação no Mercado de Trabalho"),
+        Filtro(col_bairro, "Bairro de Ocorrência"),
+        Filtro(col_evol, "Evolução do Caso"),
     ]
-
-    # Semana epidemiológica
-    if col_semana:
-        semanas = df[col_semana].dropna().astype(str).str.extract(r"(\d+)")[0]
-        semanas = semanas.dropna().astype(int).unique()
-        semanas = sorted(semanas)
-
-        semanas_sel = st.sidebar.multiselect("Semana Epidemiológica", semanas)
-
-        if semanas_sel:
-            semanas_df = df_filtrado[col_semana].astype(str).str.extract(r"(\d+)")[0].astype(float)
-            df_filtrado = df_filtrado[semanas_df.isin(semanas_sel)]
-
-    # Multiselect genérico
-    def add_filtro(label, coluna):
-        nonlocal df_filtrado
-        if coluna:
-            opcoes = sorted(df[coluna].dropna().unique())
-            escolhidos = st.sidebar.multiselect(label, opcoes)
-            if escolhidos:
-                df_filtrado = df_filtrado[df_filtrado[coluna].isin(escolhidos)]
-
-    add_filtro("Sexo", col_sexo)
-    add_filtro("Idade", col_idade)
-    add_filtro("Raça/Cor", col_raca)
-    add_filtro("Escolaridade", col_escolaridade)
-    add_filtro("Ocupação", col_ocupacao)
-    add_filtro("Situação no Mercado de Trabalho", col_situacao)
-    add_filtro("Bairro de Ocorrência", col_bairro)
-    add_filtro("Evolução do Caso", col_evol)
+    df_filtrado = painel_filtros(df, filtros, "trabalhador")
 
     if df_filtrado.empty:
         st.warning("Nenhum dado encontrado com os filtros aplicados.")
@@ -539,6 +210,7 @@ def aplicar_filtros(df, col_data, col_semana, col_sexo, col_idade,
 # INDICADORES
 # ==========================================================
 
+@medido()
 def mostrar_indicadores(df_filtrado, col_ocupacao, col_evol):
     st.header("📊 Indicadores Principais")
 
@@ -559,8 +231,11 @@ def mostrar_indicadores(df_filtrado, col_ocupacao, col_evol):
 # GRÁFICOS
 # ==========================================================
 
+@medido()
 def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
                      col_escolaridade, col_bairro, col_evol):
+    import plotly.express as px
+
     st.header("📈 Distribuições")
 
     # Sexo
@@ -576,7 +251,7 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=PALETA
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Raça × Sexo
     if col_raca and col_sexo:
@@ -592,7 +267,7 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=PALETA
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Idade
     if col_idade:
@@ -603,7 +278,7 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=[CORES["azul"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Escolaridade
     if col_escolaridade:
@@ -617,7 +292,7 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=[CORES["azul_sec"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Bairro
     if col_bairro:
@@ -631,7 +306,7 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=[CORES["verde"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
     # Evolução
     if col_evol:
@@ -645,27 +320,32 @@ def mostrar_graficos(df_filtrado, col_sexo, col_raca, col_idade,
             color_discrete_sequence=[CORES["amarelo"]]
         )
         fig = aplicar_tema_plotly(fig)
-        st.plotly_chart(fig, use_container_width=True)
+        plotar(fig)
 
 
 # ==========================================================
 # MAIN
 # ==========================================================
 
+@pagina_medida("trabalhador")
 def main():
-    aplicar_css()
+    aplicar_tema("trabalhador")
 
     st.title("👷 Saúde do Trabalhador - Análise de Acidentes de Trabalho")
 
-    # Carrega dados
-    df = carregar_dados()
+    # Carrega dados (erros da fonte chegam aqui, não no carregador, que
+    # também roda na revalidação em segundo plano)
+    try:
+        df = carregar_dados()
+    except Exception as e:
+        st.error(f"Erro ao carregar a planilha: {e}")
+        st.stop()
     if df.empty:
         st.warning("Nenhum dado encontrado.")
         st.stop()
 
     # Identificar colunas importantes
     COL_DATA = detectar_coluna(df, ["DATA", "OCORR"])
-    df[COL_DATA] = pd.to_datetime(df[COL_DATA], errors="coerce")
 
     COL_SEXO = detectar_coluna(df, ["SEXO"])
     COL_IDADE = detectar_coluna(df, ["IDADE"])
@@ -698,7 +378,7 @@ def main():
 
     # Tabela
     st.header("📋 Dados Filtrados")
-    st.dataframe(df_filtrado, use_container_width=True)
+    tabela_paginada(df_filtrado, "trabalhador_tabela")
 
     st.markdown("---")
     st.caption("Painel de Saúde do Trabalhador • Versão 1.0")
@@ -4,9 +4,18 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import threading
+from importlib.util import find_spec
 from io import BytesIO
 from datetime import datetime, timedelta
-import plotly.express as px
+
+from tema import aplicar_tema
+from utils import (
+    Filtro, aplicar_selecoes, dataset_compartilhado, desenhar_filtros, indice_coluna,
+    intervalo_datas, ler_csv, medido, medir_exportacao, pagina_medida, plotar, projecao_publica,
+    registrar_cache_derivado, registrar_filtros, rotulo_com_contagem, titulo_filtro, url_fonte,
+)
 
 # --------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
@@ -47,300 +56,9 @@ CORES = {
     "branco": "#FFFFFF",
 }
 
-# --------------------------------------------------------
-# CSS — MESMO TEMA DOS OUTROS PAINÉIS
-# --------------------------------------------------------
-def aplicar_css():
-    st.markdown(f"""
-    <style>
-    :root {{
-        --azul-principal: {CORES["azul"]};
-        --azul-secundario: {CORES["azul_sec"]};
-        --verde-ipojuca: {CORES["verde"]};
-        --amarelo-ipojuca: {CORES["amarelo"]};
-        --cinza-claro: {CORES["cinza_claro"]};
-        --branco: {CORES["branco"]};
-    }}
-
-    /* Texto principal da área central */
-    [data-testid="stAppViewContainer"] body,
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li,
-    [data-testid="stAppViewContainer"] span,
-    [data-testid="stAppViewContainer"] label,
-    [data-testid="stAppViewContainer"] .stMarkdown {{
-        color: #0073CF !important;
-    }}
-
-    /* Títulos amarelos na área principal */
-    [data-testid="stAppViewContainer"] h1,
-    [data-testid="stAppViewContainer"] h2,
-    [data-testid="stAppViewContainer"] h3,
-    [data-testid="stAppViewContainer"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* Parágrafos justificados */
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li {{
-        text-align: justify !important;
-    }}
-
-    /* Fundo geral */
-    [data-testid="stAppViewContainer"] {{
-        background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-    }}
-
-    /* Sidebar */
-    [data-testid="stSidebar"] {{
-        background: var(--azul-principal) !important;
-    }}
-    [data-testid="stSidebar"] a {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 600;
-    }}
-
-    /* Título "Filtros" na sidebar */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* RÓTULOS DOS FILTROS (Markdown + labels) – AZUL CLARO */
-    [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stNumberInput label,
-    [data-testid="stSidebar"] .stSelectbox label,
-    [data-testid="stSidebar"] .stMultiSelect label,
-    [data-testid="stSidebar"] .stDateInput label,
-    [data-testid="stSidebar"] .stSlider label,
-    [data-testid="stSidebar"] .stTextInput label {{
-        color: {CORES["azul_sec"]} !important;
-        font-weight: 600 !important;
-    }}
-
-    /* Ajuste de espaçamento: encostar títulos (markdown) nas caixas */
-    [data-testid="stSidebar"] .stMarkdown p {{
-        margin-top: 0 !important;
-        margin-bottom: 0 !important;
-    }}
-    [data-testid="stSidebar"] .stMarkdown + div,
-    [data-testid="stSidebar"] .stMarkdown + .stMultiSelect,
-    [data-testid="stSidebar"] .stMarkdown + .stSelectbox,
-    [data-testid="stSidebar"] .stMarkdown + .stDateInput,
-    [data-testid="stSidebar"] .stMarkdown + .stNumberInput {{
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }}
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stNumberInput {{
-        margin-bottom: 4px !important;
-    }}
-
-    /* TEXTO E CAMPOS DOS FILTROS – tema claro (padrão azul escuro) */
-    [data-testid="stSidebar"] input,
-    [data-testid="stSidebar"] textarea,
-    [data-testid="stSidebar"] select,
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stNumberInput,
-    [data-testid="stSidebar"] .stSlider,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stTextInput,
-    [data-testid="stSidebar"] .stMultiSelect * {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Campo de período (DateInput) com texto azul claro no modo claro */
-    [data-testid="stSidebar"] .stDateInput input {{
-        color: {CORES["azul_sec"]} !important;
-    }}
-
-    /* Campos de texto, número, select e multiselect: fundo branco no modo claro */
-    [data-testid="stSidebar"] .stTextInput > div > div,
-    [data-testid="stSidebar"] .stNumberInput > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stMultiSelect > div > div,
-    [data-testid="stSidebar"] .stDateInput > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] input::placeholder,
-    [data-testid="stSidebar"] textarea::placeholder {{
-        color: #2f6bbd !important;
-    }}
-
-    /* OPÇÕES SELECIONADAS (chips) */
-    [data-testid="stSidebar"] .stMultiSelect div[aria-selected="true"],
-    [data-testid="stSidebar"] .stSelectbox div[aria-selected="true"] {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"],
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"] * {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect > div,
-    [data-testid="stSidebar"] .stSelectbox > div,
-    [data-testid="stSidebar"] .stTextInput > div,
-    [data-testid="stSidebar"] .stNumberInput > div,
-    [data-testid="stSidebar"] .stDateInput > div {{
-        border-color: var(--azul-secundario) !important;
-        border-radius: 6px !important;
-    }}
-
-    /* POPUP DO CALENDÁRIO (DateInput) */
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"],
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] {{
-        background-color: #222831 !important;
-    }}
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] *,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] * {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] td,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="calendar"] th {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] select,
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] [role="button"] {{
-        color: {CORES["azul_sec"]} !important;
-    }}
-    [data-testid="stSidebar"] .stDateInput [data-baseweb="datepicker"] select {{
-        background-color: #393E46 !important;
-    }}
-    [data-testid="stSidebar"] .stDateInput [aria-selected="true"] {{
-        background-color: {CORES["azul_sec"]} !important;
-        color: #FFFFFF !important;
-    }}
-
-    /* GRÁFICOS */
-    .js-plotly-plot .plotly .bg,
-    .js-plotly-plot .plotly .plotly-background,
-    .js-plotly-plot .plotly .paper,
-    .js-plotly-plot .plotly .plotbg {{
-        fill: #FFFFFF !important;
-        background-color: #FFFFFF !important;
-    }}
-    .js-plotly-plot text {{
-        fill: {CORES["azul"]} !important;
-        color: {CORES["azul"]} !important;
-    }}
-    .element-container .js-plotly-plot {{
-        border: 1px solid #000000 !important;
-        border-radius: 4px !important;
-        padding: 4px !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    /* MENU PÁGINAS NA SIDEBAR (multipage) */
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] span {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {{
-        background-color: rgba(255, 255, 255, 0.12) !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    /* ===========================
-       MODO ESCURO
-       =========================== */
-    @media (prefers-color-scheme: dark) {{
-        [data-testid="stSidebar"] input,
-        [data-testid="stSidebar"] textarea,
-        [data-testid="stSidebar"] select,
-        [data-testid="stSidebar"] .stMultiSelect,
-        [data-testid="stSidebar"] .stSelectbox,
-        [data-testid="stSidebar"] .stNumberInput,
-        [data-testid="stSidebar"] .stSlider,
-        [data-testid="stSidebar"] .stDateInput,
-        [data-testid="stSidebar"] .stTextInput,
-        [data-testid="stSidebar"] .stMultiSelect * {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-        [data-testid="stSidebar"] label,
-        [data-testid="stSidebar"] .stNumberInput label,
-        [data-testid="stSidebar"] .stSelectbox label,
-        [data-testid="stSidebar"] .stMultiSelect label,
-        [data-testid="stSidebar"] .stDateInput label,
-        [data-testid="stSidebar"] .stSlider label,
-        [data-testid="stSidebar"] .stTextInput label {{
-            color: {CORES["azul_sec"]} !important;
-            font-weight: 600 !important;
-        }}
-
-        [data-testid="stSidebar"] .stTextInput > div > div,
-        [data-testid="stSidebar"] .stNumberInput > div > div,
-        [data-testid="stSidebar"] .stSelectbox > div > div,
-        [data-testid="stSidebar"] .stMultiSelect > div > div,
-        [data-testid="stSidebar"] .stDateInput > div > div {{
-            background-color: #1F2933 !important;
-            border-radius: 6px !important;
-        }}
-
-        [data-testid="stSidebar"] .stDateInput input {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] input::placeholder,
-        [data-testid="stSidebar"] textarea::placeholder {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"],
-        [data-testid="stSidebar"] ul[role="listbox"] {{
-            background-color: #1F2933 !important;
-        }}
-        [data-testid="stSidebar"] div[role="listbox"] *,
-        [data-testid="stSidebar"] ul[role="listbox"] * {{
-            color: #FFFFFF !important;
-        }}
-        [data-testid="stSidebar"] div[role="option"],
-        [data-testid="stSidebar"] li[role="option"] {{
-            color: #FFFFFF !important;
-        }}
-        [data-testid="stSidebar"] div[role="option"][aria-selected="true"],
-        [data-testid="stSidebar"] li[role="option"][aria-selected="true"] {{
-            background-color: rgba(0,0,0,0.2) !important;
-            color: #FFFFFF !important;
-        }}
-    }}
-
-    /* Métricas */
-    .stMetric {{
-        background-color: var(--amarelo-ipojuca) !important;
-        padding: 18px;
-        border-radius: 10px;
-        border-left: 6px solid var(--azul-secundario);
-        box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-    }}
-
-    /* Botões */
-    button, .stButton button {{
-        color: #FFFFFF !important;
-        background-color: var(--cinza-claro) !important;
-        border-radius: 6px !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+# Nome e endereço dos estabelecimentos são públicos; só os dados pessoais
+# (CPF, telefone, nascimento) são descartados já na leitura
+COLUNAS_PUBLICAS = projecao_publica(tokens=["CPF", "TELEFONE", "CELULAR", "NASCIMENTO", "NASC"])
 
 # --------------------------------------------------------
 # HELPERS
@@ -357,19 +75,8 @@ def converter_para_csv(url: str) -> str | None:
     return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
 
 
-@st.cache_data(ttl=600)
-def carregar_planilha_google(url_original: str) -> pd.DataFrame:
-    url_csv = converter_para_csv(url_original)
-    if not url_csv:
-        st.error("URL do Google Sheets inválida.")
-        return pd.DataFrame()
-
-    try:
-        df = pd.read_csv(url_csv)
-    except Exception as e:
-        st.error(f"Erro ao carregar planilha: {e}")
-        return pd.DataFrame()
-
+@medido()
+def preparar_lote(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [str(c).strip() for c in df.columns]
 
     for col in ["ENTRADA", "1ª INSPEÇÃO", "DATA CONCLUSÃO"]:
@@ -397,6 +104,14 @@ def carregar_planilha_google(url_original: str) -> pd.DataFrame:
     return df
 
 
+@dataset_compartilhado("visa", ttl=600)
+def carregar_planilha_google(url_original: str) -> pd.DataFrame:
+    url_csv = url_fonte("visa", converter_para_csv(url_original))
+    if not url_csv:
+        raise ValueError("URL do Google Sheets inválida.")
+    return ler_csv(url_csv, preparar=preparar_lote, usecols=COLUNAS_PUBLICAS)
+
+
 def detectar_coluna(df, candidatos):
     for c in candidatos:
         if c in df.columns:
@@ -404,6 +119,7 @@ def detectar_coluna(df, candidatos):
     return None
 
 
+@medir_exportacao("visa")
 def gerar_excel_bytes(dfs: dict):
     out = BytesIO()
     with pd.ExcelWriter(out, engine="openpyxl") as writer:
@@ -419,125 +135,82 @@ def gerar_excel_bytes(dfs: dict):
 # --------------------------------------------------------
 # FILTROS
 # --------------------------------------------------------
+@medido()
 def aplicar_filtros(df: pd.DataFrame) -> pd.DataFrame:
     st.sidebar.header("Filtros")
 
     # Período (radio)
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:4px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Período</p>",
-        unsafe_allow_html=True
+    titulo_filtro("Período")
+    modo = st.sidebar.radio(
+        "Período", ["Ano/Mês", "Intervalo de datas"], key="filtro_visa_modo", label_visibility="collapsed"
     )
-    modo = st.sidebar.radio(label="", options=["Ano/Mês", "Intervalo de datas"])
 
     # Ano
-    anos = sorted(df["ANO_ENTRADA"].dropna().unique()) if "ANO_ENTRADA" in df.columns else []
+    indice_ano = indice_coluna(df["ANO_ENTRADA"])
+    anos = indice_ano.valores
     ANO_ATUAL = datetime.now().year
     if not anos:
         anos = [ANO_ATUAL]
     ano_sel = ANO_ATUAL if ANO_ATUAL in anos else anos[0]
 
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Ano</p>",
-        unsafe_allow_html=True
+    titulo_filtro("Ano")
+    ano = st.sidebar.selectbox(
+        "Ano", anos, index=anos.index(ano_sel), key="filtro_visa_ano", label_visibility="collapsed"
     )
-    ano = st.sidebar.selectbox(label="", options=anos, index=anos.index(ano_sel))
 
     # Mês OU intervalo de datas
     if modo == "Ano/Mês":
-        st.sidebar.markdown(
-            f"<p style='margin-bottom:0px; margin-top:8px; "
-            f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-            f"Mês</p>",
-            unsafe_allow_html=True
-        )
-        meses = sorted(df[df["ANO_ENTRADA"] == ano]["MES_ENTRADA"].dropna().unique())
+        # Meses do ano escolhido, direto dos códigos já fatorados
+        indice_mes = indice_coluna(df["MES_ENTRADA"])
+        do_ano = indice_ano.codigos == indice_ano.posicoes.get(ano, -2)
+        codigos = indice_mes.codigos[do_ano]
+        por_mes = np.bincount(codigos[codigos >= 0], minlength=len(indice_mes.valores))
+        meses = [m for m, n in zip(indice_mes.valores, por_mes) if n]
+
+        titulo_filtro("Mês")
         mes_sel = st.sidebar.multiselect(
-            label="",
-            options=meses,
-            default=meses,
-            format_func=lambda m: NOME_MESES.get(m, str(m)),
+            "Mês", meses, default=meses,
+            format_func=rotulo_com_contagem(
+                lambda m: NOME_MESES.get(m, str(m)), dict(zip(indice_mes.valores, por_mes.tolist()))
+            ),
+            # Um widget por ano: ao trocar o ano, os meses voltam a vir todos marcados
+            key=f"filtro_visa_mes_{ano}", label_visibility="collapsed",
         )
+        periodo = [
+            Filtro("ANO_ENTRADA", "Ano", obrigatorio=True),
+            Filtro("MES_ENTRADA", "Mês", obrigatorio=True),
+        ]
+        selecoes = {"ANO_ENTRADA": [ano], "MES_ENTRADA": mes_sel}
     else:
         if "ENTRADA" not in df.columns or df["ENTRADA"].isna().all():
             st.error("Não há dados de data de entrada para filtrar por intervalo.")
             st.stop()
 
-        min_data = df["ENTRADA"].min().date()
-        max_data = df["ENTRADA"].max().date()
+        _, min_data, max_data = intervalo_datas(df["ENTRADA"])
 
-        st.sidebar.markdown(
-            f"<p style='margin-bottom:0px; margin-top:8px; "
-            f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-            f"Data de Início</p>",
-            unsafe_allow_html=True
-        )
+        titulo_filtro("Data de Início")
         inicio = st.sidebar.date_input(
-            label="",
-            value=min_data,
-            min_value=min_data,
-            max_value=max_data
+            "Data de Início", value=min_data, min_value=min_data, max_value=max_data,
+            key="filtro_visa_inicio", label_visibility="collapsed",
         )
 
-        st.sidebar.markdown(
-            f"<p style='margin-bottom:0px; margin-top:8px; "
-            f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-            f"Data de Fim</p>",
-            unsafe_allow_html=True
-        )
+        titulo_filtro("Data de Fim")
         fim = st.sidebar.date_input(
-            label=" ",
-            value=max_data,
-            min_value=min_data,
-            max_value=max_data
+            "Data de Fim", value=max_data, min_value=min_data, max_value=max_data,
+            key="filtro_visa_fim", label_visibility="collapsed",
         )
+        periodo = [Filtro("ENTRADA", "Intervalo de datas", tipo="periodo")]
+        selecoes = {"ENTRADA": (inicio, fim)}
 
-    # Classificação (Risco)
-    riscos = sorted(df["CLASSIFICAÇÃO"].dropna().unique()) if "CLASSIFICAÇÃO" in df.columns else []
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:12px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Classificação (Risco)</p>",
-        unsafe_allow_html=True
-    )
-    sel_risco = st.sidebar.multiselect(label="", options=riscos, default=riscos)
-
-    # Semana Epidemiológica
-    if "SE_SEMANA" in df.columns:
-        semanas = sorted(df["SE_SEMANA"].dropna().unique())
-    else:
-        semanas = []
-
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Semana Epidemiológica</p>",
-        unsafe_allow_html=True
-    )
-    sel_se = st.sidebar.multiselect(label="", options=semanas, default=semanas)
-
-    # Aplicação dos filtros
-    filtro_df = df.copy()
-
-    if modo == "Ano/Mês":
-        filtro_df = filtro_df[
-            (filtro_df["ANO_ENTRADA"] == ano) &
-            (filtro_df["MES_ENTRADA"].isin(mes_sel))
-        ]
-    else:
-        filtro_df = filtro_df[
-            (filtro_df["ENTRADA"].dt.date >= inicio) &
-            (filtro_df["ENTRADA"].dt.date <= fim)
-        ]
-
-    if sel_risco and "CLASSIFICAÇÃO" in filtro_df.columns:
-        filtro_df = filtro_df[filtro_df["CLASSIFICAÇÃO"].isin(sel_risco)]
+    # As opções de risco e semana já refletem o período escolhido
+    filtros = periodo + [
+        Filtro("CLASSIFICAÇÃO", "Classificação (Risco)", todos=True),
+        Filtro("SE_SEMANA", "Semana Epidemiológica", todos=True),
+    ]
+    selecoes = desenhar_filtros(df, filtros, "visa", fixas=selecoes)
 
-    if sel_se and "SE_SEMANA" in filtro_df.columns:
-        filtro_df = filtro_df[filtro_df["SE_SEMANA"].isin(sel_se)]
+    registrar_filtros({"Modo": modo})
+    filtro_df = aplicar_selecoes(df, filtros, selecoes)
 
     if filtro_df.empty:
         st.warning("Nenhum dado encontrado com os filtros aplicados.")
@@ -549,6 +222,7 @@ def aplicar_filtros(df: pd.DataFrame) -> pd.DataFrame:
 # --------------------------------------------------------
 # INDICADORES E TABELA
 # --------------------------------------------------------
+@medido()
 def calcular_indicadores(filtro_df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
     filtro_df["DEADLINE_30"] = filtro_df["ENTRADA"] + timedelta(days=30)
     filtro_df["DEADLINE_90"] = filtro_df["ENTRADA"] + timedelta(days=90)
@@ -618,31 +292,257 @@ def mostrar_tabela_e_kpis(tabela: pd.DataFrame, kpis: dict):
     c3.metric("% Conclusões ≤ 90 dias", f"{kpis['p90']}%")
 
 
+# --------------------------------------------------------
+# BACKLOG, ENVELHECIMENTO E TEMPOS DE ATENDIMENTO
+# --------------------------------------------------------
+SEM_DATA = np.iinfo(np.int64).min
+
+LIMITES_AGING = [30, 60, 90, 180]
+ROTULOS_AGING = ["Até 30 dias", "31 a 60 dias", "61 a 90 dias", "91 a 180 dias", "Mais de 180 dias"]
+PERCENTIS = [50, 75, 90, 95]
+
+
+def _dias(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Datas da coluna como dias desde 1970-01-01 (int64); ausentes viram SEM_DATA."""
+    if col not in df.columns:
+        return np.full(len(df), SEM_DATA, dtype=np.int64)
+    valores = pd.to_datetime(df[col], errors="coerce").to_numpy(dtype="datetime64[D]")
+    dias = valores.astype(np.int64)
+    dias[np.isnat(valores)] = SEM_DATA
+    return dias
+
+
+class SnapshotsBacklog:
+    """
+    Série diária de processos em aberto, mantida de forma incremental.
+
+    Um processo está aberto no dia d se ENTRADA <= d e não foi concluído até d.
+    Cada par (ENTRADA, DATA CONCLUSÃO) vira um evento +1 no dia da entrada e -1
+    no dia da conclusão. Entre uma carga e outra só a diferença entre os pares
+    antigos e os novos gera eventos, e o acumulado é refeito apenas a partir do
+    primeiro dia afetado. Com a mesma versão dos dados e o mesmo dia, a série
+    anterior é devolvida sem reler o DataFrame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pares = pd.Series(
+            dtype=np.int64,
+            index=pd.MultiIndex.from_arrays([[], []], names=["e", "c"])
+        )
+        self._dia0 = None
+        self._eventos = np.zeros(0, dtype=np.int64)
+        self._abertos = np.zeros(0, dtype=np.int64)
+        self._ultima = None   # (versao, hoje, série)
+
+    def _estender(self, dia_ini: int, dia_fim: int):
+        if self._dia0 is None:
+            self._dia0 = dia_ini
+        if dia_ini < self._dia0:
+            pad = self._dia0 - dia_ini
+            self._eventos = np.concatenate([np.zeros(pad, dtype=np.int64), self._eventos])
+            self._abertos = np.concatenate([np.zeros(pad, dtype=np.int64), self._abertos])
+            self._dia0 = dia_ini
+        tamanho = dia_fim - self._dia0 + 1
+        if tamanho > len(self._eventos):
+            extra = tamanho - len(self._eventos)
+            ultimo = self._abertos[-1] if len(self._abertos) else 0
+            self._eventos = np.concatenate([self._eventos, np.zeros(extra, dtype=np.int64)])
+            self._abertos = np.concatenate([self._abertos, np.full(extra, ultimo, dtype=np.int64)])
+
+    def atualizar(self, df: pd.DataFrame, hoje: int, versao: str | None = None) -> pd.Series:
+        with self._lock:
+            if versao and self._ultima is not None and self._ultima[:2] == (versao, hoje):
+                return self._ultima[2]
+
+        entrada = _dias(df, "ENTRADA")
+        conclusao = _dias(df, "DATA CONCLUSÃO")
+        validos = entrada != SEM_DATA
+        entrada, conclusao = entrada[validos], conclusao[validos]
+        concluido = conclusao != SEM_DATA
+        conclusao = np.where(concluido, np.maximum(conclusao, entrada), SEM_DATA)
+
+        pares = pd.DataFrame({"e": entrada, "c": conclusao}).value_counts()
+
+        with self._lock:
+            delta = pares.sub(self._pares, fill_value=0)
+            delta = delta[delta != 0].astype(np.int64)
+            self._pares = pares
+
+            if len(delta) or self._dia0 is None:
+                e = delta.index.get_level_values("e").to_numpy(dtype=np.int64)
+                c = delta.index.get_level_values("c").to_numpy(dtype=np.int64)
+                peso = delta.to_numpy()
+                fechou = c != SEM_DATA
+
+                dia_ini = int(e.min()) if len(e) else hoje
+                dia_fim = int(c[fechou].max()) if fechou.any() else hoje
+                self._estender(min(dia_ini, hoje), max(dia_fim, hoje))
+
+                np.add.at(self._eventos, e - self._dia0, peso)
+                np.add.at(self._eventos, c[fechou] - self._dia0, -peso[fechou])
+
+                i0 = int(e.min() - self._dia0) if len(e) else 0
+                base = self._abertos[i0 - 1] if i0 > 0 else 0
+                self._abertos[i0:] = base + np.cumsum(self._eventos[i0:])
+            else:
+                self._estender(hoje, hoje)
+
+            abertos = self._abertos[:hoje - self._dia0 + 1].copy()
+            indice = pd.date_range(pd.Timestamp(self._dia0, unit="D"), periods=len(abertos), freq="D")
+            serie = pd.Series(abertos, index=indice, name="Abertos")
+            self._ultima = (versao, hoje, serie)
+            return serie
+
+    def tamanho_bytes(self) -> int:
+        with self._lock:
+            return (
+                int(self._pares.memory_usage(index=True, deep=True))
+                + self._eventos.nbytes + self._abertos.nbytes
+                + (self._ultima[2].nbytes if self._ultima is not None else 0)
+            )
+
+
+@st.cache_resource
+def snapshots_backlog() -> SnapshotsBacklog:
+    snapshots = SnapshotsBacklog()
+    registrar_cache_derivado("visa:snapshots_backlog", snapshots.tamanho_bytes)
+    return snapshots
+
+
+def calcular_aging(filtro_df: pd.DataFrame, hoje: int) -> pd.DataFrame:
+    entrada = _dias(filtro_df, "ENTRADA")
+    conclusao = _dias(filtro_df, "DATA CONCLUSÃO")
+    abertos = (entrada != SEM_DATA) & (conclusao == SEM_DATA)
+    idade = hoje - entrada[abertos]
+    faixa = np.searchsorted(LIMITES_AGING, idade, side="left")
+    contagem = np.bincount(faixa, minlength=len(ROTULOS_AGING))
+    return pd.DataFrame({"Faixa": ROTULOS_AGING, "Processos": contagem})
+
+
+def calcular_tempos(filtro_df: pd.DataFrame) -> dict[str, np.ndarray]:
+    entrada = _dias(filtro_df, "ENTRADA")
+    tempos = {}
+    for nome, col in [("Até a 1ª inspeção", "1ª INSPEÇÃO"), ("Até a conclusão", "DATA CONCLUSÃO")]:
+        fim = _dias(filtro_df, col)
+        ok = (entrada != SEM_DATA) & (fim != SEM_DATA) & (fim >= entrada)
+        tempos[nome] = fim[ok] - entrada[ok]
+    return tempos
+
+
+def tabela_percentis(tempos: dict[str, np.ndarray]) -> pd.DataFrame:
+    linhas = []
+    for nome, dias in tempos.items():
+        valores = np.percentile(dias, PERCENTIS) if len(dias) else np.full(len(PERCENTIS), np.nan)
+        linha = {"Intervalo": nome, "Processos": len(dias)}
+        linha.update({f"P{p} (dias)": round(float(v), 1) for p, v in zip(PERCENTIS, valores)})
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def _layout_grafico(fig):
+    fig.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font=dict(color=CORES["azul"]),
+        xaxis=dict(showgrid=False, linecolor="black", tickfont=dict(color=CORES["azul"])),
+        yaxis=dict(showgrid=True, gridcolor="#DDDDDD", linecolor="black", tickfont=dict(color=CORES["azul"])),
+        legend=dict(font=dict(color=CORES["azul"]))
+    )
+    return fig
+
+
+@medido()
+def mostrar_backlog(df: pd.DataFrame, filtro_df: pd.DataFrame):
+    import plotly.express as px
+
+    if "ENTRADA" not in df.columns:
+        return
+
+    st.subheader("⏳ Backlog e Tempos de Atendimento")
+
+    hoje = int(np.datetime64(datetime.now().date(), "D").astype(np.int64))
+    versao = carregar_planilha_google.versao(GOOGLE_SHEETS_URL)
+    historico = snapshots_backlog().atualizar(df, hoje, versao)
+    aging = calcular_aging(filtro_df, hoje)
+    tempos = calcular_tempos(filtro_df)
+    percentis = tabela_percentis(tempos)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Processos em aberto (período)", int(aging["Processos"].sum()))
+    med_insp = percentis.loc[0, "P50 (dias)"]
+    med_conc = percentis.loc[1, "P50 (dias)"]
+    c2.metric("Mediana até a 1ª inspeção", f"{med_insp:g} dias" if pd.notna(med_insp) else "—")
+    c3.metric("Mediana até a conclusão", f"{med_conc:g} dias" if pd.notna(med_conc) else "—")
+
+    fig_hist = px.line(
+        historico.rename_axis("Dia").reset_index(),
+        x="Dia",
+        y="Abertos",
+        title="Processos em aberto por dia (todos os processos)",
+        color_discrete_sequence=[CORES["azul"]]
+    )
+    plotar(_layout_grafico(fig_hist))
+
+    fig_aging = px.bar(
+        aging,
+        x="Faixa",
+        y="Processos",
+        title="Envelhecimento dos processos em aberto",
+        color_discrete_sequence=[CORES["verde"]]
+    )
+    plotar(_layout_grafico(fig_aging))
+
+    st.dataframe(percentis, use_container_width=True, hide_index=True)
+
+    dist = pd.concat(
+        [pd.DataFrame({"Intervalo": nome, "Dias": dias}) for nome, dias in tempos.items()],
+        ignore_index=True
+    )
+    if not dist.empty:
+        fig_dist = px.histogram(
+            dist,
+            x="Dias",
+            color="Intervalo",
+            barmode="overlay",
+            nbins=40,
+            title="Distribuição dos tempos de atendimento",
+            color_discrete_sequence=[CORES["azul_sec"], CORES["amarelo"]]
+        )
+        plotar(_layout_grafico(fig_dist))
+
+
 # --------------------------------------------------------
 # DOWNLOAD
 # --------------------------------------------------------
+@medido()
 def mostrar_download(filtro_df: pd.DataFrame, tabela: pd.DataFrame):
-    try:
-        excel_bytes = gerar_excel_bytes({"dados_filtrados": filtro_df, "tabela": tabela})
-        st.download_button(
-            "📥 Baixar Excel",
-            data=excel_bytes,
-            file_name="relatorio_visa.xlsx",
-        )
-    except Exception:
+    if find_spec("openpyxl") is None:
         st.info("📁 O download do Excel não está disponível neste ambiente.")
+        return
+    # Excel gerado só quando o usuário clica
+    st.download_button(
+        "📥 Baixar Excel",
+        data=lambda: gerar_excel_bytes({"dados_filtrados": filtro_df, "tabela": tabela}),
+        file_name="relatorio_visa.xlsx",
+    )
 
 
 # --------------------------------------------------------
 # MAIN
 # --------------------------------------------------------
+@pagina_medida("visa")
 def main():
-    aplicar_css()
+    aplicar_tema("visa")
 
     st.session_state["user"] = "default"
     st.session_state["role"] = "standard"
 
-    df = carregar_planilha_google(GOOGLE_SHEETS_URL)
+    try:
+        df = carregar_planilha_google(GOOGLE_SHEETS_URL)
+    except Exception as e:
+        st.error(f"Erro ao carregar planilha: {e}")
+        st.stop()
     if df.empty:
         st.error("Nenhum dado encontrado.")
         st.stop()
@@ -655,6 +555,8 @@ def main():
     tabela, kpis = calcular_indicadores(filtro_df)
     mostrar_tabela_e_kpis(tabela, kpis)
 
+    mostrar_backlog(df, filtro_df)
+
     mostrar_download(filtro_df, tabela)
 
     st.caption("Painel VISA Ipojuca – Acesso público")
@@ -3,9 +3,14 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import unicodedata
 
+from tema import aplicar_tema
+from utils import (
+    Filtro, dataset_compartilhado, ler_csv, medido, pagina_medida, painel_filtros, para_data,
+    plotar, projecao_publica, tabela_paginada, url_fonte,
+)
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -37,253 +42,9 @@ PALETA = [
     CORES["azul_sec"],
 ]
 
-# ---------------------------------------------------------
-# CSS – MESMO ESTILO DOS OUTROS PAINÉIS (MENU PADRÃO)
-# ---------------------------------------------------------
-def aplicar_css():
-    st.markdown(f"""
-    <style>
-    :root {{
-        --azul-principal: {CORES["azul"]};
-        --azul-secundario: {CORES["azul_sec"]};
-        --verde-ipojuca: {CORES["verde"]};
-        --amarelo-ipojuca: {CORES["amarelo"]};
-        --cinza-claro: {CORES["cinza_claro"]};
-        --branco: {CORES["branco"]};
-    }}
-
-    /* Texto principal da área central */
-    [data-testid="stAppViewContainer"] body,
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li,
-    [data-testid="stAppViewContainer"] span,
-    [data-testid="stAppViewContainer"] label,
-    [data-testid="stAppViewContainer"] .stMarkdown {{
-        color: #0073CF !important;
-    }}
-
-    /* Títulos amarelos na área principal */
-    [data-testid="stAppViewContainer"] h1,
-    [data-testid="stAppViewContainer"] h2,
-    [data-testid="stAppViewContainer"] h3,
-    [data-testid="stAppViewContainer"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* Parágrafos justificados */
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li {{
-        text-align: justify !important;
-    }}
-
-    /* Fundo geral */
-    [data-testid="stAppViewContainer"] {{
-        background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-    }}
-
-    /* Sidebar (fundo azul) */
-    [data-testid="stSidebar"] {{
-        background: var(--azul-principal) !important;
-    }}
-    [data-testid="stSidebar"] a {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 600;
-    }}
-
-    /* MENU DE NAVEGAÇÃO */
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] span {{
-        color: #FFFFFF !important;
-    }}
-
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {{
-        background-color: rgba(255, 255, 255, 0.12) !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    /* Título "Filtros" na sidebar */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* RÓTULOS DOS FILTROS – AZUL CLARO */
-    [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stNumberInput label,
-    [data-testid="stSidebar"] .stSelectbox label,
-    [data-testid="stSidebar"] .stMultiSelect label,
-    [data-testid="stSidebar"] .stDateInput label,
-    [data-testid="stSidebar"] .stSlider label,
-    [data-testid="stSidebar"] .stTextInput label {{
-        color: {CORES["azul_sec"]} !important;
-        font-weight: 600 !important;
-    }}
-
-    /* TEXTO E CAMPOS DOS FILTROS – tema claro */
-    [data-testid="stSidebar"] input,
-    [data-testid="stSidebar"] textarea,
-    [data-testid="stSidebar"] select,
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stNumberInput,
-    [data-testid="stSidebar"] .stSlider,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stTextInput,
-    [data-testid="stSidebar"] .stMultiSelect * {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Campos: fundo branco no modo claro */
-    [data-testid="stSidebar"] .stTextInput > div > div,
-    [data-testid="stSidebar"] .stNumberInput > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stMultiSelect > div > div,
-    [data-testid="stSidebar"] .stDateInput > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] input::placeholder,
-    [data-testid="stSidebar"] textarea::placeholder {{
-        color: #2f6bbd !important;
-    }}
-
-    /* Chips/opções selecionadas em multiselect (fundo verde, texto branco) */
-    [data-testid="stSidebar"] .stMultiSelect div[aria-selected="true"],
-    [data-testid="stSidebar"] .stSelectbox div[aria-selected="true"] {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"],
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"] * {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    /* Borda dos campos de filtro em azul */
-    [data-testid="stSidebar"] .stMultiSelect > div,
-    [data-testid="stSidebar"] .stSelectbox > div,
-    [data-testid="stSidebar"] .stTextInput > div,
-    [data-testid="stSidebar"] .stNumberInput > div,
-    [data-testid="stSidebar"] .stDateInput > div {{
-        border-color: {CORES["azul_sec"]} !important;
-        border-radius: 6px !important;
-    }}
-
-    /* GRÁFICOS – CSS de segurança */
-    .js-plotly-plot .plotly .bg,
-    .js-plotly-plot .plotly .plotly-background,
-    .js-plotly-plot .plotly .paper,
-    .js-plotly-plot .plotly .plotbg {{
-        fill: #FFFFFF !important;
-        background-color: #FFFFFF !important;
-    }}
-    .js-plotly-plot text {{
-        fill: {CORES["azul"]} !important;
-        color: {CORES["azul"]} !important;
-    }}
-    .element-container .js-plotly-plot {{
-        border: 1px solid #000000 !important;
-        border-radius: 4px !important;
-        padding: 4px !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    /* ===========================
-       MODO ESCURO
-       =========================== */
-    @media (prefers-color-scheme: dark) {{
-
-        [data-testid="stSidebar"] input,
-        [data-testid="stSidebar"] textarea,
-        [data-testid="stSidebar"] select,
-        [data-testid="stSidebar"] .stMultiSelect,
-        [data-testid="stSidebar"] .stSelectbox,
-        [data-testid="stSidebar"] .stNumberInput,
-        [data-testid="stSidebar"] .stSlider,
-        [data-testid="stSidebar"] .stDateInput,
-        [data-testid="stSidebar"] .stTextInput,
-        [data-testid="stSidebar"] .stMultiSelect * {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-        [data-testid="stSidebar"] label,
-        [data-testid="stSidebar"] .stNumberInput label,
-        [data-testid="stSidebar"] .stSelectbox label,
-        [data-testid="stSidebar"] .stMultiSelect label,
-        [data-testid="stSidebar"] .stDateInput label,
-        [data-testid="stSidebar"] .stSlider label,
-        [data-testid="stSidebar"] .stTextInput label {{
-            color: {CORES["azul_sec"]} !important;
-            font-weight: 600 !important;
-        }}
-
-        [data-testid="stSidebar"] .stTextInput > div > div,
-        [data-testid="stSidebar"] .stNumberInput > div > div,
-        [data-testid="stSidebar"] .stSelectbox > div > div,
-        [data-testid="stSidebar"] .stMultiSelect > div > div,
-        [data-testid="stSidebar"] .stDateInput > div > div {{
-            background-color: #1F2933 !important;
-            border-radius: 6px !important;
-        }}
-
-        [data-testid="stSidebar"] input::placeholder,
-        [data-testid="stSidebar"] textarea::placeholder {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"],
-        [data-testid="stSidebar"] ul[role="listbox"] {{
-            background-color: #1F2933 !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"] *,
-        [data-testid="stSidebar"] ul[role="listbox"] * {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="option"],
-        [data-testid="stSidebar"] li[role="option"] {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="option"][aria-selected="true"],
-        [data-testid="stSidebar"] li[role="option"][aria-selected="true"] {{
-            background-color: rgba(0,0,0,0.2) !important;
-            color: #FFFFFF !important;
-        }}
-    }}
-
-    /* Métricas */
-    .stMetric {{
-        background-color: var(--amarelo-ipojuca) !important;
-        padding: 18px;
-        border-radius: 10px;
-        border-left: 6px solid var(--azul-secundario);
-        box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-    }}
-
-    /* Botões */
-    button, .stButton button {{
-        color: #FFFFFF !important;
-        background-color: var(--cinza-claro) !important;
-        border-radius: 6px !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
+# Dados pessoais (nome, endereço, telefone, CPF, nascimento) são
+# descartados já na leitura; a coluna de localidade é sempre mantida
+COLUNAS_PUBLICAS = projecao_publica(protegidas=["LOCALIDADE", "BAIRRO", "AREA", "TERRITORIO"])
 
 # ---------------------------------------------------------
 # FUNÇÕES AUXILIARES
@@ -315,20 +76,14 @@ def converter_para_csv(url):
         return None
 
 
-@st.cache_data
+@dataset_compartilhado("pce")
 def carregar_dados():
     url_original = "https://docs.google.com/spreadsheets/d/15Z5rsBKKY5nX2mi8Zn1u18IGcTsQ0o_E/edit?usp=sharing"
-    url_csv = converter_para_csv(url_original)
+    url_csv = url_fonte("pce", converter_para_csv(url_original))
 
     if not url_csv:
-        st.error("❌ URL inválida.")
-        return pd.DataFrame()
-
-    try:
-        df = pd.read_csv(url_csv, dtype=str)
-    except Exception as e:
-        st.error(f"❌ Erro ao carregar a planilha: {e}")
-        return pd.DataFrame()
+        raise ValueError("URL inválida.")
+    df = ler_csv(url_csv, dtype=str, usecols=COLUNAS_PUBLICAS)
 
     df.columns = [c.strip() for c in df.columns]
     return df
@@ -346,51 +101,17 @@ def encontrar_coluna(df, lista_nomes):
 # ---------------------------------------------------------
 # FILTROS
 # ---------------------------------------------------------
+@medido()
 def aplicar_filtros(df, col_localidade, col_data):
-    st.sidebar.header("🔎 Filtros")
-
-    df_filtrado = df.copy()
-
-    # ----------------- Localidade -----------------
-    if col_localidade:
-        st.sidebar.markdown(
-            f"<p style='margin-bottom:0px; margin-top:8px; "
-            f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-            f"Localidade</p>",
-            unsafe_allow_html=True
-        )
+    filtros = [
+        Filtro(col_localidade, "Localidade", todos=True),
+        Filtro(col_data, "Período", tipo="periodo", transformar=para_data),
+    ]
+    df_filtrado = painel_filtros(df, filtros, "pce")
 
-        localidades = sorted(df[col_localidade].dropna().unique())
-        sel_loc = st.sidebar.multiselect(
-            label="",
-            options=localidades,
-            default=localidades
-        )
-        if sel_loc:
-            df_filtrado = df_filtrado[df_filtrado[col_localidade].isin(sel_loc)]
-
-    # ----------------- Período (data) -----------------
+    # Os gráficos agrupam por data: só as linhas filtradas são convertidas
     if col_data:
         df_filtrado[col_data] = pd.to_datetime(df_filtrado[col_data], errors="coerce")
-        min_d = df_filtrado[col_data].min()
-        max_d = df_filtrado[col_data].max()
-
-        st.sidebar.markdown(
-            f"<p style='margin-bottom:0px; margin-top:8px; "
-            f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-            f"Período</p>",
-            unsafe_allow_html=True
-        )
-
-        data_ini, data_fim = st.sidebar.date_input(
-            label="",
-            value=[min_d, max_d]
-        )
-
-        df_filtrado = df_filtrado[
-            (df_filtrado[col_data] >= pd.to_datetime(data_ini)) &
-            (df_filtrado[col_data] <= pd.to_datetime(data_fim))
-        ]
 
     if df_filtrado.empty:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
@@ -402,6 +123,7 @@ def aplicar_filtros(df, col_localidade, col_data):
 # ---------------------------------------------------------
 # INDICADORES – POP. TRAB, EXAMES, POSITIVOS, TRATADOS, A TRATAR
 # ---------------------------------------------------------
+@medido()
 def mostrar_indicadores(df_filtrado, col_localidade):
     st.header("📊 Indicadores Gerais")
 
@@ -436,7 +158,10 @@ def mostrar_indicadores(df_filtrado, col_localidade):
 # ---------------------------------------------------------
 # GRÁFICOS
 # ---------------------------------------------------------
+@medido()
 def mostrar_graficos(df_filtrado, col_localidade, col_data):
+    import plotly.express as px
+
     st.header("📈 Análises Gráficas")
 
     # Gráfico de barras – Localidade
@@ -469,7 +194,7 @@ def mostrar_graficos(df_filtrado, col_localidade, col_data):
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        plotar(fig_bar)
 
         # Gráfico de pizza – Localidade
         fig_pie = px.pie(
@@ -485,7 +210,7 @@ def mostrar_graficos(df_filtrado, col_localidade, col_data):
             font=dict(color=CORES["azul"]),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        plotar(fig_pie)
 
     # Linha temporal
     if col_data:
@@ -516,12 +241,13 @@ def mostrar_graficos(df_filtrado, col_localidade, col_data):
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_line, use_container_width=True)
+        plotar(fig_line)
 
 
 # ---------------------------------------------------------
 # TABELA FINAL – APENAS AS COLUNAS ESPECIFICADAS, SEM LINHA TOTAL
 # ---------------------------------------------------------
+@medido()
 def mostrar_tabela(df_filtrado):
     st.header("📋 Dados Filtrados")
 
@@ -550,20 +276,25 @@ def mostrar_tabela(df_filtrado):
             colunas_finais.append(coluna_encontrada)
 
     if colunas_finais:
-        df_visivel = df_filtrado[colunas_finais].copy()
+        df_visivel = df_filtrado[colunas_finais]
     else:
-        df_visivel = df_filtrado.copy()
+        df_visivel = df_filtrado
 
-    st.dataframe(df_visivel, use_container_width=True)
+    tabela_paginada(df_visivel, "pce_tabela")
 
 
 # ---------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------
+@pagina_medida("pce")
 def main():
-    aplicar_css()
+    aplicar_tema("pce")
 
-    df = carregar_dados()
+    try:
+        df = carregar_dados()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar a planilha: {e}")
+        st.stop()
     if df.empty:
         st.stop()
 
@@ -3,16 +3,21 @@
 Dashboard Oropouche — Página Streamlit (tema institucional)
 - Usa Data da Notificação para séries mensais
 - Filtros: Localidade, Classificação, Semana Epidemiológica, Sexo, Raça/Cor
-- Tabela final oculta: MES, DATA_DE_NASCIMENTO, NOME, RUA, TELEFONE, etc.
+- Colunas sensíveis (NOME, RUA, TELEFONE, CPF, DATA_DE_NASCIMENTO, etc.) descartadas já na leitura
 """
 
 import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 from datetime import datetime
 
+from tema import aplicar_tema
+from utils import (
+    Filtro, dataset_compartilhado, ler_csv, medido, pagina_medida, painel_filtros, plotar,
+    projecao_publica, tabela_paginada, url_fonte,
+)
+
 # ---------------------------------------------------------
 # CONFIG / TEMA DA PÁGINA
 # ---------------------------------------------------------
@@ -42,263 +47,33 @@ PALETA = [
     CORES["azul_sec"],
 ]
 
-# ---------------------------------------------------------
-# CSS – TEMA INSTITUCIONAL + AJUSTES NOS FILTROS
-# ---------------------------------------------------------
-def aplicar_css():
-    st.markdown(f"""
-    <style>
-    :root {{
-        --azul-principal: {CORES["azul"]};
-        --azul-secundario: {CORES["azul_sec"]};
-        --verde-ipojuca: {CORES["verde"]};
-        --amarelo-ipojuca: {CORES["amarelo"]};
-        --cinza-claro: {CORES["cinza_claro"]};
-        --branco: {CORES["branco"]};
-    }}
-
-    /* Texto principal da área central */
-    [data-testid="stAppViewContainer"] body,
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li,
-    [data-testid="stAppViewContainer"] span,
-    [data-testid="stAppViewContainer"] label,
-    [data-testid="stAppViewContainer"] .stMarkdown {{
-        color: #0073CF !important;
-    }}
-
-    /* Títulos amarelos na área principal */
-    [data-testid="stAppViewContainer"] h1,
-    [data-testid="stAppViewContainer"] h2,
-    [data-testid="stAppViewContainer"] h3,
-    [data-testid="stAppViewContainer"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* Parágrafos justificados */
-    [data-testid="stAppViewContainer"] p,
-    [data-testid="stAppViewContainer"] li {{
-        text-align: justify !important;
-    }}
-
-    /* Fundo geral */
-    [data-testid="stAppViewContainer"] {{
-        background: linear-gradient(to bottom right, #F6F9FC, #EAF3FF) !important;
-    }}
-
-    /* Sidebar */
-    [data-testid="stSidebar"] {{
-        background: var(--azul-principal) !important;
-    }}
-    [data-testid="stSidebar"] a {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 600;
-    }}
-
-    /* MENU DE NAVEGAÇÃO */
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button,
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] span {{
-        color: #FFFFFF !important;
-    }}
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] button[aria-current="page"],
-    [data-testid="stSidebar"] [data-testid="stSidebarNav"] a[aria-current="page"] {{
-        background-color: rgba(255, 255, 255, 0.12) !important;
-        color: #FFFFFF !important;
-        border-radius: 6px !important;
-    }}
-
-    /* Título "Filtros" na sidebar */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4 {{
-        color: var(--amarelo-ipojuca) !important;
-        font-weight: 800 !important;
-    }}
-
-    /* RÓTULOS DOS FILTROS – AZUL CLARO */
-    [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stNumberInput label,
-    [data-testid="stSidebar"] .stSelectbox label,
-    [data-testid="stSidebar"] .stMultiSelect label,
-    [data-testid="stSidebar"] .stDateInput label,
-    [data-testid="stSidebar"] .stSlider label,
-    [data-testid="stSidebar"] .stTextInput label {{
-        color: {CORES["azul_sec"]} !important;
-        font-weight: 600 !important;
-    }}
-
-    /* Deixar os títulos colados às caixas de filtro */
-    [data-testid="stSidebar"] .stMarkdown p {{
-        margin-top: 0 !important;
-        margin-bottom: 0 !important;
-    }}
-    [data-testid="stSidebar"] .stMarkdown + div,
-    [data-testid="stSidebar"] .stMarkdown + .stMultiSelect,
-    [data-testid="stSidebar"] .stMarkdown + .stSelectbox {{
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }}
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox {{
-        margin-bottom: 4px !important;
-    }}
-
-    /* TEXTO E CAMPOS DOS FILTROS – tema claro */
-    [data-testid="stSidebar"] input,
-    [data-testid="stSidebar"] textarea,
-    [data-testid="stSidebar"] select,
-    [data-testid="stSidebar"] .stMultiSelect,
-    [data-testid="stSidebar"] .stSelectbox,
-    [data-testid="stSidebar"] .stNumberInput,
-    [data-testid="stSidebar"] .stSlider,
-    [data-testid="stSidebar"] .stDateInput,
-    [data-testid="stSidebar"] .stTextInput,
-    [data-testid="stSidebar"] .stMultiSelect * {{
-        color: {CORES["azul"]} !important;
-    }}
-
-    /* Campos: fundo branco no modo claro */
-    [data-testid="stSidebar"] .stTextInput > div > div,
-    [data-testid="stSidebar"] .stNumberInput > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stMultiSelect > div > div,
-    [data-testid="stSidebar"] .stDateInput > div > div {{
-        background-color: var(--branco) !important;
-        border-radius: 6px !important;
-    }}
-
-    [data-testid="stSidebar"] input::placeholder,
-    [data-testid="stSidebar"] textarea::placeholder {{
-        color: #2f6bbd !important;
-    }}
-
-    /* Chips selecionados */
-    [data-testid="stSidebar"] .stMultiSelect div[aria-selected="true"],
-    [data-testid="stSidebar"] .stSelectbox div[aria-selected="true"] {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"],
-    [data-testid="stSidebar"] .stMultiSelect span[data-baseweb="tag"] * {{
-        background-color: {CORES["verde"]} !important;
-        color: white !important;
-        border-radius: 6px !important;
-    }}
-
-    /* Bordas dos campos */
-    [data-testid="stSidebar"] .stMultiSelect > div,
-    [data-testid="stSidebar"] .stSelectbox > div,
-    [data-testid="stSidebar"] .stTextInput > div,
-    [data-testid="stSidebar"] .stNumberInput > div,
-    [data-testid="stSidebar"] .stDateInput > div {{
-        border-color: {CORES["azul_sec"]} !important;
-        border-radius: 6px !important;
-    }}
-
-    /* GRÁFICOS – fundo branco por CSS (reforço) */
-    .js-plotly-plot .plotly .bg,
-    .js-plotly-plot .plotly .plotly-background,
-    .js-plotly-plot .plotly .paper,
-    .js-plotly-plot .plotly .plotbg {{
-        fill: #FFFFFF !important;
-        background-color: #FFFFFF !important;
-    }}
-    .js-plotly-plot text {{
-        fill: {CORES["azul"]} !important;
-        color: {CORES["azul"]} !important;
-    }}
-    .element-container .js-plotly-plot {{
-        border: 1px solid #000000 !important;
-        border-radius: 4px !important;
-        padding: 4px !important;
-        background-color: #FFFFFF !important;
-    }}
-
-    /* MODO ESCURO */
-    @media (prefers-color-scheme: dark) {{
-
-        [data-testid="stSidebar"] input,
-        [data-testid="stSidebar"] textarea,
-        [data-testid="stSidebar"] select,
-        [data-testid="stSidebar"] .stMultiSelect,
-        [data-testid="stSidebar"] .stSelectbox,
-        [data-testid="stSidebar"] .stNumberInput,
-        [data-testid="stSidebar"] .stSlider,
-        [data-testid="stSidebar"] .stDateInput,
-        [data-testid="stSidebar"] .stTextInput,
-        [data-testid="stSidebar"] .stMultiSelect * {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[class*="stMarkdown"] p,
-        [data-testid="stSidebar"] label,
-        [data-testid="stSidebar"] .stNumberInput label,
-        [data-testid="stSidebar"] .stSelectbox label,
-        [data-testid="stSidebar"] .stMultiSelect label,
-        [data-testid="stSidebar"] .stDateInput label,
-        [data-testid="stSidebar"] .stSlider label,
-        [data-testid="stSidebar"] .stTextInput label {{
-            color: {CORES["azul_sec"]} !important;
-            font-weight: 600 !important;
-        }}
-
-        [data-testid="stSidebar"] .stTextInput > div > div,
-        [data-testid="stSidebar"] .stNumberInput > div > div,
-        [data-testid="stSidebar"] .stSelectbox > div > div,
-        [data-testid="stSidebar"] .stMultiSelect > div > div,
-        [data-testid="stSidebar"] .stDateInput > div > div {{
-            background-color: #1F2933 !important;
-            border-radius: 6px !important;
-        }}
-
-        [data-testid="stSidebar"] input::placeholder,
-        [data-testid="stSidebar"] textarea::placeholder {{
-            color: #FFFFFF !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"],
-        [data-testid="stSidebar"] ul[role="listbox"] {{
-            background-color: #1F2933 !important;
-        }}
-
-        [data-testid="stSidebar"] div[role="listbox"] *,
-        [data-testid="stSidebar"] ul[role="listbox"] * {{
-            color: #FFFFFF !important;
-        }}
-    }}
-
-    /* Métricas */
-    .stMetric {{
-        background-color: var(--amarelo-ipojuca) !important;
-        padding: 18px;
-        border-radius: 10px;
-        border-left: 6px solid var(--azul-secundario);
-        box-shadow: 0px 2px 6px rgba(0,0,0,0.15);
-    }}
-
-    /* Botões */
-    button, .stButton button {{
-        color: #FFFFFF !important;
-        background-color: var(--cinza-claro) !important;
-        border-radius: 6px !important;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
-
 # ---------------------------------------------------------
 # Fonte de dados (local primeiro, senão Google)
 # ---------------------------------------------------------
 LOCAL_DATA_PATH = "/mnt/data/PLANILHA REDESIM 2025 (Integrador).xlsx"
-GSHEET_URL = "https://docs.google.com/spreadsheets/d/1pk_X_h-tfpA53te1ViXcrY40SqSSI6WA/export?format=csv"
+GSHEET_URL = url_fonte("oropouche", "https://docs.google.com/spreadsheets/d/1pk_X_h-tfpA53te1ViXcrY40SqSSI6WA/export?format=csv")
+
+CANDIDATOS_LOCALIDADE = ["LOCALIDADE", "BAIRRO", "AREA", "TERRITORIO", "TERRITÓRIO"]
+CANDIDATOS_DATA = [
+    "DATA DA NOTIFICAÇÃO", "DATA DA NOTIFICACAO",
+    "DATA_DA_NOTIFICAÇÃO", "DATA_DA_NOTIFICACAO",
+    "DATA_NOTIFICACAO", "DATA_DE_NOTIFICACAO",
+    "DATA NOTIFICAÇÃO", "DATA DE NOTIFICACAO",
+    "DATA_DE_NOTIFICAÇÃO",
+    "NOTIFICACAO", "DATA_DO_CASO", "DATA_ENTRADA", "DATA", "DATA_NOTIF", "DATE"
+]
+CANDIDATOS_SEXO = ["SEXO", "GENERO", "GÊNERO"]
+CANDIDATOS_SEMANA = [
+    "SEMANA_EPIDEMIOLOGICA", "SEMANA EPIDEMIOLOGICA",
+    "SEMANA_EPIDEMIOLÓGICA", "SEMANA EPIDEMIOLÓGICA",
+    "SEMANA", "SEMANA_EP", "SE"
+]
+
+# Dados sensíveis nunca são materializados: a projeção é aplicada na leitura
+COLUNAS_PUBLICAS = projecao_publica(protegidas=CANDIDATOS_LOCALIDADE + CANDIDATOS_DATA)
 
 
-@st.cache_data(ttl=600)
+@dataset_compartilhado("oropouche", ttl=600)
 def carregar_dados(local_path: str | None = None,
                    gsheet_csv_url: str | None = None) -> pd.DataFrame:
     df = pd.DataFrame()
@@ -308,17 +83,17 @@ def carregar_dados(local_path: str | None = None,
         try:
             if os.path.exists(local_path):
                 try:
-                    df = pd.read_excel(local_path, dtype=str)
+                    df = pd.read_excel(local_path, dtype=str, usecols=COLUNAS_PUBLICAS)
                 except Exception:
-                    df = pd.read_csv(local_path, dtype=str)
-                return df
+                    df = pd.read_csv(local_path, dtype=str, usecols=COLUNAS_PUBLICAS)
+                return preparar_lote(df)
         except Exception:
             pass
 
     # 2) tenta Google Sheet CSV
     if gsheet_csv_url:
         try:
-            df = pd.read_csv(gsheet_csv_url, dtype=str)
+            df = ler_csv(gsheet_csv_url, preparar=preparar_lote, dtype=str, usecols=COLUNAS_PUBLICAS)
             return df
         except Exception:
             return pd.DataFrame()
@@ -356,147 +131,95 @@ def detectar(df: pd.DataFrame, candidatos: list[str]) -> str | None:
 
 
 # ---------------------------------------------------------
-# Remoção de dados sensíveis
+# Filtros (sidebar)
 # ---------------------------------------------------------
-def remover_sensiveis(df: pd.DataFrame,
-                      col_localidade: str | None,
-                      col_data: str | None) -> pd.DataFrame:
-    sensiveis_tokens = [
-        "NOME", "PACIENTE", "MAE", "MAE_", "RUA", "ENDERECO", "ENDEREÇO",
-        "TELEFONE", "CELULAR", "CPF",
-        "DATA_DE_NASCIMENTO", "NASCIMENTO", "DN", "DATA_NASC"
-    ]
-    cols_para_remover = [c for c in df.columns if any(tok in c for tok in sensiveis_tokens)]
-    cols_para_remover = [
-        c for c in cols_para_remover
-        if c not in {col_localidade, col_data}
+@medido()
+def aplicar_filtros(df: pd.DataFrame,
+                    col_localidade: str | None,
+                    col_classificacao: str | None,
+                    col_sexo: str | None,
+                    col_raca: str | None) -> pd.DataFrame:
+    filtros = [
+        Filtro(col_localidade, "Localidade", todos=True),
+        Filtro(col_classificacao, "Classificação", todos=True),
+        Filtro(col_sexo, "Sexo", todos=True),
+        Filtro(col_raca, "Raça/Cor", todos=True),
+        # Só semanas reais: 'IGNORADO' e 'SEM_SEMANA' ficam fora das opções
+        Filtro("SE_SEMANA", "Semana Epidemiológica", todos=True, excluir=("IGNORADO", "SEM_SEMANA")),
     ]
-    df_limpo = df.drop(columns=cols_para_remover, errors="ignore")
-    return df_limpo
+    df_filtrado = painel_filtros(df, filtros, "oropouche")
+
+    if df_filtrado.empty:
+        st.warning("Nenhum dado encontrado com os filtros selecionados.")
+    return df_filtrado
 
 
 # ---------------------------------------------------------
-# Filtros (sidebar)
+# Códigos de mês (int32: ano*12 + mês-1) e agregação mensal
 # ---------------------------------------------------------
-def opcoes(df: pd.DataFrame, col: str | None):
-    if col and col in df.columns:
-        return sorted(df[col].dropna().unique().tolist())
-    return []
+SEM_MES = -1
 
 
-def aplicar_filtros(df: pd.DataFrame,
-                    col_localidade: str | None,
-                    col_classificacao: str | None,
-                    col_sexo: str | None,
-                    col_raca: str | None) -> pd.DataFrame:
-    st.sidebar.header("🔎 Filtros")
-
-    localidades = opcoes(df, col_localidade)
-    classificacoes = opcoes(df, col_classificacao)
-    sexos = opcoes(df, col_sexo)
-    racas = opcoes(df, col_raca)
-    semanas = opcoes(df, "SE_SEMANA")
-
-    # Localidade
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Localidade</p>",
-        unsafe_allow_html=True
-    )
-    f_localidade = st.sidebar.multiselect(
-        label="",
-        options=localidades,
-        default=localidades
-    )
+def codigo_mes(datas: pd.Series) -> pd.Series:
+    codigos = datas.dt.year * 12 + datas.dt.month - 1
+    return codigos.fillna(SEM_MES).astype(np.int32)
 
-    # Classificação
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Classificação</p>",
-        unsafe_allow_html=True
-    )
-    f_classificacao = st.sidebar.multiselect(
-        label="",
-        options=classificacoes,
-        default=classificacoes
-    )
 
-    # Sexo
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Sexo</p>",
-        unsafe_allow_html=True
-    )
-    f_sexo = st.sidebar.multiselect(
-        label="",
-        options=sexos,
-        default=sexos
-    )
+def rotulo_mes(codigo: int) -> str:
+    if codigo == SEM_MES:
+        return "SEM_DATA"
+    return f"{codigo // 12:04d}-{codigo % 12 + 1:02d}"
 
-    # Raça/Cor
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Raça/Cor</p>",
-        unsafe_allow_html=True
-    )
-    f_raca = st.sidebar.multiselect(
-        label="",
-        options=racas,
-        default=racas
-    )
 
-    # Semana Epidemiológica
-    st.sidebar.markdown(
-        f"<p style='margin-bottom:0px; margin-top:8px; "
-        f"color:{CORES['azul_sec']}; font-weight:600; font-size:0.9rem;'>"
-        f"Semana Epidemiológica</p>",
-        unsafe_allow_html=True
-    )
-    # REMOVE 'IGNORADO' do options, se existir, e deixa só semanas reais
-    semanas_validas = [s for s in semanas if str(s).upper() not in ("IGNORADO", "SEM_SEMANA")]
-    f_semana = st.sidebar.multiselect(
-        label="",
-        options=semanas_validas,
-        default=semanas_validas
-    )
+def contar_por_mes(df: pd.DataFrame, col_grupo: str | None = None) -> pd.DataFrame:
+    """
+    Casos por mês (e, opcionalmente, por categoria) com um único np.bincount
+    sobre os códigos inteiros; os rótulos YYYY-MM são gerados apenas para os
+    meses presentes no resultado agregado.
+    """
+    meses = df["MES_NOTIF"].to_numpy(dtype=np.int64)
+    if col_grupo:
+        grupos, categorias = pd.factorize(df[col_grupo])
+    else:
+        grupos, categorias = np.zeros(len(meses), dtype=np.int64), pd.Index([None])
 
-    df_filtrado = df.copy()
-    if f_localidade and col_localidade in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado[col_localidade].isin(f_localidade)]
-    if f_classificacao and col_classificacao in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado[col_classificacao].isin(f_classificacao)]
-    if f_sexo and col_sexo in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado[col_sexo].isin(f_sexo)]
-    if f_raca and col_raca in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado[col_raca].isin(f_raca)]
-    if f_semana and "SE_SEMANA" in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado["SE_SEMANA"].isin(f_semana)]
+    validos = grupos >= 0
+    meses, grupos = meses[validos], grupos[validos]
+    if len(meses) == 0:
+        colunas = ["MES_NOTIF"] + ([col_grupo] if col_grupo else []) + ["CASOS"]
+        return pd.DataFrame(columns=colunas)
 
-    if df_filtrado.empty:
-        st.warning("Nenhum dado encontrado com os filtros selecionados.")
-    return df_filtrado
+    # Última posição reservada a SEM_MES ("SEM_DATA" vem depois dos meses)
+    sem_mes = meses == SEM_MES
+    base = meses[~sem_mes].min() if (~sem_mes).any() else 0
+    n_meses = (meses[~sem_mes].max() - base + 2) if (~sem_mes).any() else 1
+    pos = np.where(sem_mes, n_meses - 1, meses - base)
+
+    k = len(categorias)
+    contagem = np.bincount(pos * k + grupos, minlength=n_meses * k).reshape(n_meses, k)
+    i_mes, i_grupo = np.nonzero(contagem)
+
+    codigos = np.where(i_mes == n_meses - 1, SEM_MES, i_mes + base)
+    resultado = pd.DataFrame({"MES_NOTIF": [rotulo_mes(int(c)) for c in codigos]})
+    if col_grupo:
+        resultado[col_grupo] = categorias.take(i_grupo)
+    resultado["CASOS"] = contagem[i_mes, i_grupo]
+    return resultado
 
 
 # ---------------------------------------------------------
 # Criação de colunas de data/semana
 # ---------------------------------------------------------
+@medido()
 def tratar_data(df: pd.DataFrame,
                 col_data: str | None,
                 col_semana_epid: str | None) -> pd.DataFrame:
-    # Data (Data da Notificação)
+    # Data (Data da Notificação); datas inválidas ficam em SEM_MES
     if col_data and col_data in df.columns:
         df[col_data] = pd.to_datetime(df[col_data], dayfirst=True, errors="coerce")
-        if df[col_data].notna().any():
-            df["MES_NOTIF"] = df[col_data].dt.to_period("M").astype(str)
-        else:
-            st.warning("Coluna de Data encontrada, mas todos os valores são inválidos. Usando SEM_DATA.")
-            df["MES_NOTIF"] = "SEM_DATA"
+        df["MES_NOTIF"] = codigo_mes(df[col_data])
     else:
-        df["MES_NOTIF"] = "SEM_DATA"
+        df["MES_NOTIF"] = np.full(len(df), SEM_MES, dtype=np.int32)
 
     # Semana epidemiológica
     if col_semana_epid and col_semana_epid in df.columns:
@@ -506,7 +229,7 @@ def tratar_data(df: pd.DataFrame,
             .astype(str)
             .str.extract(r"(\d+)", expand=False)
         )
-    elif col_data and col_data in df.columns and df[col_data].notna().any():
+    elif col_data and col_data in df.columns:
         try:
             df["SE_SEMANA"] = df[col_data].dt.isocalendar().week.astype("Int64").astype(str)
         except Exception:
@@ -517,9 +240,35 @@ def tratar_data(df: pd.DataFrame,
     return df
 
 
+def preparar_lote(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza nomes e sexo e deriva mês/semana de um lote do CSV. Roda uma
+    vez por carga: as colunas (e os índices dos filtros) valem para todos
+    os reruns até a próxima versão da planilha.
+    """
+    df = df.rename(columns={c: normalize(c) for c in df.columns})
+
+    # Sexo: F/M -> Feminino/Masculino
+    col_sexo = detectar(df, CANDIDATOS_SEXO)
+    if col_sexo:
+        df[col_sexo] = (
+            df[col_sexo]
+            .astype(str)
+            .str.strip()
+            .str.upper()
+            .replace({
+                "F": "Feminino",
+                "M": "Masculino"
+            })
+        )
+
+    return tratar_data(df, detectar(df, CANDIDATOS_DATA), detectar(df, CANDIDATOS_SEMANA))
+
+
 # ---------------------------------------------------------
 # Indicadores
 # ---------------------------------------------------------
+@medido()
 def mostrar_indicadores(df_filtrado: pd.DataFrame, col_gestante: str | None):
     st.header("📊 Indicadores Rápidos")
     c1, c2 = st.columns(2)
@@ -535,23 +284,20 @@ def mostrar_indicadores(df_filtrado: pd.DataFrame, col_gestante: str | None):
 # ---------------------------------------------------------
 # Gráficos – fundo branco via update_layout
 # ---------------------------------------------------------
+@medido()
 def mostrar_graficos(df_filtrado: pd.DataFrame,
                      col_localidade: str | None,
                      col_classificacao: str | None,
                      col_sexo: str | None,
                      col_raca: str | None):
+    import plotly.express as px
+
     st.markdown("## 📈 Séries Temporais")
 
     # 1) Casos por mês
     st.subheader("Casos por Mês")
     if "MES_NOTIF" in df_filtrado.columns:
-        series = (
-            df_filtrado
-            .groupby("MES_NOTIF")
-            .size()
-            .reset_index(name="CASOS")
-            .sort_values("MES_NOTIF")
-        )
+        series = contar_por_mes(df_filtrado)
         fig_mes = px.line(
             series,
             x="MES_NOTIF",
@@ -579,18 +325,12 @@ def mostrar_graficos(df_filtrado: pd.DataFrame,
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_mes, use_container_width=True)
+        plotar(fig_mes)
 
     # 2) Classificação por mês
     st.subheader("Classificação por Mês")
     if "MES_NOTIF" in df_filtrado.columns and col_classificacao in df_filtrado.columns:
-        class_mes = (
-            df_filtrado
-            .groupby(["MES_NOTIF", col_classificacao])
-            .size()
-            .reset_index(name="CASOS")
-            .sort_values("MES_NOTIF")
-        )
+        class_mes = contar_por_mes(df_filtrado, col_classificacao)
         fig_class = px.line(
             class_mes,
             x="MES_NOTIF",
@@ -619,7 +359,7 @@ def mostrar_graficos(df_filtrado: pd.DataFrame,
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_class, use_container_width=True)
+        plotar(fig_class)
 
     # 3) Localidade x Classificação
     if col_localidade and col_classificacao and col_localidade in df_filtrado.columns:
@@ -657,7 +397,7 @@ def mostrar_graficos(df_filtrado: pd.DataFrame,
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_loc, use_container_width=True)
+        plotar(fig_loc)
 
     # 4) Sexo (pizza)
     if col_sexo and col_sexo in df_filtrado.columns:
@@ -677,7 +417,7 @@ def mostrar_graficos(df_filtrado: pd.DataFrame,
             font=dict(color=CORES["azul"]),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_sex, use_container_width=True)
+        plotar(fig_sex)
 
     # 5) Raça/Cor x Sexo
     if col_raca and col_sexo and col_raca in df_filtrado.columns and col_sexo in df_filtrado.columns:
@@ -709,12 +449,13 @@ def mostrar_graficos(df_filtrado: pd.DataFrame,
             ),
             legend=dict(font=dict(color=CORES["azul"]))
         )
-        st.plotly_chart(fig_raca_sexo, use_container_width=True)
+        plotar(fig_raca_sexo)
 
 
 # ---------------------------------------------------------
 # Tabela final
 # ---------------------------------------------------------
+@medido()
 def mostrar_tabela(df_filtrado: pd.DataFrame):
     st.markdown("## 📋 Dados Filtrados")
 
@@ -722,21 +463,15 @@ def mostrar_tabela(df_filtrado: pd.DataFrame):
     df_exib = df_filtrado.drop(columns=[c for c in ocultar if c in df_filtrado.columns],
                                errors="ignore")
 
-    df_exib = df_exib[
-        [
-            c for c in df_exib.columns
-            if "NASC" not in c.upper() and "DATA_DE_NASC" not in c.upper()
-        ]
-    ]
-
-    st.dataframe(df_exib.reset_index(drop=True), use_container_width=True)
+    tabela_paginada(df_exib, "oropouche_tabela")
 
 
 # ---------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------
+@pagina_medida("oropouche")
 def main():
-    aplicar_css()
+    aplicar_tema("oropouche")
 
     st.title("🦟 Dashboard de Oropouche - Vigilância em Saúde")
     st.markdown(
@@ -749,48 +484,19 @@ def main():
         st.error("Dados não encontrados (arquivo local ausente e/ou planilha online inacessível).")
         st.stop()
 
-    # Normalizar nomes
-    orig_cols = list(df_raw.columns)
-    df = df_raw.rename(columns={orig: normalize(orig) for orig in orig_cols})
+    # Nomes já normalizados e colunas derivadas já prontas (preparar_lote)
+    df = df_raw
 
     # Detectar colunas importantes
-    col_localidade = detectar(df, ["LOCALIDADE", "BAIRRO", "AREA", "TERRITORIO", "TERRITÓRIO"])
+    col_localidade = detectar(df, CANDIDATOS_LOCALIDADE)
     col_classificacao = detectar(df, ["CLASSIFICACAO", "CLASSIFICAÇÃO", "STATUS", "TIPO", "CLASS"])
-    col_sexo = detectar(df, ["SEXO", "GENERO", "GÊNERO"])
+    col_sexo = detectar(df, CANDIDATOS_SEXO)
     col_raca = detectar(df, ["RACA_COR", "RAÇA_COR", "RACA", "COR", "RACA/COR"])
     col_gestante = detectar(df, ["GESTANTE", "GRAVIDEZ", "GESTACAO"])
-    col_data = detectar(df, [
-        "DATA DA NOTIFICAÇÃO", "DATA DA NOTIFICACAO",
-        "DATA_DA_NOTIFICAÇÃO", "DATA_DA_NOTIFICACAO",
-        "DATA_NOTIFICACAO", "DATA_DE_NOTIFICACAO",
-        "DATA NOTIFICAÇÃO", "DATA DE NOTIFICACAO",
-        "DATA_DE_NOTIFICAÇÃO",
-        "NOTIFICACAO", "DATA_DO_CASO", "DATA_ENTRADA", "DATA", "DATA_NOTIF", "DATE"
-    ])
-    col_semana_epid = detectar(df, [
-        "SEMANA_EPIDEMIOLOGICA", "SEMANA EPIDEMIOLOGICA",
-        "SEMANA_EPIDEMIOLÓGICA", "SEMANA EPIDEMIOLÓGICA",
-        "SEMANA", "SEMANA_EP", "SE"
-    ])
-
-    # Sexo: F/M -> Feminino/Masculino
-    if col_sexo and col_sexo in df.columns:
-        df[col_sexo] = (
-            df[col_sexo]
-            .astype(str)
-            .str.strip()
-            .str.upper()
-            .replace({
-                "F": "Feminino",
-                "M": "Masculino"
-            })
-        )
-
-    # Tratar data + semana epidemiológica
-    df = tratar_data(df, col_data, col_semana_epid)
+    col_data = detectar(df, CANDIDATOS_DATA)
 
-    # Remover sensíveis
-    df = remover_sensiveis(df, col_localidade, col_data)
+    if col_data and df[col_data].isna().all():
+        st.warning("Coluna de Data encontrada, mas todos os valores são inválidos. Usando SEM_DATA.")
 
     # Filtros
     df_filtrado = aplicar_filtros(df, col_localidade, col_classificacao, col_sexo, col_raca)
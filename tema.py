@@ -0,0 +1,102 @@
+"""
+Identidade visual compartilhada: folhas de estilo e logo servidos de
+``static/`` (``enableStaticServing`` em ``.streamlit/config.toml``).
+
+Fica fora de ``utils`` para a Home não importar pandas só para se vestir.
+
+As URLs levam o hash do conteúdo (``?v=``), então um proxy na frente do
+Streamlit pode servir ``/app/static/`` com ``Cache-Control: max-age=31536000,
+immutable``; sem proxy, o navegador revalida por ETag/Last-Modified.
+
+    python tema.py    # baixa o logo original e gera os tamanhos em static/logo/
+"""
+
+import functools
+import hashlib
+import io
+import logging
+import os
+import urllib.request
+
+import streamlit as st
+
+log = logging.getLogger("painel")
+
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+@functools.cache
+def versao_estatico(caminho: str) -> str:
+    """Hash curto do arquivo: a URL muda quando o conteúdo muda."""
+    with open(os.path.join(PASTA_STATIC, caminho), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:10]
+
+
+def url_estatico(caminho: str) -> str:
+    return f"app/static/{caminho}?v={versao_estatico(caminho)}"
+
+
+def aplicar_tema(pagina: str):
+    """
+    Liga ``static/tema/<pagina>.css``. A cada rerun só a tag <link> vai ao
+    navegador; o CSS em si é baixado uma vez e fica em cache (hash na URL).
+    """
+    st.markdown(
+        f'<link rel="stylesheet" href="{url_estatico(f"tema/{pagina}.css")}">',
+        unsafe_allow_html=True,
+    )
+
+
+# ==========================================================
+# LOGO
+# ==========================================================
+
+LOGO_ORIGINAL = "https://cievsipojuca.wordpress.com/wp-content/uploads/2022/01/cievs-ipojuca-sem-fundo.png"
+LARGURAS_LOGO = (160, 320, 640)
+
+
+def _arquivo_logo(largura: int) -> str:
+    return f"logo/cievs-ipojuca-{largura}.png"
+
+
+@functools.cache
+def _larguras_locais() -> tuple[int, ...]:
+    locais = tuple(l for l in LARGURAS_LOGO if os.path.exists(os.path.join(PASTA_STATIC, _arquivo_logo(l))))
+    if not locais:
+        log.warning("logo ausente em static/logo/ (rode `python tema.py`); exibindo só o nome")
+    return locais
+
+
+def logo_barra_lateral(largura: int = 150):
+    """Logo do Cievs no topo da barra lateral, em tamanhos responsivos (srcset)."""
+    locais = _larguras_locais()
+    if locais:
+        srcset = ", ".join(f"{url_estatico(_arquivo_logo(l))} {l}w" for l in locais)
+        img = (
+            f'<img src="{url_estatico(_arquivo_logo(locais[0]))}" srcset="{srcset}" '
+            f'sizes="{largura}px" width="{largura}" alt="Cievs Ipojuca">'
+        )
+    else:
+        # Sem os arquivos locais, nada de buscar o original no WordPress a
+        # cada visita (e quebrar sem internet): fica o nome em texto
+        img = "<strong>Cievs Ipojuca</strong>"
+    st.sidebar.markdown(f'<div class="sidebar-logo">{img}</div>', unsafe_allow_html=True)
+
+
+def atualizar_logo(origem: str = LOGO_ORIGINAL):
+    """Baixa o logo e grava uma cópia PNG otimizada por largura de LARGURAS_LOGO."""
+    from PIL import Image   # dependência do próprio Streamlit
+
+    with urllib.request.urlopen(origem, timeout=30) as resp:
+        imagem = Image.open(io.BytesIO(resp.read()))
+        imagem.load()
+    os.makedirs(os.path.join(PASTA_STATIC, "logo"), exist_ok=True)
+    for largura in LARGURAS_LOGO:
+        altura = round(imagem.height * largura / imagem.width)
+        copia = imagem.resize((largura, altura), Image.LANCZOS) if largura < imagem.width else imagem
+        copia.save(os.path.join(PASTA_STATIC, _arquivo_logo(largura)), optimize=True)
+        print(f"static/{_arquivo_logo(largura)} ({copia.width}x{copia.height})")
+
+
+if __name__ == "__main__":
+    atualizar_logo()
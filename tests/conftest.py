@@ -0,0 +1,44 @@
+"""
+Configuração comum dos testes: raiz do repositório no path, cache em disco
+desligado e registro de datasets limpo entre um teste e outro.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+os.environ["PAINEL_CACHE_DIR"] = ""
+
+import utils  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def registro_limpo():
+    for nome, _, _ in utils.REGISTRO.itens():
+        utils.REGISTRO.remover(nome)
+    utils._estado.clear()
+    yield
+
+
+def planilha_visa(pasta) -> str:
+    """Entradas em três meses do ano atual e dois do anterior."""
+    ano = date.today().year
+    entradas = [f"15/{m:02d}/{ano}" for m in (1, 2, 3) for _ in range(28)]
+    entradas += [f"10/{m:02d}/{ano - 1}" for m in (11, 12) for _ in range(10)]
+    caminho = os.path.join(pasta, "visa.csv")
+    pd.DataFrame({
+        "ENTRADA": entradas,
+        "1ª INSPEÇÃO": "",
+        "DATA CONCLUSÃO": "",
+        "SITUAÇÃO": "em andamento",
+        "CLASSIFICAÇÃO": "alto risco",
+    }).to_csv(caminho, index=False)
+    return caminho
@@ -0,0 +1,36 @@
+"""Ingestão no banco local (SQLite): a troca da tabela é atômica."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "painel.sqlite")
+    monkeypatch.setattr(utils, "BANCO_LOCAL", caminho)
+    return caminho
+
+
+def _objetos(caminho):
+    with sqlite3.connect(caminho) as con:
+        return {nome for nome, in con.execute("SELECT name FROM sqlite_master")}
+
+
+def test_reingestao_troca_tabela_e_refaz_indices(banco):
+    utils.ingerir_tabela("dengue", pd.DataFrame({"SEXO": ["F", "M"]}), indexar=["SEXO"])
+    tabela = utils.ingerir_tabela("dengue", pd.DataFrame({"SEXO": ["F", "M", "M"]}), indexar=["SEXO"])
+
+    assert utils.contar_linhas(tabela) == 3
+    assert _objetos(banco) == {"dengue", "ix_dengue_SEXO"}
+
+
+def test_falha_na_ingestao_preserva_tabela_anterior(banco):
+    utils.ingerir_tabela("dengue", pd.DataFrame({"SEXO": ["F", "M"]}))
+    with pytest.raises(Exception):
+        utils.ingerir_tabela("dengue", pd.DataFrame({"SEXO": [{"quebra": 1}]}))
+
+    assert utils.contar_linhas(utils.abrir_tabela("dengue")) == 2
@@ -0,0 +1,175 @@
+"""
+Carga compartilhada (``voo_unico``) contra o servidor HTTP local: sessões
+simultâneas pedem o mesmo dataset e só uma vai à fonte.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import utils
+from benchmarks.dados import caminho_csv, gerar
+from benchmarks.servidor import ServidorFixtures
+from tests.conftest import RAIZ, planilha_visa
+
+SESSOES = 8
+
+
+@pytest.fixture(autouse=True)
+def disjuntores_limpos(monkeypatch):
+    monkeypatch.setattr(utils, "TENTATIVAS", 1)
+    utils._disjuntores.clear()
+    yield
+    utils._disjuntores.clear()
+
+
+def _em_paralelo(funcao, n=SESSOES):
+    """Dispara ``n`` chamadas juntas; devolve (resultados, erros)."""
+    largada = threading.Barrier(n)
+
+    def sessao():
+        largada.wait()
+        try:
+            return funcao(), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(n) as pool:
+        saidas = list(pool.map(lambda _: sessao(), range(n)))
+    return [r for r, _ in saidas], [e for _, e in saidas]
+
+
+def _carregador(url, nome="carga_teste"):
+    @utils.dataset_compartilhado(nome)
+    def carregar():
+        return utils.ler_csv(url)
+    return carregar
+
+
+def test_sessoes_simultaneas_fazem_um_unico_download():
+    gerar("dengue", 1_000)
+    with ServidorFixtures(atraso_s=0.3) as srv:
+        carregar = _carregador(srv.url(caminho_csv("dengue", 1_000)))
+        resultados, erros = _em_paralelo(carregar)
+
+    assert erros == [None] * SESSOES
+    assert srv.requisicoes == 1
+    assert all(len(df) == 1_000 for df in resultados)
+
+
+def test_falha_da_fonte_chega_a_todas_as_sessoes():
+    gerar("dengue", 1_000)
+    with ServidorFixtures(atraso_s=0.3, falhar=True) as srv:
+        carregar = _carregador(srv.url(caminho_csv("dengue", 1_000)))
+        _, erros = _em_paralelo(carregar)
+
+    assert srv.requisicoes == 1
+    assert all(isinstance(e, utils.FalhaDownload) for e in erros)
+
+
+class _Interrompida(BaseException):
+    """Faz o papel do StopException/RerunException do Streamlit."""
+
+
+def test_interrupcao_do_dono_nao_vaza_para_quem_espera():
+    chamadas = []
+    dentro = threading.Event()
+    liberar = threading.Event()
+
+    def funcao():
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            dentro.set()
+            liberar.wait(5)
+            raise _Interrompida()
+        time.sleep(0.2)
+        return "ok"
+
+    def dono():
+        with pytest.raises(_Interrompida):
+            utils.voo_unico("chave", funcao)
+
+    t = threading.Thread(target=dono)
+    t.start()
+    assert dentro.wait(5)
+    with ThreadPoolExecutor(4) as pool:
+        esperando = [pool.submit(utils.voo_unico, "chave", funcao) for _ in range(4)]
+        time.sleep(0.2)   # as quatro já estão esperando o futuro do dono
+        liberar.set()
+        resultados = [f.result(5) for f in esperando]
+    t.join(5)
+
+    # só uma das que esperavam assume a carga de novo
+    assert resultados == ["ok"] * 4
+    assert len(chamadas) == 2
+    assert not utils._em_voo
+
+
+def test_versao_do_cache_acompanha_o_codigo_de_leitura(tmp_path, monkeypatch):
+    def carregar():
+        return None
+
+    antes = utils._versao_codigo(carregar)
+    copia = tmp_path / "utils.py"
+    copia.write_bytes(open(utils.__file__, "rb").read() + b"\n# leitura alterada\n")
+    monkeypatch.setattr(utils, "__file__", str(copia))
+    assert utils._versao_codigo(carregar) != antes
+
+
+def test_disjuntor_meio_aberto_libera_uma_unica_prova(monkeypatch):
+    monkeypatch.setattr(utils, "CIRCUITO_ABERTO_S", 0.0)
+    disjuntor = utils.Disjuntor()
+    for _ in range(utils.FALHAS_ABRIR_CIRCUITO):
+        disjuntor.falha()
+
+    monkeypatch.setattr(utils, "CIRCUITO_ABERTO_S", 60.0)
+    liberadas = [disjuntor.permitir() for _ in range(SESSOES)]
+    assert liberadas == [True] + [False] * (SESSOES - 1)
+
+    disjuntor.sucesso()
+    assert disjuntor.permitir() and disjuntor.permitir()
+
+
+def _expirar_registro():
+    """Envelhece as entradas do registro além de qualquer TTL."""
+    with utils.REGISTRO._lock:
+        for chave, (df, b, _) in list(utils.REGISTRO._itens.items()):
+            utils.REGISTRO._itens[chave] = (df, b, time.monotonic() - 86_400)
+
+
+def _planilha_oropouche(pasta):
+    gerar("oropouche", 1_000)
+    return caminho_csv("oropouche", 1_000)
+
+
+@pytest.mark.parametrize("pagina, modulo, planilha", [
+    ("5_Oropouche.py", "oropouche", _planilha_oropouche),
+    ("3_Vigilância_Sanitária.py", "visa", planilha_visa),
+])
+def test_fonte_fora_do_ar_serve_copia_antiga_com_aviso(pagina, modulo, planilha, tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    caminho = planilha(tmp_path)
+    with ServidorFixtures(raiz=os.path.dirname(caminho)) as srv:
+        monkeypatch.setenv(f"PAINEL_URL_{modulo.upper()}", srv.url(caminho))
+        at = AppTest.from_file(os.path.join(RAIZ, "pages", pagina), default_timeout=60)
+        at.run()
+        assert not at.exception
+        metricas = [m.value for m in at.metric]
+        assert metricas
+
+        srv.falhar = True
+        _expirar_registro()
+        at.run()
+        assert not at.exception
+        assert [m.value for m in at.metric] == metricas
+        assert any("indisponível" in w.value for w in at.warning)
+        assert srv.requisicoes == 2
+
+        # a cópia antiga volta a contar o TTL: o rerun seguinte não vai à fonte
+        at.run()
+        assert any("indisponível" in w.value for w in at.warning)
+        assert srv.requisicoes == 2
@@ -0,0 +1,106 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import utils
+from benchmarks.dados import caminho_csv, gerar
+from tests.conftest import RAIZ, planilha_visa
+
+VISA = os.path.join(RAIZ, "pages", "3_Vigilância_Sanitária.py")
+
+
+def _multiselect(at, rotulo):
+    return next(w for w in at.sidebar.multiselect if w.label == rotulo)
+
+
+def test_visa_troca_de_ano_seleciona_todos_os_meses(tmp_path, monkeypatch):
+    monkeypatch.setenv("PAINEL_URL_VISA", planilha_visa(tmp_path))
+    at = AppTest.from_file(VISA, default_timeout=60)
+    at.run()
+    assert not at.exception
+    assert _multiselect(at, "Mês").value == [1, 2, 3]
+    assert at.metric[0].value == "84"
+
+    at.sidebar.selectbox[0].set_value(date.today().year - 1).run()
+
+    assert not at.exception
+    assert not at.warning
+    assert _multiselect(at, "Mês").value == [11, 12]
+    assert at.metric[0].value == "20"
+
+
+PCE = os.path.join(RAIZ, "pages", "4_Programa de Controle_da_Esquistossomose.py")
+
+
+def _planilha_pce(caminho, localidades) -> str:
+    pd.DataFrame({
+        "LOCALIDADE": [loc for loc in localidades for _ in range(3)],
+        "DATA": "2026-01-10",
+    }).to_csv(caminho, index=False)
+    return caminho
+
+
+def test_todos_acompanha_opcoes_novas_se_usuario_nao_restringiu(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "pce.csv")
+    monkeypatch.setenv("PAINEL_URL_PCE", _planilha_pce(caminho, ["Centro", "Camela"]))
+    at = AppTest.from_file(PCE, default_timeout=60)
+    at.run()
+    assert _multiselect(at, "Localidade").value == ["Camela", "Centro"]
+
+    # Nova versão do dataset com uma localidade a mais
+    _planilha_pce(caminho, ["Centro", "Camela", "Socco"])
+    utils.REGISTRO.remover("pce")
+    utils._estado.clear()
+    at.run()
+    assert not at.exception
+    assert _multiselect(at, "Localidade").value == ["Camela", "Centro", "Socco"]
+
+
+def test_todos_restringido_pelo_usuario_e_mantido(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "pce.csv")
+    monkeypatch.setenv("PAINEL_URL_PCE", _planilha_pce(caminho, ["Centro", "Camela"]))
+    at = AppTest.from_file(PCE, default_timeout=60)
+    at.run()
+    _multiselect(at, "Localidade").set_value(["Centro"]).run()
+
+    _planilha_pce(caminho, ["Centro", "Camela", "Socco"])
+    utils.REGISTRO.remover("pce")
+    utils._estado.clear()
+    at.run()
+    assert _multiselect(at, "Localidade").value == ["Centro"]
+
+
+PAGINAS_REUSO = {
+    "trabalhador": os.path.join(RAIZ, "pages", "2_Saúde_do_Trabalhador.py"),
+    "oropouche": os.path.join(RAIZ, "pages", "5_Oropouche.py"),
+}
+
+
+@pytest.mark.parametrize("modulo", sorted(PAGINAS_REUSO))
+def test_segundo_rerun_reaproveita_indices_das_colunas(modulo, monkeypatch):
+    gerar(modulo, 1_000)
+    monkeypatch.setenv(f"PAINEL_URL_{modulo.upper()}", caminho_csv(modulo, 1_000))
+    utils.CACHE_COLUNAS._itens.clear()
+    utils.CACHE_COLUNAS._bytes = 0
+    at = AppTest.from_file(PAGINAS_REUSO[modulo], default_timeout=60)
+    at.run()
+    assert not at.exception
+    chaves = list(utils.CACHE_COLUNAS._itens)
+    assert chaves
+
+    at.run()
+    assert not at.exception
+    assert list(utils.CACHE_COLUNAS._itens) == chaves
+
+
+def test_cache_de_colunas_limita_numero_de_entradas():
+    cache = utils.CacheColunas(limite_bytes=2**30, limite_itens=3)
+    series = [pd.Series([i, i + 1]) for i in range(5)]
+    for s in series:
+        cache.obter(s, utils._fatorar)
+
+    assert len(cache._itens) == 3
+    assert cache._bytes == sum(b for _, _, b in cache._itens.values())
@@ -0,0 +1,55 @@
+"""Contabilidade de memória: bytes por coluna e por dataset."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+LINHAS = 1_000
+
+
+def _frame():
+    return pd.DataFrame({
+        "inteiro": np.arange(LINHAS, dtype=np.int64),
+        "real": np.zeros(LINHAS, dtype=np.float32),
+        "flag": np.ones(LINHAS, dtype=bool),
+        "sexo": pd.Series(["Feminino", "Masculino"] * (LINHAS // 2), dtype=object),
+        "id": pd.Series([f"id-{i:05d}" for i in range(LINHAS)], dtype=object),
+    })
+
+
+def test_bytes_por_coluna(monkeypatch):
+    monkeypatch.setattr(utils, "LIMIAR_CANDIDATA_BYTES", 1)
+    df = _frame()
+    medidas = utils.medir_colunas(df).set_index("coluna")
+
+    ponteiros = 8 * LINHAS
+    assert medidas.loc["inteiro", "bytes"] == 8 * LINHAS
+    assert medidas.loc["real", "bytes"] == 4 * LINHAS
+    assert medidas.loc["flag", "bytes"] == LINHAS
+    assert medidas.loc["sexo", "bytes"] == ponteiros + sum(sys.getsizeof(v) for v in df["sexo"])
+    assert medidas.loc["id", "bytes"] == ponteiros + sum(sys.getsizeof(v) for v in df["id"])
+    assert medidas["bytes"].is_monotonic_decreasing
+
+    # texto com poucos distintos vira candidata a category; identificador não
+    assert medidas.loc["sexo", "distintos"] == 2
+    assert medidas.loc["sexo", "candidata_categoria"]
+    assert not medidas.loc["id", "candidata_categoria"]
+    assert not medidas.loc["inteiro", "candidata_categoria"]
+
+    assert utils.medir_colunas(df) is utils.medir_colunas(df)   # memorizado por df
+
+
+def test_memoria_soma_os_datasets_do_registro(monkeypatch):
+    monkeypatch.setattr(utils, "LIMIAR_CANDIDATA_BYTES", 1)
+    df = _frame()
+    utils.REGISTRO.guardar(("teste_memoria",), df)
+
+    m = utils.memoria()
+
+    (dataset,) = [d for d in m["datasets"] if d["dataset"] == "teste_memoria"]
+    assert dataset["linhas"] == LINHAS
+    assert dataset["bytes"] == int(df.memory_usage(index=True, deep=True).sum())
+    assert [c["coluna"] for c in m["candidatas_categoria"] if c["dataset"] == "teste_memoria"] == ["sexo"]
@@ -0,0 +1,78 @@
+"""Métricas no formato texto do Prometheus: /metrics e textfile."""
+
+import re
+import urllib.request
+
+import pytest
+
+import utils
+
+AMOSTRA = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (\S+)$')
+ROTULO = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _ler(texto: str):
+    """{nome: tipo} e [(nome, {rótulos}, valor)] de uma exposição em texto."""
+    tipos, amostras = {}, []
+    for linha in texto.splitlines():
+        if linha.startswith("# TYPE "):
+            _, _, nome, tipo = linha.split(" ", 3)
+            tipos[nome] = tipo
+        elif linha and not linha.startswith("#"):
+            m = AMOSTRA.match(linha)
+            assert m, f"linha fora do formato: {linha!r}"
+            rotulos = dict(ROTULO.findall(m.group(2) or ""))
+            amostras.append((m.group(1), rotulos, float(m.group(3))))
+    return tipos, amostras
+
+
+def _metricas():
+    m = utils.Metricas()
+    m.definir("teste_rerun_segundos", "histogram", "Duração.", (0.1, 1))
+    m.definir("teste_downloads_total", "counter", "Downloads.")
+    for valor in (0.05, 0.5, 2):
+        m.observar("teste_rerun_segundos", valor, pagina="dengue")
+    m.contar("teste_downloads_total", fonte='vi"sa')
+    m.contar("teste_downloads_total", 2, fonte='vi"sa')
+    return m
+
+
+def _conferir(texto):
+    tipos, amostras = _ler(texto)
+    assert tipos["teste_rerun_segundos"] == "histogram"
+    assert tipos["teste_downloads_total"] == "counter"
+    valores = {(n, tuple(sorted(r.items()))): v for n, r, v in amostras}
+    buckets = [valores[("teste_rerun_segundos_bucket", (("le", le), ("pagina", "dengue")))]
+               for le in ("0.1", "1", "+Inf")]
+    assert buckets == [1, 2, 3]
+    assert valores[("teste_rerun_segundos_count", (("pagina", "dengue"),))] == 3
+    assert valores[("teste_rerun_segundos_sum", (("pagina", "dengue"),))] == pytest.approx(2.55)
+    assert valores[("teste_downloads_total", (("fonte", 'vi\\"sa'),))] == 3
+
+
+@pytest.fixture
+def metricas(monkeypatch):
+    m = _metricas()
+    monkeypatch.setattr(utils, "METRICAS", m)
+    return m
+
+
+def test_scrape_do_sidecar(metricas, monkeypatch):
+    monkeypatch.setattr(utils, "_servidor_metricas", None)
+    servidor = utils.iniciar_servidor_metricas(porta=0, host="127.0.0.1")
+    try:
+        host, porta = servidor.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{porta}/metrics", timeout=5) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            _conferir(resp.read().decode("utf-8"))
+        assert utils.iniciar_servidor_metricas(porta=0) is servidor   # uma vez por processo
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_textfile(metricas, tmp_path):
+    caminho = tmp_path / "painel.prom"
+    utils.gravar_metricas(str(caminho))
+    _conferir(caminho.read_text(encoding="utf-8"))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,55 @@
+"""Projeção pública (``usecols``): colunas sensíveis não são lidas."""
+
+import pytest
+
+import utils
+
+SENSIVEIS = [
+    "NOME", "Nome do Paciente", "NOME_DA_MAE", "CPF", "cpf do paciente",
+    "DATA_DE_NASCIMENTO", "Data de Nascimento", "DN", "RUA", "Endereço",
+    "ENDERECO_COMPLETO", "TELEFONE", "Celular",
+]
+PUBLICAS = [
+    "ESTRUTURA", "SEXO", "BAIRRO", "FAIXA_ETARIA", "CLASSIFICACAO_FINAL",
+    "SEMANA_EPIDEMIOLOGICA", "DATA_NOTIFICACAO", "DINAMICA", "CORRUAGEM",
+]
+
+
+@pytest.mark.parametrize("coluna", SENSIVEIS)
+def test_colunas_sensiveis_ficam_de_fora(coluna):
+    assert not utils.projecao_publica()(coluna)
+
+
+@pytest.mark.parametrize("coluna", PUBLICAS)
+def test_colunas_publicas_sao_mantidas(coluna):
+    # tokens curtos (DN, RUA) só contam como palavra inteira
+    assert utils.projecao_publica()(coluna)
+
+
+def test_protegidas_sao_mantidas_mesmo_com_token():
+    usar = utils.projecao_publica(protegidas=["Endereço de Residência", "DATA DN"])
+    assert usar("ENDERECO_DE_RESIDENCIA")
+    assert usar("data dn")
+    assert not usar("ENDERECO")
+
+
+def test_candidatos_do_oropouche_sao_mantidos():
+    from benchmarks.cenarios import carregar_pagina
+
+    pg = carregar_pagina("oropouche")
+    for coluna in pg.CANDIDATOS_LOCALIDADE + pg.CANDIDATOS_DATA:
+        assert pg.COLUNAS_PUBLICAS(coluna), coluna
+    assert not pg.COLUNAS_PUBLICAS("NOME DO PACIENTE")
+
+
+def test_planilha_so_com_colunas_sensiveis_vira_frame_vazio(tmp_path):
+    caminho = tmp_path / "sensivel.csv"
+    caminho.write_text("NOME,CPF,RUA\nAna,123,Rua A\n", encoding="utf-8")
+    assert utils.ler_csv(str(caminho), usecols=utils.projecao_publica()).empty
+
+
+def test_leitura_projeta_so_as_publicas(tmp_path):
+    caminho = tmp_path / "misto.csv"
+    caminho.write_text("NOME,SEXO,DATA DE NASCIMENTO,ESTRUTURA\nAna,F,01/01/1990,X\n", encoding="utf-8")
+    df = utils.ler_csv(str(caminho), dtype=str, usecols=utils.projecao_publica())
+    assert list(df.columns) == ["SEXO", "ESTRUTURA"]
@@ -0,0 +1,66 @@
+"""Registro de datasets: LRU com orçamento em bytes."""
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+
+def _df(linhas):
+    return pd.DataFrame({"v": np.zeros(linhas, dtype=np.int64)})
+
+
+def _tamanho(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _nomes(registro):
+    return sorted(nome for nome, _, _ in registro.itens())
+
+
+def test_estouro_do_orcamento_despeja_o_menos_usado():
+    a, b, c = _df(1_000), _df(1_000), _df(1_000)
+    registro = utils.RegistroDatasets(_tamanho(a) * 2 + 100)
+    registro.guardar(("a",), a)
+    registro.guardar(("b",), b)
+    assert registro.obter(("a",)) is a   # "a" passa a ser o mais recente
+
+    registro.guardar(("c",), c)
+
+    assert _nomes(registro) == ["a", "c"]
+    assert registro.obter(("b",)) is None
+    est = registro.estatisticas()
+    assert est["despejos"] == 1
+    assert est["mb"] <= est["orcamento_mb"]
+
+
+def test_dataset_maior_que_o_orcamento_fica_sozinho():
+    pequeno, grande = _df(100), _df(10_000)
+    registro = utils.RegistroDatasets(_tamanho(pequeno) * 3)
+    registro.guardar(("pequeno",), pequeno)
+
+    registro.guardar(("grande",), grande)
+
+    assert _nomes(registro) == ["grande"]
+    assert registro.obter(("grande",)) is grande
+    assert registro.estatisticas()["despejos"] == 1
+
+
+def test_substituir_entrada_nao_conta_bytes_em_dobro():
+    registro = utils.RegistroDatasets(2**30)
+    registro.guardar(("a",), _df(1_000))
+    registro.guardar(("a",), _df(10))
+    assert registro._bytes == _tamanho(_df(10))
+
+
+def test_ttl_expira_e_renovar_reinicia_a_contagem(monkeypatch):
+    agora = [1_000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: agora[0])
+    registro = utils.RegistroDatasets(2**30)
+    df = _df(10)
+    registro.guardar(("a",), df)
+
+    agora[0] += 61
+    assert registro.obter(("a",), ttl=60) is None
+    registro.renovar(("a",))
+    assert registro.obter(("a",), ttl=60) is df
@@ -0,0 +1,78 @@
+"""Tabela paginada: limites das páginas, última página parcial e ordenação."""
+
+from streamlit.testing.v1 import AppTest
+
+import utils
+
+
+def _app():
+    import numpy as np
+    import pandas as pd
+
+    import utils
+
+    @utils.pagina_medida("teste_tabela")
+    def main():
+        execucao = utils.execucao_atual()
+        if execucao is not None:
+            execucao.datasets["teste"] = "v1"
+        df = pd.DataFrame({
+            "n": np.arange(120),
+            "grupo": ["b", "a", None] * 40,
+        })
+        utils.tabela_paginada(df, "t")
+
+    main()
+
+
+def _tabela(at):
+    return at.dataframe[0].value
+
+
+def _caption(at):
+    return at.caption[-1].value
+
+
+def test_paginas_e_ultima_pagina_parcial():
+    at = AppTest.from_function(_app).run()
+    assert not at.exception
+    assert len(_tabela(at)) == 50
+    assert _caption(at) == "Página 1 de 3 • linhas 1–50 de 120"
+
+    at.number_input(key="t_pagina").set_value(3).run()
+    assert _tabela(at)["n"].tolist() == list(range(100, 120))
+    assert _caption(at) == "Página 3 de 3 • linhas 101–120 de 120"
+
+
+def test_busca_encolhe_e_traz_a_pagina_para_o_limite():
+    at = AppTest.from_function(_app).run()
+    at.number_input(key="t_pagina").set_value(3).run()
+
+    at.text_input(key="t_busca").set_value("11").run()   # 11, 110..119
+    assert not at.exception
+    assert at.number_input(key="t_pagina").value == 1
+    assert _tabela(at)["n"].tolist() == [11] + list(range(110, 120))
+    assert _caption(at) == "Página 1 de 1 • linhas 1–11 de 11"
+
+
+def test_ordenacao_vale_para_o_conjunto_todo(monkeypatch):
+    chamadas = []
+    original = utils._ordem
+    monkeypatch.setattr(utils, "_ordem", lambda *a: chamadas.append(a[1]) or original(*a))
+
+    at = AppTest.from_function(_app).run()
+    at.selectbox(key="t_ordem").set_value("n").run()
+    at.selectbox(key="t_direcao").set_value("Decrescente").run()
+    assert _tabela(at)["n"].tolist() == list(range(119, 69, -1))
+
+    at.number_input(key="t_pagina").set_value(2).run()
+    assert _tabela(at)["n"].tolist() == list(range(69, 19, -1))
+    assert chamadas == [False, True]   # trocar de página não reordena
+
+    # ausentes por último, estável entre iguais
+    at.selectbox(key="t_ordem").set_value("grupo").run()
+    at.selectbox(key="t_direcao").set_value("Crescente").run()
+    at.number_input(key="t_pagina").set_value(1).run()
+    assert _tabela(at)["n"].tolist()[:3] == [1, 4, 7]
+    at.number_input(key="t_pagina").set_value(3).run()
+    assert _tabela(at)["grupo"].isna().all()
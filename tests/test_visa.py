@@ -0,0 +1,101 @@
+"""Backlog da VISA: série incremental de abertos, aging e percentis."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.cenarios import carregar_pagina
+
+
+@pytest.fixture(scope="module")
+def visa():
+    return carregar_pagina("visa")
+
+
+DIA0 = int(np.datetime64("2024-01-01", "D").astype(np.int64))
+
+
+def _data(dia):
+    return "" if dia is None else str(np.datetime64(int(dia), "D"))
+
+
+def _planilha(pares):
+    return pd.DataFrame({
+        "ENTRADA": [_data(e) for e, _ in pares],
+        "DATA CONCLUSÃO": [_data(c) for _, c in pares],
+    })
+
+
+def _abertos_na_forca(pares, dia):
+    """Abertos no dia: entrou até ele e não concluiu até ele."""
+    return sum(
+        1 for e, c in pares
+        if e <= dia and (c is None or max(c, e) > dia)
+    )
+
+
+def test_backlog_incremental_bate_com_recontagem(visa):
+    rng = np.random.default_rng(0)
+    pares = []
+    snapshots = visa.SnapshotsBacklog()
+    for hoje in range(DIA0 + 20, DIA0 + 120, 7):
+        # novas entradas até hoje; algumas antigas são concluídas
+        for _ in range(15):
+            e = int(rng.integers(DIA0, hoje + 1))
+            pares.append((e, None))
+        for i in rng.choice(len(pares), size=5, replace=False):
+            e, c = pares[i]
+            if c is None:
+                pares[i] = (e, int(rng.integers(e, hoje + 1)))
+
+        serie = snapshots.atualizar(_planilha(pares), hoje, versao=f"v{hoje}")
+
+        dias = [int(d) for d in serie.index.to_numpy(dtype="datetime64[D]").astype(np.int64)]
+        assert dias[-1] == hoje
+        assert serie.tolist() == [_abertos_na_forca(pares, d) for d in dias]
+
+
+def test_backlog_mesma_versao_e_dia_nao_relê_os_dados(visa, monkeypatch):
+    snapshots = visa.SnapshotsBacklog()
+    df = _planilha([(DIA0, DIA0 + 3), (DIA0 + 2, None)])
+    primeira = snapshots.atualizar(df, DIA0 + 10, versao="v1")
+
+    lidas = []
+    original = visa._dias
+    monkeypatch.setattr(visa, "_dias", lambda *a: lidas.append(a[1]) or original(*a))
+    assert snapshots.atualizar(df, DIA0 + 10, versao="v1") is primeira
+    assert lidas == []
+
+    # outro dia (ou outra versão) recalcula
+    assert len(snapshots.atualizar(df, DIA0 + 11, versao="v1")) == len(primeira) + 1
+    assert lidas
+
+
+def test_aging_por_faixa(visa):
+    hoje = DIA0 + 300
+    df = _planilha([(hoje - 10, None), (hoje - 30, None), (hoje - 31, None),
+                    (hoje - 200, None), (hoje - 50, hoje - 5)])
+    aging = visa.calcular_aging(df, hoje)
+    assert aging["Processos"].tolist() == [2, 1, 0, 0, 1]
+
+
+def test_tabela_percentis(visa):
+    tempos = {"Até a conclusão": np.arange(1, 101), "Até a 1ª inspeção": np.array([], dtype=np.int64)}
+    tabela = visa.tabela_percentis(tempos).set_index("Intervalo")
+
+    assert tabela.loc["Até a conclusão", "Processos"] == 100
+    assert tabela.loc["Até a conclusão", "P50 (dias)"] == 50.5
+    assert tabela.loc["Até a conclusão", "P90 (dias)"] == 90.1
+    assert tabela.loc["Até a 1ª inspeção", "Processos"] == 0
+    assert tabela.loc["Até a 1ª inspeção"].filter(like="(dias)").isna().all()
+
+
+def test_tempos_ignoram_datas_invertidas_e_ausentes(visa):
+    df = pd.DataFrame({
+        "ENTRADA": ["2024-01-01", "2024-01-10", "2024-01-05", ""],
+        "1ª INSPEÇÃO": ["2024-01-03", "2024-01-01", "", "2024-01-02"],
+        "DATA CONCLUSÃO": ["2024-01-11", "", "2024-01-06", ""],
+    })
+    tempos = visa.calcular_tempos(df)
+    assert tempos["Até a 1ª inspeção"].tolist() == [2]
+    assert tempos["Até a conclusão"].tolist() == [10, 1]
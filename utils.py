@@ -1 +1,1946 @@
-print('utils')
\ No newline at end of file
+"""
+Funções compartilhadas pelos painéis de Vigilância em Saúde do Ipojuca.
+"""
+
+import cProfile
+import functools
+import hashlib
+import inspect
+import io
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Com copy-on-write, cópias rasas de um DataFrame compartilhado são seguras:
+# qualquer escrita numa sessão copia só a coluna alterada (padrão no pandas 3).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+log = logging.getLogger("painel")
+
+# ==========================================================
+# NORMALIZAÇÃO DE NOMES DE COLUNA
+# ==========================================================
+
+def normalizar_coluna(col) -> str:
+    """Sem acento, maiúsculo, com '_' no lugar de espaço, '-' e '/'."""
+    s = unicodedata.normalize("NFKD", str(col)).encode("ascii", "ignore").decode()
+    s = s.strip().upper().replace(".", "")
+    return s.replace(" ", "_").replace("-", "_").replace("/", "_")
+
+
+# ==========================================================
+# PROJEÇÃO DE COLUNAS — DADOS SENSÍVEIS FORA DA LEITURA
+# ==========================================================
+
+# Tokens curtos só contam como palavra inteira (separada por "_"),
+# para que "DN" ou "RUA" não derrubem colunas como "ESTRUTURA".
+TOKENS_SENSIVEIS = [
+    "NOME", "PACIENTE", "MAE", "RUA", "ENDERECO",
+    "TELEFONE", "CELULAR", "CPF",
+    "NASCIMENTO", "NASC", "DN",
+]
+
+
+def eh_sensivel(col, tokens=TOKENS_SENSIVEIS) -> bool:
+    nome = normalizar_coluna(col)
+    partes = set(nome.split("_"))
+    for tok in tokens:
+        if len(tok) <= 3:
+            if tok in partes:
+                return True
+        elif tok in nome:
+            return True
+    return False
+
+
+def projecao_publica(protegidas=(), tokens=TOKENS_SENSIVEIS):
+    """
+    Retorna um callable para o parâmetro ``usecols`` de ``pd.read_csv`` /
+    ``pd.read_excel``: as colunas sensíveis nem chegam a ser materializadas,
+    então nunca entram no cache. ``protegidas`` lista nomes que devem ser
+    mantidos mesmo contendo algum token (ex.: a coluna de localidade).
+    """
+    protegidas_norm = {normalizar_coluna(c) for c in protegidas}
+
+    def usar_coluna(col) -> bool:
+        return normalizar_coluna(col) in protegidas_norm or not eh_sensivel(col, tokens)
+
+    return usar_coluna
+
+
+# ==========================================================
+# TABELA PAGINADA — SÓ A JANELA VISÍVEL VAI PARA O NAVEGADOR
+# ==========================================================
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+
+def _filtrar_busca(df: pd.DataFrame, termo: str) -> pd.DataFrame:
+    mascara = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        serie = df[col]
+        if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+            serie = serie.astype(str)
+        mascara |= serie.str.contains(termo, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return df[mascara]
+
+
+def _ordem(serie: pd.Series, decrescente: bool) -> np.ndarray:
+    """Posições que ordenam a série (ausentes por último), sem ordenar o DataFrame inteiro."""
+    return (
+        serie.reset_index(drop=True)
+        .sort_values(ascending=not decrescente, na_position="last", kind="stable")
+        .index.to_numpy()
+    )
+
+
+def _ordem_memorizada(df: pd.DataFrame, coluna: str, decrescente: bool, chave: str) -> np.ndarray:
+    """
+    ``_ordem`` guardada na sessão pela versão dos datasets do rerun, pelas
+    linhas do recorte e pela ordenação pedida: trocar de página não reordena.
+    """
+    execucao = execucao_atual()
+    versoes = tuple(sorted(execucao.datasets.items())) if execucao is not None else ()
+    if not versoes or not all(v for _, v in versoes):
+        return _ordem(df[coluna], decrescente)
+    linhas = _hash_curto(pd.util.hash_array(df.index.to_numpy()).tobytes())
+    assinatura = (versoes, linhas, coluna, decrescente)
+    guardada = st.session_state.get(f"{chave}_ordem_memo")
+    if guardada is not None and guardada[0] == assinatura:
+        return guardada[1]
+    ordem = _ordem(df[coluna], decrescente)
+    st.session_state[f"{chave}_ordem_memo"] = (assinatura, ordem)
+    return ordem
+
+
+def tabela_paginada(df: pd.DataFrame, chave: str):
+    """
+    Tabela com busca, ordenação e paginação feitas no servidor: apenas as
+    linhas da página atual são serializadas para o navegador, então o custo
+    de renderização não cresce com o número de registros.
+    """
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    termo = c1.text_input("Buscar", key=f"{chave}_busca").strip()
+    ordenar_por = c2.selectbox("Ordenar por", ["—"] + list(df.columns), key=f"{chave}_ordem")
+    decrescente = c3.selectbox("Direção", ["Crescente", "Decrescente"], key=f"{chave}_direcao") == "Decrescente"
+    por_pagina = c4.selectbox("Linhas", TAMANHOS_PAGINA, index=1, key=f"{chave}_por_pagina")
+
+    if termo:
+        df = _filtrar_busca(df, termo)
+
+    total = len(df)
+    n_paginas = max(1, -(-total // por_pagina))
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.get(chave_pagina, 1) > n_paginas:
+        st.session_state[chave_pagina] = n_paginas
+
+    pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key=chave_pagina)
+    ini = (pagina - 1) * por_pagina
+    fim = min(ini + por_pagina, total)
+
+    if ordenar_por != "—":
+        janela = df.iloc[_ordem_memorizada(df, ordenar_por, decrescente, chave)[ini:fim]]
+    else:
+        janela = df.iloc[ini:fim]
+
+    with etapa("tabela", total) as registro:
+        janela = janela.reset_index(drop=True)
+        registro["linhas_saida"] = len(janela)
+        if painel_perf_ativo():
+            registro["bytes"] = int(janela.memory_usage(deep=True).sum())
+        st.dataframe(janela, use_container_width=True)
+    st.caption(f"Página {pagina} de {n_paginas} • linhas {ini + 1 if total else 0}–{fim} de {total}")
+
+
+# ==========================================================
+# BANCO LOCAL OPCIONAL (SQLite / DuckDB)
+# ==========================================================
+# Com PAINEL_BANCO_LOCAL=/caminho/painel.sqlite (ou .duckdb) os módulos
+# ingerem a planilha num arquivo local e filtram/agregam por SQL
+# parametrizado, sem manter o DataFrame completo em cada worker.
+# Sem a variável, tudo continua em pandas.
+
+BANCO_LOCAL = os.environ.get("PAINEL_BANCO_LOCAL", "")
+
+_contagens_ingestao = {}   # (tabela, coluna) -> {valor: linhas}; limpo a cada ingestão
+_lock_contagens_banco = threading.Lock()
+
+
+class FiltroBanco(NamedTuple):
+    """Recorte filtrado de uma tabela do banco local (equivale ao df_filtrado)."""
+    tabela: str
+    selecoes: dict
+    colunas: list
+
+
+def banco_ativo() -> bool:
+    return bool(BANCO_LOCAL)
+
+
+def _conectar():
+    if BANCO_LOCAL.endswith(".duckdb"):
+        import duckdb
+        return duckdb.connect(BANCO_LOCAL)
+    return sqlite3.connect(BANCO_LOCAL)
+
+
+def _ident(nome: str) -> str:
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+def _consultar(sql: str, params: list) -> pd.DataFrame:
+    con = _conectar()
+    try:
+        if BANCO_LOCAL.endswith(".duckdb"):
+            return con.execute(sql, params).df()
+        return pd.read_sql_query(sql, con, params=params)
+    finally:
+        con.close()
+
+
+def ingerir_tabela(tabela: str, df: pd.DataFrame, indexar: list[str] = ()) -> FiltroBanco:
+    """Grava o DataFrame como tabela do banco local (substituindo a anterior)."""
+    con = _conectar()
+    try:
+        if BANCO_LOCAL.endswith(".duckdb"):
+            con.register("_ingestao", df)
+            con.execute(f"CREATE OR REPLACE TABLE {_ident(tabela)} AS SELECT * FROM _ingestao")
+            con.unregister("_ingestao")
+        else:
+            # Grava ao lado e troca numa transação só: quem consulta durante a
+            # ingestão vê a tabela antiga inteira, nunca uma pela metade.
+            temporaria = f"{tabela}__ingestao"
+            con.execute(f"DROP TABLE IF EXISTS {_ident(temporaria)}")
+            df.to_sql(temporaria, con, index=False, chunksize=10_000)
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                con.execute(f"DROP TABLE IF EXISTS {_ident(tabela)}")
+                con.execute(f"ALTER TABLE {_ident(temporaria)} RENAME TO {_ident(tabela)}")
+                for col in indexar:
+                    if col in df.columns:
+                        con.execute(
+                            f"CREATE INDEX IF NOT EXISTS {_ident(f'ix_{tabela}_{col}')} "
+                            f"ON {_ident(tabela)} ({_ident(col)})"
+                        )
+                con.commit()
+            except BaseException:
+                con.rollback()
+                raise
+    finally:
+        con.close()
+    with _lock_contagens_banco:
+        for chave in [k for k in _contagens_ingestao if k[0] == tabela]:
+            del _contagens_ingestao[chave]
+    return FiltroBanco(tabela, {}, list(df.columns))
+
+
+def abrir_tabela(tabela: str) -> FiltroBanco | None:
+    """Tabela já ingerida numa execução anterior (ou None se não existir)."""
+    try:
+        cols = _consultar(f"SELECT * FROM {_ident(tabela)} LIMIT 0", []).columns
+    except Exception:
+        return None
+    return FiltroBanco(tabela, {}, list(cols))
+
+
+def _where(selecoes: dict) -> tuple[str, list]:
+    partes, params = [], []
+    for col, valores in selecoes.items():
+        if valores:
+            partes.append(f"{_ident(col)} IN ({', '.join('?' * len(valores))})")
+            params.extend(v.item() if isinstance(v, np.generic) else v for v in valores)
+    return (" WHERE " + " AND ".join(partes)) if partes else "", params
+
+
+def filtrar(fonte, selecoes: dict):
+    """Aplica seleções {coluna: valores} ao DataFrame ou ao recorte do banco."""
+    if isinstance(fonte, FiltroBanco):
+        return fonte._replace(selecoes={**fonte.selecoes, **selecoes})
+    for col, valores in selecoes.items():
+        if valores:
+            fonte = fonte[fonte[col].isin(valores)]
+    return fonte
+
+
+def colunas(fonte) -> list:
+    return list(fonte.colunas if isinstance(fonte, FiltroBanco) else fonte.columns)
+
+
+def contar_linhas(fonte) -> int:
+    if isinstance(fonte, FiltroBanco):
+        where, params = _where(fonte.selecoes)
+        return int(_consultar(f"SELECT COUNT(*) AS QTD FROM {_ident(fonte.tabela)}{where}", params)["QTD"].iloc[0])
+    return len(fonte)
+
+
+def valores_distintos(fonte, col: str) -> list:
+    if isinstance(fonte, FiltroBanco):
+        where, params = _where(fonte.selecoes)
+        cond = f"{_ident(col)} IS NOT NULL"
+        where = f"{where} AND {cond}" if where else f" WHERE {cond}"
+        sql = f"SELECT DISTINCT {_ident(col)} AS V FROM {_ident(fonte.tabela)}{where} ORDER BY 1"
+        return _consultar(sql, params)["V"].tolist()
+    return sorted(fonte[col].dropna().unique())
+
+
+def contar_por(fonte, cols: list[str]) -> pd.DataFrame:
+    """Contagem por combinação das colunas (ausentes ignorados), maior primeiro."""
+    if isinstance(fonte, FiltroBanco):
+        where, params = _where(fonte.selecoes)
+        nao_nulos = " AND ".join(f"{_ident(c)} IS NOT NULL" for c in cols)
+        where = f"{where} AND {nao_nulos}" if where else f" WHERE {nao_nulos}"
+        grupo = ", ".join(_ident(c) for c in cols)
+        sql = (
+            f"SELECT {grupo}, COUNT(*) AS QTD FROM {_ident(fonte.tabela)}{where} "
+            f"GROUP BY {grupo} ORDER BY QTD DESC"
+        )
+        return _consultar(sql, params)
+    return (
+        fonte.groupby(cols).size().reset_index(name="QTD")
+        .sort_values("QTD", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def _contagens_banco(fonte: FiltroBanco, col: str) -> dict:
+    """Linhas por valor da coluna na tabela inteira, até a próxima ingestão."""
+    chave = (fonte.tabela, col)
+    with _lock_contagens_banco:
+        if chave in _contagens_ingestao:
+            return _contagens_ingestao[chave]
+    tabela = contar_por(FiltroBanco(fonte.tabela, {}, fonte.colunas), [col]).sort_values(col, kind="stable")
+    contagens = dict(zip(tabela[col].tolist(), tabela["QTD"].tolist()))
+    with _lock_contagens_banco:
+        _contagens_ingestao[chave] = contagens
+    return contagens
+
+
+def linhas(fonte) -> pd.DataFrame:
+    """Materializa o recorte (usar só onde as linhas são de fato necessárias)."""
+    if isinstance(fonte, FiltroBanco):
+        where, params = _where(fonte.selecoes)
+        return _consultar(f"SELECT * FROM {_ident(fonte.tabela)}{where}", params)
+    return fonte
+
+
+# ==========================================================
+# REGISTRO COMPARTILHADO DE DATASETS (ENTRE SESSÕES)
+# ==========================================================
+# Um único exemplar de cada planilha por processo, dentro de um orçamento
+# de memória (PAINEL_CACHE_MB). Cada sessão recebe uma cópia rasa: nada é
+# serializado nem duplicado, e o copy-on-write isola as escritas locais.
+
+ORCAMENTO_CACHE_MB = float(os.environ.get("PAINEL_CACHE_MB", "512"))
+
+
+class RegistroDatasets:
+    """Cache LRU de DataFrames com orçamento em bytes e estatísticas."""
+
+    def __init__(self, orcamento_bytes: int):
+        self.orcamento = orcamento_bytes
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()   # chave -> (df, bytes, criado_em)
+        self._bytes = 0
+        self.hits = self.misses = self.despejos = 0
+
+    def obter(self, chave, ttl: float | None = None, contar: bool = True):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or (ttl is not None and time.monotonic() - item[2] > ttl):
+                self.misses += contar
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += contar
+            return item[0]
+
+    def guardar(self, chave, df: pd.DataFrame):
+        tamanho = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= antigo[1]
+            self._itens[chave] = (df, tamanho, time.monotonic())
+            self._bytes += tamanho
+            # Despeja os menos usados recentemente; o recém-chegado fica
+            # mesmo que sozinho estoure o orçamento.
+            while self._bytes > self.orcamento and len(self._itens) > 1:
+                velho, (_, b, _) = self._itens.popitem(last=False)
+                self._bytes -= b
+                self.despejos += 1
+                log.info("cache: despejado %s (%.1f MB)", velho[0], b / 2**20)
+            if tamanho > self.orcamento:
+                log.warning("cache: %s (%.1f MB) excede o orçamento", chave[0], tamanho / 2**20)
+
+    def renovar(self, chave):
+        """Recomeça a contagem do TTL da entrada (cópia antiga mantida de propósito)."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens[chave] = (item[0], item[1], time.monotonic())
+
+    def remover(self, nome: str):
+        with self._lock:
+            for chave in [c for c in self._itens if c[0] == nome]:
+                self._bytes -= self._itens.pop(chave)[1]
+
+    def itens(self) -> list[tuple[str, pd.DataFrame, int]]:
+        """(nome, df, bytes) de cada dataset guardado, do mais ao menos recente."""
+        with self._lock:
+            return [(chave[0], df, b) for chave, (df, b, _) in reversed(self._itens.items())]
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "mb": round(self._bytes / 2**20, 1),
+                "orcamento_mb": round(self.orcamento / 2**20, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "despejos": self.despejos,
+            }
+
+
+REGISTRO = RegistroDatasets(int(ORCAMENTO_CACHE_MB * 2**20))
+
+_em_voo = {}   # chave -> Future da carga em andamento
+_lock_voo = threading.Lock()
+
+
+class _CargaAbandonada(Exception):
+    """O dono da carga saiu sem resultado (st.stop, rerun, Ctrl+C)."""
+
+
+def voo_unico(chave, funcao):
+    """
+    Executa ``funcao()`` uma única vez por chave: chamadas simultâneas (de
+    outras sessões) esperam o resultado da primeira em vez de repetir o
+    download e o parse. Erros (``Exception``) também são repassados a quem
+    espera; já o controle de fluxo do dono (StopException, RerunException,
+    KeyboardInterrupt) fica só na sessão dele, e quem esperava tenta de novo.
+    """
+    while True:
+        with _lock_voo:
+            futuro = _em_voo.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = _em_voo[chave] = Future()
+        if dono:
+            resultado = erro = None
+            try:
+                resultado = funcao()
+            except Exception as e:
+                erro = e
+            except BaseException:
+                erro = _CargaAbandonada()
+                raise
+            finally:
+                # sai do mapa antes de acordar quem espera, para que uma nova
+                # tentativa não reencontre este mesmo futuro
+                with _lock_voo:
+                    _em_voo.pop(chave, None)
+                if erro is None:
+                    futuro.set_result(resultado)
+                else:
+                    futuro.set_exception(erro)
+        try:
+            return futuro.result()
+        except _CargaAbandonada:
+            continue
+
+
+# ----------------------------------------------------------
+# Camada em disco (Arrow IPC mapeado em memória)
+# ----------------------------------------------------------
+# Após um restart, o primeiro acesso lê o último exemplar gravado em
+# PAINEL_CACHE_DIR (milissegundos) e revalida a planilha em segundo plano.
+# O arquivo é versionado pelo código do módulo carregador; o JSON ao lado
+# guarda o hash do conteúdo obtido da fonte. PAINEL_CACHE_DIR="" desliga.
+
+DIR_CACHE = os.environ.get(
+    "PAINEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+_revalidando = set()
+_lock_revalidacao = threading.Lock()
+
+
+def _hash_curto(dados: bytes) -> str:
+    return hashlib.sha256(dados).hexdigest()[:16]
+
+
+def _versao_codigo(func) -> str:
+    """
+    Hash do arquivo do carregador e deste módulo: mudar a leitura
+    (``ler_csv``, ``_lotes_pyarrow``, ``projecao_publica``...) também
+    invalida o exemplar em disco.
+    """
+    try:
+        with open(inspect.getfile(func), "rb") as f:
+            partes = [f.read()]
+    except (OSError, TypeError):
+        partes = [func.__code__.co_code]
+    with open(__file__, "rb") as f:
+        partes.append(f.read())
+    return _hash_curto(b"\0".join(partes))
+
+
+def hash_conteudo(df: pd.DataFrame) -> str:
+    try:
+        linhas_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        return ""
+    return _hash_curto(repr(list(df.columns)).encode() + linhas_hash.tobytes())
+
+
+class ArquivoCache(NamedTuple):
+    prefixo: str   # nome + chave: versões antigas do mesmo dataset são apagadas
+    versao: str
+
+    @property
+    def dados(self) -> str:
+        return os.path.join(DIR_CACHE, f"{self.prefixo}-{self.versao}.arrow")
+
+    @property
+    def meta(self) -> str:
+        return os.path.join(DIR_CACHE, f"{self.prefixo}-{self.versao}.json")
+
+
+def ler_disco(arq: ArquivoCache):
+    """DataFrame gravado e seus metadados, ou (None, None)."""
+    if not DIR_CACHE or not os.path.exists(arq.dados):
+        return None, None
+    try:
+        from pyarrow import feather
+        df = feather.read_table(arq.dados, memory_map=True).to_pandas()
+        with open(arq.meta, encoding="utf-8") as f:
+            return df, json.load(f)
+    except Exception as e:
+        log.warning("cache em disco ilegível (%s): %s", arq.dados, e)
+        return None, None
+
+
+def gravar_disco(arq: ArquivoCache, df: pd.DataFrame | None, meta: dict):
+    """Grava dados + metadados; com ``df=None`` só atualiza os metadados."""
+    if not DIR_CACHE:
+        return
+    try:
+        os.makedirs(DIR_CACHE, exist_ok=True)
+        if df is not None:
+            from pyarrow import feather
+            tmp = f"{arq.dados}.{os.getpid()}.tmp"
+            feather.write_feather(df, tmp, compression="uncompressed")
+            os.replace(tmp, arq.dados)
+        with open(f"{arq.meta}.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{arq.meta}.tmp", arq.meta)
+    except Exception as e:
+        log.warning("não foi possível gravar o cache em disco (%s): %s", arq.prefixo, e)
+        return
+    if df is None:
+        return
+    for nome in os.listdir(DIR_CACHE):
+        if nome.startswith(f"{arq.prefixo}-") and not nome.startswith(f"{arq.prefixo}-{arq.versao}."):
+            try:
+                os.remove(os.path.join(DIR_CACHE, nome))
+            except OSError:
+                pass
+
+
+# ----------------------------------------------------------
+# Fallback offline
+# ----------------------------------------------------------
+# Se a planilha não responde, a última cópia ingerida (memória ou disco)
+# continua sendo servida, com um aviso da idade dos dados; uma nova
+# tentativa é feita a cada NOVA_TENTATIVA_S. Para testar sem rede, a URL de
+# cada módulo pode ser trocada por PAINEL_URL_<MÓDULO> (URL ou arquivo local).
+
+NOVA_TENTATIVA_S = float(os.environ.get("PAINEL_NOVA_TENTATIVA_S", "60"))
+
+_estado = {}   # chave -> {"arq", "meta", "falhou_em"}
+
+
+def url_fonte(modulo: str, padrao: str | None) -> str | None:
+    return os.environ.get(f"PAINEL_URL_{modulo.upper()}", padrao)
+
+
+def _idade(segundos: float) -> str:
+    if segundos < 3600:
+        return f"{max(1, int(segundos // 60))} min"
+    if segundos < 86400:
+        return f"{segundos / 3600:.0f} h"
+    return f"{segundos / 86400:.0f} dia(s)"
+
+
+def _popular(func, args, kwargs, chave, arq: ArquivoCache):
+    """Lê da fonte; atualiza registro e disco (dados só se o conteúdo mudou)."""
+    _local.fonte = chave[0]   # rótulo das métricas de download
+    try:
+        df = func(*args, **kwargs)
+    finally:
+        _local.fonte = None
+    agora = time.time()
+    with _lock_revalidacao:
+        est = _estado.setdefault(chave, {"arq": arq, "meta": None, "falhou_em": None})
+        if df.empty:
+            est["falhou_em"] = agora
+            return df
+        anterior = est["meta"] or {}
+        hash_fonte = hash_conteudo(df)
+        mudou = not hash_fonte or anterior.get("hash_fonte") != hash_fonte
+        est["meta"] = {
+            "nome": chave[0],
+            "versao_codigo": arq.versao,
+            "hash_fonte": hash_fonte,
+            "gravado_em": agora if mudou else anterior["gravado_em"],
+            "verificado_em": agora,
+        }
+        est["falhou_em"] = None
+    REGISTRO.guardar(chave, df)
+    gravar_disco(arq, df if mudou else None, est["meta"])
+    return df
+
+
+def _revalidar(func, args, kwargs, chave):
+    with _lock_revalidacao:
+        if chave in _revalidando:
+            return
+        _revalidando.add(chave)
+        arq = _estado[chave]["arq"]
+
+    def tarefa():
+        try:
+            _popular(func, args, kwargs, chave, arq)
+        except Exception as e:
+            log.warning("revalidação de %s falhou: %s", chave[0], e)
+            with _lock_revalidacao:
+                _estado[chave]["falhou_em"] = time.time()
+        finally:
+            with _lock_revalidacao:
+                _revalidando.discard(chave)
+
+    threading.Thread(target=tarefa, name=f"revalidar-{chave[0]}", daemon=True).start()
+
+
+def _avisar_desatualizado(func, args, kwargs, chave):
+    est = _estado.get(chave)
+    if not est or not est["falhou_em"] or not est["meta"]:
+        return
+    idade = _idade(time.time() - est["meta"]["verificado_em"])
+    st.warning(f"⚠️ Fonte de dados indisponível no momento. Exibindo a última cópia salva (de {idade} atrás).")
+    if time.time() - est["falhou_em"] > NOVA_TENTATIVA_S:
+        _revalidar(func, args, kwargs, chave)
+
+
+def dataset_compartilhado(nome: str, ttl: float | None = None):
+    """
+    Substitui ``@st.cache_data`` nos carregadores: o DataFrame fica no
+    REGISTRO e cada chamada devolve uma cópia rasa (zero-cópia). Na falta
+    dele, serve o exemplar em disco e revalida em segundo plano. Resultados
+    vazios (falha de leitura) não são guardados: a última cópia boa segue
+    valendo, com aviso de desatualização.
+    """
+    def decorador(func):
+        versao = _versao_codigo(func)
+
+        @functools.wraps(func)
+        def carregar(*args, **kwargs):
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            execucao = execucao_atual()
+            with etapa(f"carregar:{nome}") as registro:
+                df = REGISTRO.obter(chave, ttl)
+                if execucao is not None:
+                    execucao.cache["hits" if df is not None else "misses"] += 1
+                if df is None:
+                    # Só uma sessão popula; as demais esperam o mesmo resultado
+                    df = voo_unico(("dataset", chave), lambda: popular(chave, args, kwargs))
+                    if df is None:
+                        return pd.DataFrame()
+                registro["linhas_saida"] = len(df)
+            if execucao is not None:
+                meta = _estado.get(chave, {}).get("meta") or {}
+                execucao.datasets[nome] = meta.get("hash_fonte")
+            _avisar_desatualizado(func, args, kwargs, chave)
+            return df.copy(deep=False)
+
+        def popular(chave, args, kwargs):
+            arq = ArquivoCache(f"{nome}-{_hash_curto(repr(chave).encode())}", versao)
+            with _lock_revalidacao:
+                est = _estado.setdefault(chave, {"arq": arq, "meta": None, "falhou_em": None})
+            df, meta = ler_disco(arq)
+            if df is not None:
+                with _lock_revalidacao:
+                    est["meta"] = est["meta"] or meta
+                REGISTRO.guardar(chave, df)
+                _revalidar(func, args, kwargs, chave)
+                return df
+            try:
+                df = _popular(func, args, kwargs, chave, arq)
+            except Exception:
+                with _lock_revalidacao:
+                    est["falhou_em"] = time.time()
+                anterior = servir_anterior(chave)
+                if anterior is None:
+                    raise   # nada a servir: a página mostra o erro
+                return anterior
+            if df.empty:
+                return servir_anterior(chave)
+            return df
+
+        def servir_anterior(chave):
+            # Sem disco: a cópia expirada em memória ainda serve. O TTL é
+            # renovado para os próximos reruns não voltarem à fonte em falha
+            # (a nova tentativa fica com _avisar_desatualizado, em segundo plano)
+            anterior = REGISTRO.obter(chave, ttl=None, contar=False)
+            if anterior is not None:
+                REGISTRO.renovar(chave)
+            return anterior
+
+        def versao_dados(*args, **kwargs):
+            """``hash_fonte`` da cópia em uso (None antes da primeira carga)."""
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            meta = _estado.get(chave, {}).get("meta") or {}
+            return meta.get("hash_fonte")
+
+        carregar.limpar = lambda: REGISTRO.remover(nome)
+        carregar.versao = versao_dados
+        return carregar
+
+    return decorador
+
+
+def estatisticas_cache() -> dict:
+    return REGISTRO.estatisticas()
+
+
+# ==========================================================
+# DOWNLOAD DAS PLANILHAS (TIMEOUT, RETENTATIVAS, DISJUNTOR)
+# ==========================================================
+# Cada dataset já é carregado uma vez só (voo_unico no registro). Depois de
+# FALHAS_ABRIR_CIRCUITO falhas seguidas num host, o circuito abre e as
+# leituras falham na hora por CIRCUITO_ABERTO_S, deixando o registro servir
+# a última cópia boa em vez de prender o script de cada usuário.
+
+TIMEOUT_CONEXAO_S = float(os.environ.get("PAINEL_TIMEOUT_CONEXAO_S", "5"))
+TIMEOUT_LEITURA_S = float(os.environ.get("PAINEL_TIMEOUT_LEITURA_S", "30"))
+TENTATIVAS = max(1, int(os.environ.get("PAINEL_TENTATIVAS", "3")))
+BACKOFF_S = 0.5
+FALHAS_ABRIR_CIRCUITO = 3
+CIRCUITO_ABERTO_S = float(os.environ.get("PAINEL_CIRCUITO_ABERTO_S", "60"))
+BLOCO_DOWNLOAD = 1 << 20
+MAX_DOWNLOAD_EM_MEMORIA = 32 * 2**20   # acima disso o download vai para disco
+
+
+class FalhaDownload(Exception):
+    pass
+
+
+class Disjuntor:
+    """Circuit breaker por host: fechado → aberto → meio-aberto (uma tentativa)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.sondando_ate = 0.0   # meio-aberto: prazo da tentativa de prova em curso
+
+    def permitir(self) -> bool:
+        with self._lock:
+            agora = time.monotonic()
+            if agora < self.aberto_ate:
+                return False
+            if self.falhas < FALHAS_ABRIR_CIRCUITO:
+                return True
+            # Meio-aberto: só uma chamada testa o host; as demais falham na
+            # hora até ela dar certo (fecha) ou errado (abre de novo). Se a
+            # prova sumir sem resposta (st.stop, rerun), outra é liberada
+            # depois de CIRCUITO_ABERTO_S.
+            if agora < self.sondando_ate:
+                return False
+            self.sondando_ate = agora + CIRCUITO_ABERTO_S
+            return True
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_ate = 0.0
+            self.sondando_ate = 0.0
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            self.sondando_ate = 0.0
+            if self.falhas >= FALHAS_ABRIR_CIRCUITO:
+                self.aberto_ate = time.monotonic() + CIRCUITO_ABERTO_S
+
+
+_disjuntores = {}
+
+
+def _disjuntor(host: str) -> Disjuntor:
+    with _lock_voo:
+        return _disjuntores.setdefault(host, Disjuntor())
+
+
+def _baixar_com_retentativas(url: str, destino) -> None:
+    """Grava o conteúdo da URL em ``destino`` (em blocos, sem juntar tudo)."""
+    import requests   # só quem baixa paga o import (~60 ms)
+
+    host = urlsplit(url).netloc
+    disjuntor = _disjuntor(host)
+    if not disjuntor.permitir():
+        raise FalhaDownload(f"{host} indisponível (circuito aberto após falhas seguidas)")
+
+    fonte = getattr(_local, "fonte", None) or host
+    for tentativa in range(TENTATIVAS):
+        try:
+            destino.seek(0)
+            destino.truncate()
+            inicio = time.perf_counter()
+            with requests.get(url, timeout=(TIMEOUT_CONEXAO_S, TIMEOUT_LEITURA_S), stream=True) as resp:
+                resp.raise_for_status()
+                for bloco in resp.iter_content(BLOCO_DOWNLOAD):
+                    destino.write(bloco)
+            disjuntor.sucesso()
+            METRICAS.observar("painel_download_segundos", time.perf_counter() - inicio, fonte=fonte)
+            METRICAS.contar("painel_download_bytes_total", destino.tell(), fonte=fonte)
+            destino.seek(0)
+            return
+        except requests.RequestException as e:
+            erro = e
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and 400 <= status < 500 and status not in (408, 429):
+                break   # erro do pedido: repetir não adianta
+            if tentativa < TENTATIVAS - 1:
+                time.sleep(random.uniform(0, BACKOFF_S * 2 ** tentativa))
+
+    disjuntor.falha()
+    METRICAS.contar("painel_download_falhas_total", fonte=fonte)
+    raise FalhaDownload(f"falha ao baixar {url}: {erro}") from erro
+
+
+@contextmanager
+def abrir_fonte(url: str):
+    """Arquivo binário com o conteúdo da URL (ou do caminho local)."""
+    if not url.startswith(("http://", "https://")):
+        with open(url, "rb") as f:
+            yield f
+        return
+    with tempfile.SpooledTemporaryFile(max_size=MAX_DOWNLOAD_EM_MEMORIA) as f:
+        _baixar_com_retentativas(url, f)
+        yield f
+
+
+# ==========================================================
+# INGESTÃO EM LOTES
+# ==========================================================
+# O CSV é lido em lotes: cada lote é projetado (usecols), tratado por
+# ``preparar`` e acumulado já no formato final, então o pico de memória
+# além do resultado é proporcional ao lote, não à planilha.
+#
+# Com pyarrow instalado (PAINEL_MOTOR_CSV=pyarrow, o padrão) o parse é feito
+# pelo leitor de CSV do Arrow, em blocos de BYTES_POR_LOTE, e as colunas de
+# texto viram strings Arrow (sem um objeto Python por célula). Numéricos e
+# datas continuam em numpy, como no motor do pandas. PAINEL_MOTOR_CSV=pandas
+# volta ao read_csv(chunksize=LINHAS_POR_LOTE).
+
+LINHAS_POR_LOTE = int(os.environ.get("PAINEL_LINHAS_POR_LOTE", "50000"))
+BYTES_POR_LOTE = int(os.environ.get("PAINEL_BYTES_POR_LOTE", str(8 * 2**20)))
+MOTOR_CSV = os.environ.get("PAINEL_MOTOR_CSV", "pyarrow")
+
+
+def _tipo_texto():
+    """Dtype ``str`` do pandas 3 (Arrow, ausente = NaN), se disponível."""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except (TypeError, ImportError):   # pandas < 2.3 ou sem pyarrow
+        return None
+
+
+def _lotes_pyarrow(arquivo, usecols=None, dtype=None, encoding="utf-8"):
+    import csv as csv_std
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    texto_io = io.TextIOWrapper(arquivo, encoding=encoding, newline="")
+    cabecalho = next(csv_std.reader(texto_io), [])
+    texto_io.detach()
+    arquivo.seek(0)
+    if not cabecalho:
+        return
+    if callable(usecols):
+        incluir = [c for c in cabecalho if usecols(c)]
+    else:
+        incluir = list(usecols) if usecols is not None else None
+    if incluir == []:
+        return   # nenhuma coluna escolhida (para o Arrow, lista vazia seria "todas")
+
+    texto = _tipo_texto()
+    mapa = {pa.string(): texto, pa.large_string(): texto} if texto is not None else {}
+    leitor = pa_csv.open_csv(
+        arquivo,
+        read_options=pa_csv.ReadOptions(encoding=encoding, block_size=BYTES_POR_LOTE),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=incluir or [],
+            column_types={c: pa.string() for c in incluir or cabecalho} if dtype is str else None,
+            strings_can_be_null=True,
+            # datas ficam como texto, para o tratamento de cada módulo
+            timestamp_parsers=[],
+        ),
+    )
+    for lote in leitor:
+        # O Arrow ainda reconhece datas ISO sozinho: volta para texto
+        for i, campo in enumerate(lote.schema):
+            if pa.types.is_date(campo.type):
+                lote = lote.set_column(i, campo.name, lote.column(i).cast(pa.string()))
+        yield lote.to_pandas(types_mapper=mapa.get)
+
+
+def _lotes_pandas(arquivo, linhas_por_lote, **kwargs):
+    yield from pd.read_csv(arquivo, chunksize=linhas_por_lote, **kwargs)
+
+
+def _motor_pyarrow(kwargs: dict) -> bool:
+    if MOTOR_CSV != "pyarrow" or set(kwargs) - {"usecols", "dtype", "encoding"}:
+        return False
+    if kwargs.get("dtype", str) is not str:
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def ler_csv(url: str, preparar=None, linhas_por_lote: int | None = None, **kwargs) -> pd.DataFrame:
+    """``pd.read_csv`` em lotes, com download protegido; ``kwargs`` vão para o read_csv."""
+    preparar = preparar or (lambda lote: lote)
+    with abrir_fonte(url) as arquivo:
+        lotes = None
+        if _motor_pyarrow(kwargs):
+            try:
+                lotes = [preparar(lote) for lote in _lotes_pyarrow(arquivo, **kwargs)]
+            except Exception as e:
+                # O Arrow fixa os tipos pelo primeiro bloco; se um bloco
+                # posterior não couber (coluna vazia que ganha texto, etc.),
+                # relê tudo pelo pandas.
+                log.info("leitor Arrow falhou em %s (%s); usando o pandas", url, e)
+                arquivo.seek(0)
+        if lotes is None:
+            lotes = [
+                preparar(lote)
+                for lote in _lotes_pandas(arquivo, linhas_por_lote or LINHAS_POR_LOTE, **kwargs)
+            ]
+    if not lotes:
+        return pd.DataFrame()
+    return pd.concat(lotes, ignore_index=True) if len(lotes) > 1 else lotes[0]
+
+
+# ==========================================================
+# INSTRUMENTAÇÃO DE DESEMPENHO
+# ==========================================================
+# Cada rerun de página decorado com ``pagina_medida`` registra as etapas
+# (``etapa`` / ``@medido``): milissegundos, linhas de entrada e saída e bytes
+# enviados ao navegador. Com ``?perf=1`` na URL, um painel na barra lateral
+# mostra as medições do rerun atual. Fora de um rerun medido (threads de
+# revalidação, benchmarks) tudo vira no-op.
+
+_local = threading.local()
+
+
+class Execucao:
+    """Medições de um rerun de página."""
+
+    def __init__(self, pagina: str):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.etapas = []   # dicts: etapa, ms, linhas_entrada, linhas_saida, bytes
+        self.cache = {"hits": 0, "misses": 0}
+        self.filtros = {}
+        self.datasets = {}   # nome -> hash_fonte da versão usada
+        self.total_ms = None
+        self.perfil = None   # arquivo do perfil, se este rerun foi perfilado
+
+
+def execucao_atual() -> Execucao | None:
+    return getattr(_local, "execucao", None)
+
+
+def registrar_filtros(filtros: dict):
+    """Guarda os filtros escolhidos no rerun atual (logs, perfis)."""
+    execucao = execucao_atual()
+    if execucao is not None:
+        execucao.filtros.update(filtros)
+
+
+def assinatura_filtros(filtros: dict) -> str:
+    return _hash_curto(json.dumps(filtros, sort_keys=True, default=str, ensure_ascii=False).encode())[:8]
+
+
+def painel_perf_ativo() -> bool:
+    try:
+        return st.query_params.get("perf") == "1"
+    except Exception:   # fora de uma sessão do Streamlit
+        return False
+
+
+def _linhas(obj) -> int | None:
+    return len(obj) if isinstance(obj, pd.DataFrame) else None
+
+
+@contextmanager
+def etapa(nome: str, linhas_entrada: int | None = None):
+    """Cronometra um trecho do rerun atual; o dict devolvido aceita ``linhas_saida`` e ``bytes``."""
+    execucao = execucao_atual()
+    registro = {"etapa": nome, "linhas_entrada": linhas_entrada}
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        if execucao is not None:
+            registro["ms"] = (time.perf_counter() - inicio) * 1000
+            execucao.etapas.append(registro)
+
+
+def medido(nome: str | None = None):
+    """Decorador: mede a função como etapa (linhas do 1º argumento e do retorno)."""
+    def decorador(func):
+        @functools.wraps(func)
+        def medir(*args, **kwargs):
+            with etapa(nome or func.__name__, _linhas(args[0]) if args else None) as registro:
+                resultado = func(*args, **kwargs)
+                registro["linhas_saida"] = _linhas(resultado)
+            return resultado
+        return medir
+    return decorador
+
+
+def plotar(fig, destino=st):
+    """``plotly_chart`` medido (com o tamanho do JSON quando o painel está ativo)."""
+    with etapa("plotly_chart") as registro:
+        if painel_perf_ativo():
+            registro["bytes"] = len(fig.to_json())
+        destino.plotly_chart(fig, use_container_width=True)
+
+
+LIMIAR_LENTO_MS = float(os.environ.get("PAINEL_LIMIAR_LENTO_MS", "3000"))
+log_lento = logging.getLogger("painel.lento")
+
+
+def _resumir_filtro(valor):
+    # Listas grandes (ex.: "selecionar tudo") viram só a contagem
+    if isinstance(valor, (list, tuple)) and len(valor) > 10:
+        return f"{len(valor)} valores"
+    return valor
+
+
+def _registrar_lento(execucao: Execucao):
+    """Uma linha JSON em ``painel.lento`` para reruns acima de PAINEL_LIMIAR_LENTO_MS."""
+    if execucao.total_ms < LIMIAR_LENTO_MS:
+        return
+    etapas = {}
+    filtro = {}
+    for registro in execucao.etapas:
+        etapas[registro["etapa"]] = round(etapas.get(registro["etapa"], 0) + registro["ms"], 1)
+        if registro["etapa"] == "aplicar_filtros":
+            filtro = registro
+    log_lento.warning(json.dumps({
+        "evento": "rerun_lento",
+        "em": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "pagina": execucao.pagina,
+        "ms": round(execucao.total_ms, 1),
+        "limiar_ms": LIMIAR_LENTO_MS,
+        "datasets": execucao.datasets,
+        "assinatura_filtros": assinatura_filtros(execucao.filtros),
+        "filtros": {k: _resumir_filtro(v) for k, v in execucao.filtros.items()},
+        "linhas_antes": filtro.get("linhas_entrada"),
+        "linhas_depois": filtro.get("linhas_saida"),
+        "cache": execucao.cache,
+        "etapas_ms": etapas,
+        "perfil": execucao.perfil,
+    }, ensure_ascii=False, default=str))
+
+
+def mostrar_painel_perf(execucao: Execucao):
+    resumo = (
+        pd.DataFrame(execucao.etapas, columns=["etapa", "ms", "linhas_entrada", "linhas_saida", "bytes"])
+        .groupby("etapa", sort=False)
+        .agg(
+            chamadas=("ms", "size"),
+            ms=("ms", "sum"),
+            linhas_entrada=("linhas_entrada", "max"),
+            linhas_saida=("linhas_saida", "max"),
+            bytes=("bytes", lambda b: b.sum(min_count=1)),
+        )
+        .round({"ms": 1})
+        .reset_index()
+    )
+    with st.sidebar.expander("⏱️ Desempenho deste rerun", expanded=True):
+        st.metric("Tempo total", f"{execucao.total_ms:.0f} ms")
+        st.caption(
+            f"Cache nesta execução: {execucao.cache['hits']} hit(s), {execucao.cache['misses']} miss(es)"
+        )
+        st.dataframe(resumo, use_container_width=True, hide_index=True)
+        st.caption("Registro compartilhado: " + ", ".join(f"{k}={v}" for k, v in estatisticas_cache().items()))
+        if execucao.perfil:
+            st.caption(f"Perfil gravado em `{execucao.perfil}`")
+        mostrar_memoria()
+
+
+def pagina_medida(pagina: str):
+    """Decorador do ``main()`` de cada página: abre e fecha a medição do rerun."""
+    def decorador(main):
+        @functools.wraps(main)
+        def executar(*args, **kwargs):
+            execucao = Execucao(pagina)
+            _local.execucao = execucao
+            perfil = _iniciar_perfil(_modo_perfil())
+            try:
+                return main(*args, **kwargs)
+            finally:
+                execucao.total_ms = (time.perf_counter() - execucao.inicio) * 1000
+                _local.execucao = None
+                if perfil is not None:
+                    execucao.perfil = _salvar_perfil(perfil, execucao)
+                _registrar_lento(execucao)
+                _registrar_metricas(execucao)
+                if painel_perf_ativo():
+                    mostrar_painel_perf(execucao)
+        return executar
+    return decorador
+
+
+# ==========================================================
+# MÉTRICAS (FORMATO TEXTO DO PROMETHEUS)
+# ==========================================================
+# Contadores e histogramas em memória, por processo. Expostos em
+# http://PAINEL_METRICAS_HOST:PAINEL_METRICAS_PORTA/metrics (thread daemon,
+# sobe no primeiro rerun) e/ou gravados a cada rerun em PAINEL_METRICAS_ARQUIVO
+# (no formato do textfile collector do node_exporter). Sem as variáveis,
+# só ficam em memória.
+
+METRICAS_PORTA = os.environ.get("PAINEL_METRICAS_PORTA")
+METRICAS_HOST = os.environ.get("PAINEL_METRICAS_HOST", "127.0.0.1")
+METRICAS_ARQUIVO = os.environ.get("PAINEL_METRICAS_ARQUIVO", "")
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BUCKETS_LINHAS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BUCKETS_BYTES = tuple(2**k for k in range(10, 31, 2))   # 1 KiB … 1 GiB
+
+
+def _numero(valor) -> str:
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+def _rotulos(rotulos: tuple) -> str:
+    if not rotulos:
+        return ""
+    escapar = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in rotulos) + "}"
+
+
+class Metricas:
+    """Contadores, gauges e histogramas com rótulos, exportados como texto."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definicoes = {}   # nome -> (tipo, ajuda, buckets)
+        self._series = {}       # nome -> {rótulos: valor | [acumulados..., soma, n]}
+        self._coletores = []    # chamados a cada exportação (valores derivados)
+
+    def definir(self, nome: str, tipo: str, ajuda: str, buckets: tuple | None = None):
+        self._definicoes[nome] = (tipo, ajuda, buckets)
+        self._series.setdefault(nome, {})
+
+    def coletor(self, funcao):
+        self._coletores.append(funcao)
+        return funcao
+
+    def contar(self, nome: str, valor: float = 1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._series[nome]
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def ajustar(self, nome: str, valor: float, **rotulos):
+        with self._lock:
+            self._series[nome][tuple(sorted(rotulos.items()))] = valor
+
+    def limpar(self, nome: str):
+        with self._lock:
+            self._series[nome].clear()
+
+    def observar(self, nome: str, valor: float, **rotulos):
+        buckets = self._definicoes[nome][2]
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            h = self._series[nome].setdefault(chave, [0] * len(buckets) + [0.0, 0])
+            for i, limite in enumerate(buckets):
+                if valor <= limite:
+                    h[i] += 1
+            h[-2] += valor
+            h[-1] += 1
+
+    def texto(self) -> str:
+        for funcao in self._coletores:
+            try:
+                funcao(self)
+            except Exception:
+                log.exception("coletor de métricas falhou")
+        linhas = []
+        with self._lock:
+            for nome, (tipo, ajuda, buckets) in self._definicoes.items():
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+                for rotulos, valor in self._series[nome].items():
+                    if tipo != "histogram":
+                        linhas.append(f"{nome}{_rotulos(rotulos)} {_numero(valor)}")
+                        continue
+                    for limite, n in zip(buckets + ("+Inf",), valor[:-2] + [valor[-1]]):
+                        le = limite if limite == "+Inf" else _numero(limite)
+                        linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', le),))} {n}")
+                    linhas.append(f"{nome}_sum{_rotulos(rotulos)} {_numero(valor[-2])}")
+                    linhas.append(f"{nome}_count{_rotulos(rotulos)} {valor[-1]}")
+        return "\n".join(linhas) + "\n"
+
+
+METRICAS = Metricas()
+for _nome, _tipo, _ajuda, _buckets in (
+    ("painel_rerun_segundos", "histogram", "Duração de cada rerun de página.", BUCKETS_SEGUNDOS),
+    ("painel_etapa_segundos", "histogram", "Duração de cada etapa medida do rerun.", BUCKETS_SEGUNDOS),
+    ("painel_linhas_filtradas", "histogram", "Linhas após os filtros da página.", BUCKETS_LINHAS),
+    ("painel_exportacao_segundos", "histogram", "Tempo para gerar arquivos de exportação.", BUCKETS_SEGUNDOS),
+    ("painel_sessao_bytes", "histogram", "Memória estimada do session_state ao fim do rerun.", BUCKETS_BYTES),
+    ("painel_cache_execucao_total", "counter", "Consultas ao registro de datasets feitas pelas páginas.", None),
+    ("painel_download_segundos", "histogram", "Duração dos downloads bem-sucedidos, por fonte.", BUCKETS_SEGUNDOS),
+    ("painel_download_bytes_total", "counter", "Bytes baixados, por fonte.", None),
+    ("painel_download_falhas_total", "counter", "Downloads que falharam após as retentativas.", None),
+    ("painel_cache_hits_total", "counter", "Acertos do registro de datasets.", None),
+    ("painel_cache_misses_total", "counter", "Faltas do registro de datasets.", None),
+    ("painel_cache_despejos_total", "counter", "Datasets despejados do registro por orçamento.", None),
+    ("painel_cache_bytes", "gauge", "Memória ocupada pelo registro de datasets.", None),
+    ("painel_cache_itens", "gauge", "Datasets no registro.", None),
+    ("painel_processo_rss_bytes", "gauge", "Memória residente do processo.", None),
+):
+    METRICAS.definir(_nome, _tipo, _ajuda, _buckets)
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@METRICAS.coletor
+def _coletar_processo(m: Metricas):
+    est = REGISTRO.estatisticas()
+    m.ajustar("painel_cache_hits_total", est["hits"])
+    m.ajustar("painel_cache_misses_total", est["misses"])
+    m.ajustar("painel_cache_despejos_total", est["despejos"])
+    m.ajustar("painel_cache_bytes", REGISTRO._bytes)
+    m.ajustar("painel_cache_itens", est["itens"])
+    rss = _rss_bytes()
+    if rss is not None:
+        m.ajustar("painel_processo_rss_bytes", rss)
+
+
+def _tamanho(valor) -> int:
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(np.sum(valor.memory_usage(deep=True)))
+    return sys.getsizeof(valor)
+
+
+def tamanho_sessao() -> int:
+    """Memória aproximada do ``st.session_state`` da sessão atual."""
+    try:
+        return sum(_tamanho(v) for v in st.session_state.to_dict().values())
+    except Exception:   # fora de uma sessão do Streamlit
+        return 0
+
+
+def tamanhos_sessoes() -> dict[str, int]:
+    """Memória aproximada do ``session_state`` de cada sessão ativa do processo."""
+    try:
+        from streamlit.runtime import Runtime
+        sessoes = Runtime.instance()._session_mgr.list_active_sessions()
+        return {
+            info.session.id: sum(_tamanho(v) for v in info.session.session_state.filtered_state.values())
+            for info in sessoes
+        }
+    except Exception:   # API interna do Streamlit ou modo "bare"
+        return {}
+
+
+def medir_exportacao(pagina: str):
+    """Decorador para funções que geram arquivos de download."""
+    def decorador(func):
+        @functools.wraps(func)
+        def gerar(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICAS.observar("painel_exportacao_segundos", time.perf_counter() - inicio, pagina=pagina)
+        return gerar
+    return decorador
+
+
+def gravar_metricas(caminho: str):
+    """Grava as métricas em ``caminho`` de forma atômica."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=pasta, delete=False, suffix=".tmp", encoding="utf-8") as f:
+        f.write(METRICAS.texto())
+    os.replace(f.name, caminho)
+
+
+_servidor_metricas = None
+_lock_servidor_metricas = threading.Lock()
+
+
+def iniciar_servidor_metricas(porta: int | None = None, host: str | None = None):
+    """Sobe o ``/metrics`` uma vez por processo; devolve o servidor (ou None)."""
+    global _servidor_metricas
+    with _lock_servidor_metricas:
+        if _servidor_metricas is not None:
+            return _servidor_metricas or None
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urlsplit(self.path).path != "/metrics":
+                    self.send_error(404)
+                    return
+                corpo = METRICAS.texto().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        endereco = (host or METRICAS_HOST, int(METRICAS_PORTA if porta is None else porta))
+        try:
+            _servidor_metricas = ThreadingHTTPServer(endereco, Handler)
+        except OSError as e:
+            # Outro processo (ou réplica) já usa a porta: não tenta de novo
+            log.warning("servidor de métricas em %s:%s indisponível: %s", *endereco, e)
+            _servidor_metricas = False
+            return None
+        _servidor_metricas.daemon_threads = True
+        threading.Thread(target=_servidor_metricas.serve_forever, name="painel-metricas", daemon=True).start()
+        log.info("métricas em http://%s:%s/metrics", *_servidor_metricas.server_address[:2])
+        return _servidor_metricas
+
+
+def _registrar_metricas(execucao: Execucao):
+    pagina = execucao.pagina
+    METRICAS.observar("painel_rerun_segundos", execucao.total_ms / 1000, pagina=pagina)
+    for registro in execucao.etapas:
+        METRICAS.observar("painel_etapa_segundos", registro["ms"] / 1000, pagina=pagina, etapa=registro["etapa"])
+        if registro["etapa"] == "aplicar_filtros" and registro.get("linhas_saida") is not None:
+            METRICAS.observar("painel_linhas_filtradas", registro["linhas_saida"], pagina=pagina)
+    for resultado, n in execucao.cache.items():
+        if n:
+            METRICAS.contar("painel_cache_execucao_total", n, pagina=pagina, resultado=resultado)
+    METRICAS.observar("painel_sessao_bytes", tamanho_sessao(), pagina=pagina)
+
+    if METRICAS_PORTA:
+        iniciar_servidor_metricas()
+    if METRICAS_ARQUIVO:
+        try:
+            gravar_metricas(METRICAS_ARQUIVO)
+        except OSError as e:
+            log.warning("não foi possível gravar as métricas em %s: %s", METRICAS_ARQUIVO, e)
+
+
+# ==========================================================
+# PERFILAMENTO DE RERUNS
+# ==========================================================
+# ``?perfil=1`` (cProfile) ou ``?perfil=pyinstrument`` perfila o rerun atual.
+# PAINEL_PERFIL=cprofile|pyinstrument perfila uma fração PAINEL_PERFIL_AMOSTRA
+# dos reruns de todas as sessões. Cada perfil vira um arquivo em
+# PAINEL_PERFIL_DIR (``.prof`` para snakeviz/pstats, ``.html`` do pyinstrument)
+# com o nome da página e a assinatura dos filtros; só os PAINEL_PERFIL_MAX
+# mais recentes são mantidos.
+
+PERFIL_MODO = os.environ.get("PAINEL_PERFIL", "")
+PERFIL_AMOSTRA = float(os.environ.get("PAINEL_PERFIL_AMOSTRA", "1"))
+PERFIL_DIR = os.environ.get(
+    "PAINEL_PERFIL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".perfis")
+)
+PERFIL_MAX_ARQUIVOS = int(os.environ.get("PAINEL_PERFIL_MAX", "50"))
+
+
+def _modo_perfil() -> str:
+    try:
+        pedido = st.query_params.get("perfil")
+    except Exception:   # fora de uma sessão do Streamlit
+        pedido = None
+    if pedido:
+        return "pyinstrument" if pedido == "pyinstrument" else "cprofile"
+    if PERFIL_MODO and random.random() < PERFIL_AMOSTRA:
+        return PERFIL_MODO
+    return ""
+
+
+def _iniciar_perfil(modo: str):
+    if not modo:
+        return None
+    if modo == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            log.warning("pyinstrument não instalado; perfilando com cProfile")
+        else:
+            perfil = Profiler()
+            perfil.start()
+            return perfil
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:   # outro perfilador ativo no processo
+        return None
+    return perfil
+
+
+def _podar_perfis():
+    arquivos = [
+        os.path.join(PERFIL_DIR, nome) for nome in os.listdir(PERFIL_DIR)
+        if nome.endswith((".prof", ".html"))
+    ]
+    arquivos.sort(key=os.path.getmtime)
+    for caminho in arquivos[:max(len(arquivos) - PERFIL_MAX_ARQUIVOS, 0)]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def _salvar_perfil(perfil, execucao: Execucao) -> str | None:
+    """Encerra o perfil e grava o arquivo; devolve o caminho."""
+    if isinstance(perfil, cProfile.Profile):
+        perfil.disable()
+    else:
+        perfil.stop()
+    instante = time.strftime("%Y%m%d-%H%M%S") + f"{time.time() % 1:.3f}"[1:]
+    base = f"{instante}-{execucao.pagina}-{assinatura_filtros(execucao.filtros)}"
+    try:
+        os.makedirs(PERFIL_DIR, exist_ok=True)
+        if isinstance(perfil, cProfile.Profile):
+            caminho = os.path.join(PERFIL_DIR, base + ".prof")
+            perfil.dump_stats(caminho)
+        else:
+            caminho = os.path.join(PERFIL_DIR, base + ".html")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(perfil.output_html())
+        _podar_perfis()
+    except OSError as e:
+        log.warning("não foi possível gravar o perfil em %s: %s", PERFIL_DIR, e)
+        return None
+    log.info("perfil de %s gravado em %s", execucao.pagina, caminho)
+    return caminho
+
+
+# ==========================================================
+# CONTABILIDADE DE MEMÓRIA
+# ==========================================================
+# Quanto ocupa cada dataset do registro, cada cache derivado registrado pelas
+# páginas (``registrar_cache_derivado``) e o session_state de cada sessão.
+# Colunas de texto grandes e com poucos valores distintos são apontadas como
+# candidatas a ``category``. Aparece no painel ``?perf=1`` e nas métricas.
+
+LIMIAR_CANDIDATA_BYTES = 1 * 2**20
+RAZAO_CANDIDATA = 0.5   # distintos / linhas
+
+_caches_derivados = {}   # nome -> função que devolve os bytes ocupados
+_colunas_medidas = {}    # id(df) -> (weakref, resultado)
+_lock_colunas = threading.Lock()
+
+
+def registrar_cache_derivado(nome: str, medir):
+    """Inclui na contabilidade um cache derivado (``medir()`` devolve bytes)."""
+    _caches_derivados[nome] = medir
+
+
+def medir_colunas(df: pd.DataFrame) -> pd.DataFrame:
+    """Bytes, dtype e distintos por coluna (memorizado enquanto o df existir)."""
+    with _lock_colunas:
+        ref, resultado = _colunas_medidas.get(id(df), (None, None))
+        if ref is not None and ref() is df:
+            return resultado
+    uso = df.memory_usage(index=False, deep=True)
+    texto = [c for c in df.columns if df[c].dtype == object or isinstance(df[c].dtype, pd.StringDtype)]
+    resultado = pd.DataFrame({
+        "coluna": df.columns,
+        "dtype": [str(t) for t in df.dtypes],
+        "bytes": uso.to_numpy(),
+        "distintos": [df[c].nunique() if c in texto else None for c in df.columns],
+    })
+    resultado["candidata_categoria"] = (
+        resultado["coluna"].isin(texto)
+        & (resultado["bytes"] >= LIMIAR_CANDIDATA_BYTES)
+        & (resultado["distintos"].astype(float) <= RAZAO_CANDIDATA * max(len(df), 1))
+    )
+    resultado = resultado.sort_values("bytes", ascending=False, ignore_index=True)
+    with _lock_colunas:
+        for chave in [k for k, (r, _) in _colunas_medidas.items() if r() is None]:
+            del _colunas_medidas[chave]
+        _colunas_medidas[id(df)] = (weakref.ref(df), resultado)
+    return resultado
+
+
+def memoria() -> dict:
+    """Retrato da memória: datasets, caches derivados, sessões e candidatas."""
+    datasets, candidatas = [], []
+    for nome, df, b in REGISTRO.itens():
+        datasets.append({"dataset": nome, "linhas": len(df), "bytes": b})
+        for c in medir_colunas(df).query("candidata_categoria").itertuples():
+            candidatas.append({"dataset": nome, "coluna": c.coluna, "dtype": c.dtype,
+                               "bytes": c.bytes, "distintos": c.distintos})
+    derivados = {}
+    for nome, medir in list(_caches_derivados.items()):
+        try:
+            derivados[nome] = int(medir())
+        except Exception:
+            log.exception("falha ao medir o cache derivado %s", nome)
+    return {
+        "datasets": datasets,
+        "derivados": derivados,
+        "sessoes": tamanhos_sessoes(),
+        "candidatas_categoria": sorted(candidatas, key=lambda c: -c["bytes"]),
+    }
+
+
+def mostrar_memoria():
+    m = memoria()
+    st.markdown("**Memória**")
+    if m["datasets"]:
+        tabela = pd.DataFrame(m["datasets"]).assign(mb=lambda d: (d["bytes"] / 2**20).round(1))
+        st.dataframe(tabela.drop(columns="bytes"), use_container_width=True, hide_index=True)
+    for nome, b in m["derivados"].items():
+        st.caption(f"Cache derivado {nome}: {b / 2**20:.1f} MB")
+    sessoes = m["sessoes"]
+    atual = tamanho_sessao()
+    st.caption(
+        f"session_state desta sessão: {atual / 2**10:.1f} KB"
+        + (f" • {len(sessoes)} sessões ativas, {sum(sessoes.values()) / 2**10:.1f} KB no total" if sessoes else "")
+    )
+    if m["candidatas_categoria"]:
+        st.caption("Colunas candidatas a `category` (texto grande, poucos valores distintos):")
+        tabela = pd.DataFrame(m["candidatas_categoria"]).assign(mb=lambda d: (d["bytes"] / 2**20).round(1))
+        st.dataframe(tabela.drop(columns="bytes"), use_container_width=True, hide_index=True)
+
+
+for _nome, _tipo, _ajuda in (
+    ("painel_dataset_bytes", "gauge", "Memória (deep) de cada dataset do registro."),
+    ("painel_cache_derivado_bytes", "gauge", "Memória de cada cache derivado."),
+    ("painel_sessoes_ativas", "gauge", "Sessões ativas no processo."),
+    ("painel_sessoes_state_bytes", "gauge", "Soma do session_state das sessões ativas."),
+    ("painel_sessoes_state_max_bytes", "gauge", "Maior session_state entre as sessões ativas."),
+    ("painel_coluna_candidata_categoria_bytes", "gauge", "Colunas de texto candidatas a category."),
+):
+    METRICAS.definir(_nome, _tipo, _ajuda)
+
+
+@METRICAS.coletor
+def _coletar_memoria(m: Metricas):
+    retrato = memoria()
+    # Séries de datasets despejados não devem ficar com o último valor
+    for nome in ("painel_dataset_bytes", "painel_cache_derivado_bytes", "painel_coluna_candidata_categoria_bytes"):
+        m.limpar(nome)
+    for d in retrato["datasets"]:
+        m.contar("painel_dataset_bytes", d["bytes"], dataset=d["dataset"])
+    for nome, b in retrato["derivados"].items():
+        m.ajustar("painel_cache_derivado_bytes", b, cache=nome)
+    for c in retrato["candidatas_categoria"]:
+        m.ajustar("painel_coluna_candidata_categoria_bytes", c["bytes"], dataset=c["dataset"], coluna=c["coluna"])
+    sessoes = retrato["sessoes"].values()
+    m.ajustar("painel_sessoes_ativas", len(sessoes))
+    m.ajustar("painel_sessoes_state_bytes", sum(sessoes))
+    m.ajustar("painel_sessoes_state_max_bytes", max(sessoes, default=0))
+
+
+# ==========================================================
+# PAINEL DE FILTROS DECLARATIVO
+# ==========================================================
+# Cada página descreve seus filtros como uma lista de ``Filtro``;
+# ``desenhar_filtros`` monta a barra lateral e ``aplicar_selecoes`` avalia
+# todas as seleções numa única máscara booleana. As opções e os códigos de
+# cada coluna vêm de um índice fatorado (``indice_coluna``) memorizado pelos
+# buffers da coluna: enquanto o dataset não mudar, nenhum rerun volta a
+# varrer a coluna para achar os valores distintos. As opções são facetadas
+# (``_facetas``): cada filtro mostra o que sobra com os demais aplicados.
+
+LIMITE_INDICES_MB = float(os.environ.get("PAINEL_INDICES_MB", "128"))
+LIMITE_INDICES_ITENS = int(os.environ.get("PAINEL_INDICES_ITENS", "128"))
+
+
+class Filtro(NamedTuple):
+    """Um filtro da barra lateral (``coluna`` None = coluna não detectada)."""
+    coluna: str | None
+    titulo: str
+    tipo: str = "multi"            # "multi" (isin) ou "periodo" (datas, inclusive)
+    todos: bool = False            # multiselect começa com todas as opções
+    opcoes: list | None = None     # ordem fixa; senão, distintos em ordem crescente
+    excluir: tuple = ()            # opções escondidas (comparadas em maiúsculas)
+    formatar: object = None        # format_func do widget
+    transformar: object = None     # função aplicada à coluna antes de indexar
+    obrigatorio: bool = False      # seleção vazia não devolve nenhuma linha
+    contagem: bool = True          # mostra as linhas de cada opção no rótulo
+
+
+class IndiceColuna(NamedTuple):
+    codigos: np.ndarray            # posição em ``valores``; -1 = ausente
+    valores: list
+    posicoes: dict                 # valor -> código
+    contagens: np.ndarray          # linhas por valor
+
+
+def extrair_numero(serie: pd.Series) -> pd.Series:
+    """Primeiro número do texto (ex.: "SE 12" -> 12); usado como ``transformar``."""
+    return pd.to_numeric(serie.astype(str).str.extract(r"(\d+)", expand=False), errors="coerce").astype("Int64")
+
+
+def para_data(serie: pd.Series) -> pd.Series:
+    return pd.to_datetime(serie, errors="coerce")
+
+
+def _impressao(serie: pd.Series):
+    """
+    Identifica os buffers da coluna (endereços, deslocamento, tamanho, dtype):
+    igual entre cópias rasas e renomeações, muda quando a coluna é reescrita.
+    Devolve (chave, dono), em que ``dono`` mantém os buffers vivos enquanto a
+    chave estiver no cache; ou (None, None) para dtypes sem impressão estável.
+    """
+    arrow = getattr(serie.array, "_pa_array", None)
+    if arrow is not None:
+        partes = tuple(
+            (ch.offset, len(ch), *(b.address if b is not None else 0 for b in ch.buffers()))
+            for ch in arrow.chunks
+        )
+        return ("arrow", str(serie.dtype), len(serie), partes), arrow
+    if isinstance(serie.dtype, np.dtype):
+        valores = serie.to_numpy()
+        return ("numpy", str(valores.dtype), len(valores),
+                valores.__array_interface__["data"][0], valores.strides), valores
+    return None, None
+
+
+def _bytes_derivado(valor: tuple) -> int:
+    return sum(v.nbytes if isinstance(v, np.ndarray) else sys.getsizeof(v) for v in valor)
+
+
+class CacheColunas:
+    """
+    LRU de derivados de coluna, limitado pelos bytes retidos e pelo número de
+    entradas (uma página que recria uma coluna a cada rerun deixa uma entrada
+    órfã por rerun; o limite de itens as descarta mesmo se forem pequenas).
+    """
+
+    def __init__(self, limite_bytes: int, limite_itens: int = LIMITE_INDICES_ITENS):
+        self.limite_bytes = limite_bytes
+        self.limite_itens = limite_itens
+        self._itens = OrderedDict()   # chave -> (dono, valor, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def obter(self, serie: pd.Series, funcao, *args):
+        """``funcao(serie, *args)``, memorizado enquanto os buffers da coluna forem os mesmos."""
+        impressao, dono = _impressao(serie)
+        if impressao is None:
+            return funcao(serie, *args)
+        chave = (impressao, funcao.__qualname__, *(getattr(a, "__qualname__", a) for a in args))
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave][1]
+        valor = funcao(serie, *args)
+        tamanho = int(serie.memory_usage(index=False)) + _bytes_derivado(valor)
+        with self._lock:
+            if chave not in self._itens:
+                self._itens[chave] = (dono, valor, tamanho)
+                self._bytes += tamanho
+            while len(self._itens) > 1 and (
+                self._bytes > self.limite_bytes or len(self._itens) > self.limite_itens
+            ):
+                _, (_, _, b) = self._itens.popitem(last=False)
+                self._bytes -= b
+        return valor
+
+    def tamanho_bytes(self) -> int:
+        with self._lock:
+            return sum(_bytes_derivado(v) for _, v, _ in self._itens.values())
+
+
+CACHE_COLUNAS = CacheColunas(int(LIMITE_INDICES_MB * 2**20))
+registrar_cache_derivado("indices_filtro", CACHE_COLUNAS.tamanho_bytes)
+
+
+def _fatorar(serie: pd.Series, transformar=None) -> IndiceColuna:
+    if transformar is not None:
+        serie = transformar(serie)
+    codigos, valores = pd.factorize(serie, sort=True)
+    valores = valores.tolist()
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    return IndiceColuna(codigos, valores, {v: i for i, v in enumerate(valores)}, contagens)
+
+
+def _intervalo(serie: pd.Series, transformar=None) -> tuple[np.ndarray, object, object]:
+    datas = (transformar(serie) if transformar is not None else serie).to_numpy("datetime64[ns]")
+    validas = datas[~np.isnat(datas)]
+    if not len(validas):
+        return datas, None, None
+    return datas, pd.Timestamp(validas.min()).date(), pd.Timestamp(validas.max()).date()
+
+
+def indice_coluna(serie: pd.Series, transformar=None) -> IndiceColuna:
+    """Códigos e valores distintos (ordenados) da coluna, memorizados."""
+    return CACHE_COLUNAS.obter(serie, _fatorar, transformar)
+
+
+def intervalo_datas(serie: pd.Series, transformar=None):
+    """(datas datetime64, mínimo, máximo) da coluna; memorizado se houver ``transformar``."""
+    if transformar is None:
+        return _intervalo(serie)
+    return CACHE_COLUNAS.obter(serie, _intervalo, transformar)
+
+
+def opcoes_filtro(fonte, filtro: Filtro) -> tuple[list, dict]:
+    """Opções do filtro e linhas por opção (do dataset inteiro)."""
+    if isinstance(fonte, FiltroBanco):
+        contagens = _contagens_banco(fonte, filtro.coluna)
+        opcoes = list(contagens)
+    else:
+        indice = indice_coluna(fonte[filtro.coluna], filtro.transformar)
+        contagens = dict(zip(indice.valores, indice.contagens.tolist()))
+        opcoes = indice.valores
+    if filtro.opcoes is not None:
+        opcoes = list(filtro.opcoes)
+    if filtro.excluir:
+        opcoes = [o for o in opcoes if str(o).upper() not in filtro.excluir]
+    return opcoes, {o: contagens.get(o, 0) for o in opcoes}
+
+
+def formatar_inteiro(n: int) -> str:
+    return f"{n:,}".replace(",", ".")
+
+
+def rotulo_com_contagem(formatar, contagens: dict):
+    """
+    format_func que acrescenta as linhas de cada opção: "Centro (1.234)".
+    ``contagens`` deve ter todas as opções; outro valor levanta KeyError.
+    """
+    formatar = formatar or str
+    return lambda v: f"{formatar(v)} ({formatar_inteiro(contagens[v])})"
+
+
+def titulo_filtro(titulo: str):
+    st.sidebar.markdown(f"<p class='filtro-titulo'>{titulo}</p>", unsafe_allow_html=True)
+
+
+def _periodo(escolha, maximo):
+    # Enquanto o usuário escolhe a segunda data, o widget devolve só a primeira
+    if not escolha:
+        return None
+    return escolha[0], escolha[-1] if len(escolha) > 1 else maximo
+
+
+def _parcial(df: pd.DataFrame, f: Filtro, sel) -> np.ndarray | None:
+    """Máscara de um filtro (None = filtro inativo)."""
+    if f.tipo == "periodo":
+        if not sel:
+            return None
+        datas = intervalo_datas(df[f.coluna], f.transformar)[0]
+        inicio = np.datetime64(pd.Timestamp(sel[0]), "ns")
+        fim = np.datetime64(pd.Timestamp(sel[1]) + pd.Timedelta(days=1), "ns")
+        return (datas >= inicio) & (datas < fim)
+    if not sel and not f.obrigatorio:
+        return None
+    indice = indice_coluna(df[f.coluna], f.transformar)
+    # Última posição fica False: é onde caem os códigos -1 (ausentes)
+    tabela = np.zeros(len(indice.valores) + 1, dtype=bool)
+    tabela[[indice.posicoes[v] for v in sel if v in indice.posicoes]] = True
+    return tabela[indice.codigos]
+
+
+def _e_mascaras(a, b):
+    return b if a is None else a if b is None else a & b
+
+
+def _facetas(df: pd.DataFrame, filtros: list[Filtro], selecoes: dict) -> tuple[dict, np.ndarray | None]:
+    """
+    Linhas por opção de cada multiselect sob os *demais* filtros, e a máscara
+    final. Com prefixos e sufixos acumulados das máscaras, "todos menos i" é
+    ``prefixo[i] & sufixo[i+1]``: k filtros custam ~3k ANDs e um bincount
+    cada, em vez de k varreduras do frame.
+    """
+    parciais = [_parcial(df, f, selecoes.get(f.coluna)) for f in filtros]
+    prefixos = [None]
+    for p in parciais:
+        prefixos.append(_e_mascaras(prefixos[-1], p))
+    sufixos = [None]
+    for p in reversed(parciais):
+        sufixos.append(_e_mascaras(sufixos[-1], p))
+    sufixos.reverse()
+
+    contagens = {}
+    for i, f in enumerate(filtros):
+        if f.tipo != "multi":
+            continue
+        indice = indice_coluna(df[f.coluna], f.transformar)
+        outros = _e_mascaras(prefixos[i], sufixos[i + 1])
+        if outros is None:
+            n = indice.contagens
+        else:
+            n = np.bincount(indice.codigos[outros] + 1, minlength=len(indice.valores) + 1)[1:]
+        contagens[f.coluna] = dict(zip(indice.valores, n.tolist()))
+    return contagens, prefixos[-1]
+
+
+def _facetas_banco(fonte: FiltroBanco, filtros: list[Filtro], selecoes: dict) -> tuple[dict, None]:
+    """Mesmas contagens facetadas, por um GROUP BY por filtro no banco local."""
+    contagens = {}
+    for f in filtros:
+        outras = {c: v for c, v in selecoes.items() if c != f.coluna and v}
+        if not outras:
+            contagens[f.coluna] = _contagens_banco(fonte, f.coluna)
+            continue
+        tabela = contar_por(FiltroBanco(fonte.tabela, outras, fonte.colunas), [f.coluna])
+        contagens[f.coluna] = dict(zip(tabela[f.coluna].tolist(), tabela["QTD"].tolist()))
+    return contagens, None
+
+
+def _desenhar(fonte, filtros: list[Filtro], pagina: str, fixas: dict) -> tuple[dict, np.ndarray | None]:
+    cols = set(colunas(fonte))
+    filtros = [f for f in filtros if f.coluna is not None and f.coluna in cols]
+    chaves = {f.coluna: f"filtro_{pagina}_{f.coluna}" for f in filtros}
+
+    # 1) Seleções atuais, lidas do estado dos widgets antes de desenhá-los
+    #    (na primeira execução, o padrão de cada filtro)
+    base, selecoes = {}, {}
+    for f in filtros:
+        chave = chaves[f.coluna]
+        if f.coluna in fixas:
+            selecoes[f.coluna] = fixas[f.coluna]
+        elif f.tipo == "periodo":
+            _, minimo, maximo = intervalo_datas(fonte[f.coluna], f.transformar)
+            if minimo is not None:
+                base[f.coluna] = (minimo, maximo)
+                selecoes[f.coluna] = _periodo(st.session_state.get(chave, (minimo, maximo)), maximo)
+        else:
+            opcoes, _ = opcoes_filtro(fonte, f)
+            base[f.coluna] = opcoes
+            if chave not in st.session_state:
+                selecoes[f.coluna] = list(opcoes) if f.todos else []
+                continue
+            atual = st.session_state[chave]
+            if f.todos and set(st.session_state.get(f"{chave}:opcoes", ())) <= set(atual):
+                # O usuário não restringiu a seleção: "todos" acompanha as opções atuais
+                selecoes[f.coluna] = list(opcoes)
+            else:
+                validas = set(opcoes)
+                selecoes[f.coluna] = [v for v in atual if v in validas]   # valor pode ter sumido do dataset
+            if selecoes[f.coluna] != atual:
+                st.session_state[chave] = selecoes[f.coluna]
+
+    # 2) Contagens de cada opção sob os demais filtros
+    multi = [f for f in filtros if f.tipo == "multi"]
+    if isinstance(fonte, FiltroBanco):
+        contagens, mascara = _facetas_banco(fonte, multi, selecoes)
+    else:
+        contagens, mascara = _facetas(fonte, filtros, selecoes)
+
+    # 3) Widgets: só opções que ainda retornam linhas, mais as já escolhidas
+    desenhadas = {}
+    for f in filtros:
+        if f.coluna not in base:
+            continue
+        titulo_filtro(f.titulo)
+        chave = chaves[f.coluna]
+        if f.tipo == "periodo":
+            minimo, maximo = base[f.coluna]
+            escolha = st.sidebar.date_input(
+                f.titulo, value=(minimo, maximo), min_value=minimo, max_value=maximo,
+                key=chave, label_visibility="collapsed",
+            )
+            desenhadas[f.coluna] = _periodo(escolha, maximo)
+            continue
+        n = contagens.get(f.coluna, {})
+        escolhidas = set(selecoes[f.coluna])
+        opcoes = [o for o in base[f.coluna] if n.get(o, 0) or o in escolhidas]
+        desenhadas[f.coluna] = st.sidebar.multiselect(
+            f.titulo, opcoes,
+            default=opcoes if f.todos and chave not in st.session_state else None,
+            format_func=(
+                rotulo_com_contagem(f.formatar, {o: n.get(o, 0) for o in opcoes})
+                if f.contagem else (f.formatar or str)
+            ),
+            key=chave, label_visibility="collapsed",
+        )
+        if f.todos:
+            st.session_state[f"{chave}:opcoes"] = opcoes
+
+    if any(desenhadas[c] != selecoes[c] for c in desenhadas):
+        selecoes.update(desenhadas)
+        mascara = None if isinstance(fonte, FiltroBanco) else mascara_filtros(fonte, filtros, selecoes)
+    return selecoes, mascara
+
+
+def desenhar_filtros(fonte, filtros: list[Filtro], pagina: str, fixas: dict | None = None) -> dict:
+    """
+    Desenha os filtros na barra lateral; devolve {coluna: seleção}. As opções
+    são facetadas: cada multiselect lista só os valores (e as contagens) que
+    restam com os demais filtros aplicados, mais os já escolhidos. ``fixas``
+    traz as seleções de filtros que a página desenha por conta própria.
+    """
+    return _desenhar(fonte, filtros, pagina, fixas or {})[0]
+
+
+def mascara_filtros(df: pd.DataFrame, filtros: list[Filtro], selecoes: dict) -> np.ndarray | None:
+    """Máscara booleana de todas as seleções (None = nenhum filtro ativo)."""
+    mascara = None
+    for f in filtros:
+        if f.coluna in selecoes and f.coluna in df.columns:
+            mascara = _e_mascaras(mascara, _parcial(df, f, selecoes[f.coluna]))
+    return mascara
+
+
+def aplicar_selecoes(fonte, filtros: list[Filtro], selecoes: dict, mascara=None):
+    """Registra as seleções e devolve o recorte filtrado, no formato da fonte."""
+    titulos = {f.coluna: f.titulo for f in filtros}
+    registrar_filtros({titulos.get(col, col): sel for col, sel in selecoes.items()})
+    if isinstance(fonte, FiltroBanco):
+        return filtrar(fonte, {col: sel for col, sel in selecoes.items() if col in titulos})
+    if mascara is None:
+        mascara = mascara_filtros(fonte, filtros, selecoes)
+    return fonte if mascara is None else fonte[mascara]
+
+
+def painel_filtros(fonte, filtros: list[Filtro], pagina: str):
+    """Cabeçalho, widgets e recorte filtrado de uma página."""
+    st.sidebar.header("🔎 Filtros")
+    selecoes, mascara = _desenhar(fonte, filtros, pagina, {})
+    return aplicar_selecoes(fonte, filtros, selecoes, mascara)